@@ -94,10 +94,11 @@ def adjusted_legend_scores(band_means: Dict[str, float], target_min: float = 0.1
             data[k] += 20.0
     return data
 
-def band_level_text(score: float, band: str, band_thresholds: Dict = None) -> str:
-    if score is None or (isinstance(score, float) and (math.isnan(score) or math.isinf(score))):
-        return ""
-    
+# band_level_text'in döndürdüğü seviyeler, yüksekten düşüğe
+LEVEL_TEXTS = ("-yüksek-", "-yüksek orta-", "-orta-", "-düşük orta-", "-düşük-")
+
+def band_threshold_cuts(band: str, band_thresholds: Dict = None) -> tuple:
+    """Bir bandın (yüksek, yüksek orta, orta, düşük orta) alt sınırları; band yoksa Alpha eşikleri."""
     # Use provided thresholds or fall back to defaults
     thresholds_dict = band_thresholds if band_thresholds is not None else BAND_THRESHOLDS
     thresholds = thresholds_dict.get(band, thresholds_dict.get("Alpha", BAND_THRESHOLDS["Alpha"]))
@@ -108,16 +109,35 @@ def band_level_text(score: float, band: str, band_thresholds: Dict = None) -> st
     orta_key = "orta"
     dusuk_orta_key = "düşük orta" if "düşük orta" in thresholds else "dusuk_orta"
     
-    if score > thresholds.get(yuksek_key, thresholds.get("yuksek", 85)):
-        return "-yüksek-"
-    elif score > thresholds.get(yuksek_orta_key, thresholds.get("yuksek_orta", 75)):
-        return "-yüksek orta-"
-    elif score > thresholds.get(orta_key, 50):
-        return "-orta-"
-    elif score > thresholds.get(dusuk_orta_key, thresholds.get("dusuk_orta", 40)):
-        return "-düşük orta-"
-    else:
-        return "-düşük-"
+    return (
+        thresholds.get(yuksek_key, thresholds.get("yuksek", 85)),
+        thresholds.get(yuksek_orta_key, thresholds.get("yuksek_orta", 75)),
+        thresholds.get(orta_key, 50),
+        thresholds.get(dusuk_orta_key, thresholds.get("dusuk_orta", 40)),
+    )
+
+def band_level_text(score: float, band: str, band_thresholds: Dict = None) -> str:
+    if score is None or (isinstance(score, float) and (math.isnan(score) or math.isinf(score))):
+        return ""
+    
+    for level, cut in zip(LEVEL_TEXTS, band_threshold_cuts(band, band_thresholds)):
+        if score > cut:
+            return level
+    return "-düşük-"
+
+def band_level_codes(scores, band: str, band_thresholds: Dict = None) -> np.ndarray:
+    """band_level_text'in vektörel hali, kod olarak: LEVEL_TEXTS indeksi, NaN/inf için len(LEVEL_TEXTS)."""
+    scores = np.asarray(scores, dtype=float)
+    codes = np.full(scores.shape, len(LEVEL_TEXTS) - 1, dtype=np.int8)
+    # Düşükten yükseğe: her eşiği aşan skor bir üst seviyeye çıkar
+    for code, cut in reversed(list(enumerate(band_threshold_cuts(band, band_thresholds)))):
+        codes[scores > cut] = code
+    codes[~np.isfinite(scores)] = len(LEVEL_TEXTS)
+    return codes
+
+def band_levels(scores, band: str, band_thresholds: Dict = None) -> np.ndarray:
+    """Skor dizisi -> seviye metinleri (NaN/inf -> "")."""
+    return np.array(LEVEL_TEXTS + ("",), dtype=object)[band_level_codes(scores, band, band_thresholds)]
 
 def compute_mail_csv_metrics(df: pd.DataFrame, band_thresholds: Dict = None, window_secs: int = None, window_samples: int = None) -> Dict[str, float]:
     df = df.copy()
@@ -238,8 +258,8 @@ def compute_mail_csv_metrics(df: pd.DataFrame, band_thresholds: Dict = None, win
         # Compute per-row total_power and min_band_value
         band_df = pd.DataFrame(row_band_values)
         
-        # Compute total_power: sum of max(band, 0)
-        total_power = band_df.apply(lambda row: sum([max(v, 0) if not pd.isna(v) else 0 for v in row]), axis=1)
+        # Compute total_power: sum of max(band, 0), NaN counted as 0
+        total_power = band_df.clip(lower=0).fillna(0).sum(axis=1)
         
         # Compute min_band_value
         min_band_value = band_df.min(axis=1)
@@ -276,34 +296,21 @@ def compute_mail_csv_metrics(df: pd.DataFrame, band_thresholds: Dict = None, win
                 raw_means_window[band] = None
 
         # Compute pct_all: per-row normalized average (skip zero-power rows)
-        pct_lists = {b: [] for b in bands}
-        
-        for idx in range(len(df)):
-            vals = {}
-            for band in bands:
-                col = band_cols_map.get(band)
-                if not col:
-                    vals[band] = 0.0
-                    continue
-                v = row_band_values[band].iloc[idx]
-                if pd.isna(v) or not np.isfinite(v):
-                    vals[band] = 0.0
-                else:
-                    vals[band] = max(float(v), 0.0)
-            
-            row_total = sum(vals.values())
-            if row_total <= 0:
-                # Skip rows with no usable power
-                continue
-            
-            for band in bands:
-                pct_lists[band].append(vals[band] / row_total)
+        # Column-wise: max(v, 0) per band (missing band / NaN -> 0), row totals summed in band order
+        vals = {}
+        for band in bands:
+            v = row_band_values[band].to_numpy(dtype=float) if band_cols_map.get(band) else np.zeros(len(df))
+            vals[band] = np.where(np.isfinite(v), np.maximum(v, 0.0), 0.0)
+        row_total = np.zeros(len(df))
+        for band in bands:
+            row_total = row_total + vals[band]
+        # Skip rows with no usable power
+        usable = row_total > 0
         
         # Average the per-row percentages
         for band in bands:
-            lst = pct_lists[band]
-            if lst:
-                pct_all[band] = round(float(np.mean(lst)), 4)  # Keep as 0-1 proportion
+            if usable.any():
+                pct_all[band] = round(float(np.mean(vals[band][usable] / row_total[usable])), 4)  # Keep as 0-1 proportion
             else:
                 pct_all[band] = None
 
@@ -1,12 +1,18 @@
 import os
 import sys
 import re
+import json
+import numpy as np
 import pandas as pd
+from excel_writer import write_sheets
 
 # CSV kök dizini
 CSV_ROOT = r"/Users/umutkaya/Documents/Zenin Mind Reader/data"
 # Run counter file path
 RUN_COUNTER_FILE = os.path.join(CSV_ROOT, "run_counter.txt")
+# Bu boyuttan büyük log'lar chunk'lar halinde özetlenir (bellek log boyutundan bağımsız kalır)
+STREAMING_MIN_BYTES = 512 * 1024 * 1024
+SUMMARY_CHUNK_ROWS = 200_000
 
 def _get_last_run_id() -> int:
     """Son kullanılan run ID'yi oku. Dosya yoksa veya okunamazsa None döner."""
@@ -39,62 +45,100 @@ def normalize_profile_name(name: str) -> str:
     name = re.sub(r"4\s*uyumlu", "", name, flags=re.IGNORECASE)
     return name.strip()
 
-def aggregate_event(df_event, prof_col="en_iyi_profiller"):
-    # returns DataFrame with columns: Profile, 5 Uyumlu, 4 Uyumlu, Toplam, Yüzde
-    counts_5 = {}
-    counts_4 = {}
+# "4 uyumlu" etiketi ve baskınlık status kalıpları
+FOUR_MATCH_PATTERN = r"\(.*?4\s*uyumlu.*?\)|\b4\s*uyumlu\b"
+HIGH_PATTERN = "baskın yüksek|baskin yuksek|baskınyüksek|baskinyuksek"
+LOW_PATTERN = "baskın düşük|baskin dusuk|baskındüşük|baskindusuk"
+BANDS = ["Delta", "Theta", "Alpha", "Beta", "Gamma"]
 
-    total_occurrences = 0
-    for val in df_event[prof_col].fillna("").astype(str):
-        if not val:
-            continue
-        parts = [p.strip() for p in val.split(",") if p.strip()]
-        for p in parts:
-            is_4 = bool(re.search(r"\(.*?4\s*uyumlu.*?\)", p, flags=re.IGNORECASE) or re.search(r"\b4\s*uyumlu\b", p, flags=re.IGNORECASE))
-            base = normalize_profile_name(p)
-            if not base:
-                continue
-            if is_4:
-                counts_4[base] = counts_4.get(base, 0) + 1
-            else:
-                counts_5[base] = counts_5.get(base, 0) + 1
-            total_occurrences += 1
+def _on_unique(series, func):
+    """func'ı yalnızca benzersiz değerlere uygular, sonucu satırlara geri dağıtır.
+    Log'larda profil/status değerleri çok tekrar ettiği için milyonlarca satırda bile ucuzdur."""
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    mapped = func(pd.Series(uniques, dtype=object))
+    return pd.Series(np.asarray(mapped)[codes], index=series.index)
+
+def explode_profiles(df, prof_col="en_iyi_profiller"):
+    """Profil sütununu satır başına tek profile açar.
+
+    Dönen DataFrame index'i orijinal satır index'idir; sütunlar:
+    profile (normalize edilmiş ad), is_4 (4 uyumlu etiketi var mı)."""
+    values = df[prof_col].fillna("").astype(str) if prof_col in df.columns else pd.Series("", index=df.index)
+    parts = values.str.split(",").explode()
+    parts = parts.fillna("").str.strip()
+    parts = parts[parts != ""]
+    if parts.empty:
+        return pd.DataFrame({"profile": pd.Series(dtype=object), "is_4": pd.Series(dtype=bool)})
+    is_4 = _on_unique(parts, lambda u: u.str.contains(FOUR_MATCH_PATTERN, case=False, regex=True))
+    base = _on_unique(parts, lambda u: u.map(normalize_profile_name))
+    out = pd.DataFrame({"profile": base, "is_4": is_4.astype(bool)})
+    return out[out["profile"] != ""]
+
+def _counts_frame(sizes):
+    """(profile, is_4) -> adet serisinden profil başına c5/c4 tablosu, profile adına göre sıralı."""
+    if sizes.empty:
+        return pd.DataFrame({"c5": pd.Series(dtype="int64"), "c4": pd.Series(dtype="int64")})
+    counts = sizes.unstack(fill_value=0)
+    return pd.DataFrame({
+        "c5": counts[False] if False in counts.columns else 0,
+        "c4": counts[True] if True in counts.columns else 0,
+    }, index=counts.index).astype("int64").sort_index()
 
-    profiles = sorted(set(list(counts_5.keys()) + list(counts_4.keys())))
-    rows = []
-    total_all = sum(counts_5.values()) + sum(counts_4.values())
+def _profile_counts(exploded):
+    """Profil başına (5 uyumlu, 4 uyumlu) sayıları, profile adına göre sıralı."""
+    return _counts_frame(exploded.groupby(["profile", "is_4"]).size())
 
-    # if no profiles found, return empty DataFrame with expected columns
-    if not profiles:
+def _event_summary(counts):
+    # returns DataFrame with columns: Profile, 5 Uyumlu, 4 Uyumlu, Toplam, Yüzde
+    if counts.empty:
         return pd.DataFrame(columns=["Profile", "5 Uyumlu", "4 Uyumlu", "Toplam", "Yüzde"])
+    total = counts["c5"] + counts["c4"]
+    total_all = int(total.sum())
+    out = pd.DataFrame({
+        "Profile": counts.index.tolist(),
+        "5 Uyumlu": counts["c5"].to_numpy(),
+        "4 Uyumlu": counts["c4"].to_numpy(),
+        "Toplam": total.to_numpy(),
+        "Yüzde": [round((t / total_all * 100) if total_all > 0 else 0.0, 2) for t in total.tolist()],
+    })
+    return out.sort_values("Toplam", ascending=False).reset_index(drop=True)
 
-    for prof in profiles:
-        c5 = counts_5.get(prof, 0)
-        c4 = counts_4.get(prof, 0)
-        total = c5 + c4
-        pct = round((total / total_all * 100) if total_all > 0 else 0.0, 2)
-        rows.append({
-            "Profile": prof,
-            "5 Uyumlu": c5,
-            "4 Uyumlu": c4,
-            "Toplam": total,
-            "Yüzde": pct
-        })
-    out = pd.DataFrame(rows)
-    # ensure Toplam column exists before sorting
-    if "Toplam" in out.columns:
-        out = out.sort_values("Toplam", ascending=False).reset_index(drop=True)
-    else:
-        out = out.reset_index(drop=True)
-    return out
+def aggregate_event(df_event, prof_col="en_iyi_profiller"):
+    # returns DataFrame with columns: Profile, 5 Uyumlu, 4 Uyumlu, Toplam, Yüzde
+    return _event_summary(_profile_counts(explode_profiles(df_event, prof_col)))
 
-def compute_dominance_summary(df_all, prof_col="en_iyi_profiller"):
+def aggregate_events(df, prof_col="en_iyi_profiller", event_col="event", exploded=None):
+    """Her event için aggregate_event sonucunu tek explode geçişiyle üretir: {event: DataFrame}"""
+    if exploded is None:
+        exploded = explode_profiles(df, prof_col)
+    events = df[event_col].fillna("")
+    exploded = exploded.assign(event=events.loc[exploded.index].to_numpy())
+    by_event = {ev: grp for ev, grp in exploded.groupby("event", sort=False)}
+    empty = exploded.iloc[0:0]
+    return {ev: _event_summary(_profile_counts(by_event.get(ev, empty))) for ev in sorted(events.unique())}
+
+def compute_dominance_summary(df_all, prof_col="en_iyi_profiller", exploded=None):
     """
     Yeni: her profile için satır bazlı sınıflandırma yap.
     Satır sınıflandırması: önce 'Baskın Yüksek' var mı -> oysa yüksek; değilse 'Baskın Düşük' var mı -> düşük; aksi halde Normal.
     Eğer bir satırda profile X görünüyorsa, o profile için ilgili sınıfa 1 eklenir.
     Dönen DataFrame columns: Profile, Baskın Yüksek, Baskın Düşük, Normal
     """
+    if exploded is None:
+        exploded = explode_profiles(df_all, prof_col)
+    if exploded.empty:
+        return pd.DataFrame(columns=["Profile", "Baskın Yüksek", "Baskın Düşük", "Normal"])
+
+    row_class = _row_classes(df_all)
+    classes = pd.Series(row_class, index=df_all.index).loc[exploded.index].to_numpy()
+    counts = (
+        pd.crosstab(pd.Categorical(exploded["profile"], categories=pd.unique(exploded["profile"])), classes)
+        .reindex(columns=["high", "low", "normal"], fill_value=0)
+    )
+    counts.index = counts.index.astype(str)
+    return _dominance_frame(counts)
+
+def _status_columns(df_all):
     # status sütunu isimleri beklenen hali
     status_cols = ["status_delta","status_theta","status_alpha","status_beta","status_gamma"]
     # normalize column names to existing ones
@@ -102,43 +146,98 @@ def compute_dominance_summary(df_all, prof_col="en_iyi_profiller"):
     if not existing_status_cols:
         # try capitalized variants
         existing_status_cols = [c for c in ["status_Delta","status_Theta","status_Alpha","status_Beta","status_Gamma"] if c in df_all.columns]
+    return existing_status_cols
 
-    # map profile -> counters
-    counts = {}
-    for _, row in df_all.iterrows():
-        profs_raw = (row.get(prof_col, "") or "")
-        if not profs_raw:
-            continue
-        profs = [p.strip() for p in str(profs_raw).split(",") if p.strip()]
-        # determine row class
-        row_values = [str(row.get(sc,"") or "").lower() for sc in existing_status_cols]
-        is_high = any("baskın yüksek" in rv or "baskin yuksek" in rv or "baskınyüksek" in rv or "baskinyuksek" in rv for rv in row_values)
-        is_low = any("baskın düşük" in rv or "baskin dusuk" in rv or "baskındüşük" in rv or "baskindusuk" in rv for rv in row_values)
-        if is_high:
-            cls = "high"
-        elif is_low:
-            cls = "low"
+def _row_classes(df_all):
+    """Satır sınıfı dizisi: 'high' > 'low' > 'normal'."""
+    is_high = pd.Series(False, index=df_all.index)
+    is_low = pd.Series(False, index=df_all.index)
+    for sc in _status_columns(df_all):
+        values = df_all[sc].fillna("").astype(str)
+        is_high |= _on_unique(values, lambda u: u.str.lower().str.contains(HIGH_PATTERN, regex=True)).astype(bool)
+        is_low |= _on_unique(values, lambda u: u.str.lower().str.contains(LOW_PATTERN, regex=True)).astype(bool)
+    return np.where(is_high, "high", np.where(is_low, "low", "normal"))
+
+def _dominance_frame(counts):
+    """counts: profile index'li (ilk görülme sırasında) high/low/normal tablosu."""
+    # en çok görülen önce; eşitlikte ilk görülme sırası korunur
+    order = counts.sum(axis=1).sort_values(ascending=False, kind="stable").index
+    counts = counts.loc[order]
+    return pd.DataFrame({
+        "Profile": counts.index.tolist(),
+        "Baskın Yüksek": counts["high"].to_numpy(),
+        "Baskın Düşük": counts["low"].to_numpy(),
+        "Normal": counts["normal"].to_numpy(),
+    })
+
+def _first_mode(profiles, values):
+    """Profil başına en sık değer; eşitlikte ilk görülen (Counter.most_common ile aynı)."""
+    frame = pd.DataFrame({"profile": profiles, "value": values})
+    frame = frame[frame["value"] != ""]
+    if frame.empty:
+        return pd.Series(dtype=object)
+    counts = frame.groupby(["profile", "value"], sort=False).size().reset_index(name="n")
+    best = counts.sort_values("n", ascending=False, kind="stable").drop_duplicates("profile")
+    return best.set_index("profile")["value"]
+
+# ProfileStats ortalama sütunları: (çıktı adı, log sütunu, yalnız pozitifler, basamak)
+MEAN_COLUMNS = (
+    [(f"Avg_Score_{b}", f"score_{b.lower()}", False, 2) for b in BANDS]
+    + [(f"Avg_Pct_{b}", f"pct_{b.lower()}", True, 4) for b in BANDS]
+    + [(f"Avg_PctWindow_{b}", f"pct_{b.lower()}_window", True, 4) for b in BANDS]
+)
+
+def _band_inputs(df_all, exploded):
+    """ProfileStats için açılmış satırların girdileri.
+
+    Dönüş: (profiles, numeric, levels, valid) - pct_* toplamı 0 olan satırlar çıkarılmış halde.
+    numeric: log sütunu -> float dizisi, levels: band -> seviye dizisi (sütun yoksa None),
+    valid: açılmış satırlardan hangilerinin kullanıldığı."""
+    numeric = {}
+    for _, c, _, _ in MEAN_COLUMNS:
+        if c in df_all.columns and c not in numeric:
+            numeric[c] = pd.to_numeric(df_all[c], errors="coerce").loc[exploded.index].to_numpy(dtype=float)
+
+    # Drop rows where all pct_* are zero or NaN (no usable percentage data)
+    pct_values = [numeric[f"pct_{b.lower()}"] for b in BANDS if f"pct_{b.lower()}" in numeric]
+    if pct_values:
+        valid = np.nansum(np.vstack(pct_values), axis=0) > 0.0
+    else:
+        valid = np.ones(len(exploded), dtype=bool)
+
+    levels = {}
+    for b in BANDS:
+        c = f"level_{b.lower()}"
+        if c in df_all.columns:
+            values = _on_unique(df_all[c].fillna("").astype(str), lambda u: u.str.strip())
+            levels[b] = values.loc[exploded.index].to_numpy()[valid]
         else:
-            cls = "normal"
-        for p in profs:
-            name = normalize_profile_name(p)
-            if not name:
-                continue
-            if name not in counts:
-                counts[name] = {"high":0, "low":0, "normal":0}
-            counts[name][cls] += 1
-
-    rows = []
-    for prof, c in sorted(counts.items(), key=lambda x: sum(x[1].values()), reverse=True):
-        rows.append({
-            "Profile": prof,
-            "Baskın Yüksek": c.get("high", 0),
-            "Baskın Düşük": c.get("low", 0),
-            "Normal": c.get("normal", 0)
-        })
-    return pd.DataFrame(rows)
-
-def compute_profile_band_stats(df_all, prof_col="en_iyi_profiller"):
+            levels[b] = None
+    numeric = {c: v[valid] for c, v in numeric.items()}
+    return exploded["profile"].to_numpy()[valid], numeric, levels, valid
+
+def _band_stats_frame(counts, columns):
+    """Profil sayıları ve profil index'li sütun serilerinden ProfileStats tablosu."""
+    df_result = pd.DataFrame({
+        "Profile": counts.index.tolist(),
+        "5_Uyumlu": counts["c5"].to_numpy(),
+        "4_Uyumlu": counts["c4"].to_numpy(),
+        "Toplam": (counts["c5"] + counts["c4"]).to_numpy(),
+    })
+    for name, series in columns.items():
+        values = series.reindex(counts.index)
+        if name.startswith("Mode_Level_"):
+            df_result[name] = values.astype(object).where(values.notna(), None).to_numpy()
+        else:
+            df_result[name] = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+
+    # Sort by total occurrences
+    if "Toplam" in df_result.columns:
+        df_result = df_result.sort_values("Toplam", ascending=False).reset_index(drop=True)
+
+    return df_result
+
+def compute_profile_band_stats(df_all, prof_col="en_iyi_profiller", exploded=None):
     """
     Compute profile-level band statistics including:
     - Profile name
@@ -148,238 +247,381 @@ def compute_profile_band_stats(df_all, prof_col="en_iyi_profiller"):
     - Average pct_window per band (pct_delta_window, etc.)
     - Mode (most frequent) of each level (level_delta, level_theta, etc.)
     """
-    # Count 5-match and 4-match
-    counts_5 = {}
-    counts_4 = {}
-    
-    # Initialize band stats accumulators per profile
-    profile_rows = {}  # profile -> list of row indices
-    
-    bands = ["Delta", "Theta", "Alpha", "Beta", "Gamma"]
-    
-    for idx, row in df_all.iterrows():
-        profs_raw = (row.get(prof_col, "") or "")
-        if not profs_raw:
-            continue
-        
-        parts = [p.strip() for p in str(profs_raw).split(",") if p.strip()]
-        
-        for p in parts:
-            # Check if 4-match
-            is_4 = bool(re.search(r"\(.*?4\s*uyumlu.*?\)", p, flags=re.IGNORECASE) or 
-                       re.search(r"\b4\s*uyumlu\b", p, flags=re.IGNORECASE))
-            base = normalize_profile_name(p)
-            if not base:
+    if exploded is None:
+        exploded = explode_profiles(df_all, prof_col)
+    counts = _profile_counts(exploded)
+    profiles, numeric, levels, _ = _band_inputs(df_all, exploded)
+
+    # profile göre kararlı sıralama: her profilin satırları bitişik ve log sırasında kalır
+    codes, uniques = pd.factorize(profiles)
+    order = np.argsort(codes, kind="stable")
+    starts = np.searchsorted(codes[order], np.arange(len(uniques)))
+    ends = np.append(starts[1:], len(order))
+
+    def grouped_mean(values, positive_only, digits):
+        if values is None:
+            return pd.Series(dtype=float)
+        values = values[order]
+        means = []
+        for start, end in zip(starts, ends):
+            seg = values[start:end]
+            if positive_only:
+                seg = seg[seg > 0]  # ignore 0 and NaN
+                count = len(seg)
+            else:
+                nan_mask = np.isnan(seg)
+                count = len(seg) - int(nan_mask.sum())
+                seg = np.where(nan_mask, 0.0, seg)
+            # Series.mean ile aynı toplama sırası, yuvarlamada fark oluşmaz
+            means.append(round(float(seg.sum() / count), digits) if count else None)
+        return pd.Series(means, index=uniques, dtype=object)
+
+    columns = {}
+    for name, c, positive_only, digits in MEAN_COLUMNS:
+        columns[name] = grouped_mean(numeric.get(c), positive_only, digits)
+    for b in BANDS:
+        columns[f"Mode_Level_{b}"] = _first_mode(profiles, levels[b]) if levels[b] is not None else pd.Series(dtype=object)
+
+    return _band_stats_frame(counts, columns)
+
+
+def _merge_parts(old, new, how="sum"):
+    """Parça bazlı kısmi toplamları index üzerinden birleştirir (how: sum ya da sütun -> fonksiyon dict'i)."""
+    if old is None:
+        return new
+    levels = list(range(new.index.nlevels))
+    return pd.concat([old, new]).groupby(level=levels).agg(how)
+
+class SummaryAccumulator:
+    """Log satırlarını parça parça alıp özet sayfalarını üreten toplayıcı.
+
+    Bellekte yalnızca kısmi toplamlar tutulur: event/profil sayıları, dominance sayıları,
+    ortalamalar için toplam ve adetler, mod için seviye frekansları. Böylece RAM'den büyük
+    log'lar da chunk'lar halinde özetlenebilir; sonuç sayfaları tüm log'la üretilenlerle aynıdır.
+    """
+
+    def __init__(self, prof_col="En_Iyi_Profiller", event_col="event"):
+        self.prof_col = prof_col
+        self.event_col = event_col
+        self.rows = 0
+        self.has_events = False
+        self._seen = 0  # açılmış profil satırı sayacı (ilk görülme sırası için)
+        self._event_rows = None  # event -> satır sayısı
+        self._sizes = None  # (event, profile, is_4) -> adet
+        self._dominance = None  # profile -> high/low/normal/first
+        self._sums = None  # profile -> MEAN_COLUMNS toplamları
+        self._counts = None  # profile -> MEAN_COLUMNS adetleri
+        self._levels = None  # (band, profile, level) -> n/first
+
+    def add(self, df):
+        """Log satırlarından oluşan bir DataFrame'i (dtype=str, fillna("")) ekler."""
+        if df is None or df.empty:
+            return
+        df = df.reset_index(drop=True)
+        self.has_events = self.has_events or self.event_col in df.columns
+        events = df[self.event_col].fillna("").astype(str) if self.event_col in df.columns else pd.Series("", index=df.index)
+        self.rows += len(df)
+        self._event_rows = _merge_parts(self._event_rows, events.value_counts(sort=False))
+
+        exploded = explode_profiles(df, self.prof_col)
+        ordinal = self._seen + np.arange(len(exploded))
+        self._seen += len(exploded)
+        if exploded.empty:
+            return
+
+        ev = events.loc[exploded.index].to_numpy()
+        self._sizes = _merge_parts(self._sizes, exploded.assign(event=ev).groupby(["event", "profile", "is_4"]).size())
+
+        # dominance: satır sınıfı sayıları ve profilin ilk görüldüğü sıra
+        classes = pd.Series(_row_classes(df), index=df.index).loc[exploded.index].to_numpy()
+        dom = pd.crosstab(exploded["profile"].to_numpy(), classes).reindex(columns=["high", "low", "normal"], fill_value=0)
+        dom["first"] = pd.Series(ordinal, index=exploded["profile"].to_numpy()).groupby(level=0).min()
+        self._dominance = _merge_parts(self._dominance, dom, {"high": "sum", "low": "sum", "normal": "sum", "first": "min"})
+
+        # ProfileStats: ortalamalar için toplam/adet, mod için seviye frekansları
+        profiles, numeric, levels, valid = _band_inputs(df, exploded)
+        if len(profiles) == 0:
+            return
+        sums, counts = {}, {}
+        for name, c, positive_only, _ in MEAN_COLUMNS:
+            if c not in numeric:
+                continue
+            values = numeric[c]
+            mask = values > 0 if positive_only else ~np.isnan(values)
+            sums[name] = pd.Series(np.where(mask, values, 0.0)).groupby(profiles).sum()
+            counts[name] = pd.Series(mask.astype("int64")).groupby(profiles).sum()
+        if sums:
+            self._sums = _merge_parts(self._sums, pd.DataFrame(sums))
+            self._counts = _merge_parts(self._counts, pd.DataFrame(counts))
+
+        valid_ordinal = ordinal[valid]
+        parts = []
+        for b in BANDS:
+            if levels[b] is None:
                 continue
-            
-            # Count matches
-            if is_4:
-                counts_4[base] = counts_4.get(base, 0) + 1
+            frame = pd.DataFrame({"band": b, "profile": profiles, "level": levels[b], "ordinal": valid_ordinal})
+            frame = frame[frame["level"] != ""]
+            parts.append(frame.groupby(["band", "profile", "level"]).agg(n=("ordinal", "size"), first=("ordinal", "min")))
+        if parts:
+            self._levels = _merge_parts(self._levels, pd.concat(parts), {"n": "sum", "first": "min"})
+
+    def _profile_sizes(self):
+        if self._sizes is None:
+            return pd.Series(dtype="int64")
+        return self._sizes.groupby(level=["profile", "is_4"]).sum()
+
+    def event_summaries(self):
+        """{event: aggregate_event sonucu}, event adına göre sıralı."""
+        events = sorted(self._event_rows.index) if self._event_rows is not None else []
+        out = {}
+        for ev in events:
+            if self._sizes is not None and ev in self._sizes.index.get_level_values("event"):
+                out[ev] = _event_summary(_counts_frame(self._sizes.xs(ev, level="event")))
             else:
-                counts_5[base] = counts_5.get(base, 0) + 1
-            
-            # Store row index for this profile
-            if base not in profile_rows:
-                profile_rows[base] = []
-            profile_rows[base].append(idx)
-    
-    # Helper function to safely check if column exists
-    def col(name):
-        return name if name in df_all.columns else None
-    
-    # Build robust column mappings
-    score_cols = {
-        "Delta": col("score_delta"),
-        "Theta": col("score_theta"),
-        "Alpha": col("score_alpha"),
-        "Beta":  col("score_beta"),
-        "Gamma": col("score_gamma"),
-    }
-    
-    pct_cols = {
-        "Delta": col("pct_delta"),
-        "Theta": col("pct_theta"),
-        "Alpha": col("pct_alpha"),
-        "Beta":  col("pct_beta"),
-        "Gamma": col("pct_gamma"),
+                out[ev] = _event_summary(_counts_frame(pd.Series(dtype="int64")))
+        return out
+
+    def total_summary(self):
+        return _event_summary(_counts_frame(self._profile_sizes()))
+
+    def dominance_summary(self):
+        if self._dominance is None:
+            return pd.DataFrame(columns=["Profile", "Baskın Yüksek", "Baskın Düşük", "Normal"])
+        counts = self._dominance.sort_values("first")[["high", "low", "normal"]].astype("int64")
+        return _dominance_frame(counts)
+
+    def band_stats(self):
+        counts = _counts_frame(self._profile_sizes())
+        columns = {}
+        for name, _, _, digits in MEAN_COLUMNS:
+            if self._sums is not None and name in self._sums.columns:
+                n = self._counts[name]
+                means = self._sums[name][n > 0] / n[n > 0]
+                columns[name] = means.map(lambda m: round(float(m), digits))
+            else:
+                columns[name] = pd.Series(dtype=float)
+        for b in BANDS:
+            modes = pd.Series(dtype=object)
+            if self._levels is not None and b in self._levels.index.get_level_values("band"):
+                freq = self._levels.xs(b, level="band").reset_index()
+                # en sık seviye; eşitlikte ilk görülen
+                best = freq.sort_values(["n", "first"], ascending=[False, True]).drop_duplicates("profile")
+                modes = best.set_index("profile")["level"]
+            columns[f"Mode_Level_{b}"] = modes
+        return _band_stats_frame(counts, columns)
+
+    def summary_parts(self):
+        """save_summary için (summaries, dominance_df, stats_df); summaries'de Toplam ilk sıradadır."""
+        summaries = self.event_summaries() if self.has_events else {}
+        summaries = {"Toplam": self.total_summary(), **{k: v for k, v in summaries.items() if k != "Toplam"}}
+        return summaries, self.dominance_summary(), self.band_stats()
+
+
+# Excel sayfa adı: en fazla 31 karakter, []:*?/\ içermez, büyük/küçük harf duyarsız tekildir
+SHEET_NAME_MAX = 31
+_INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+
+def _unique_sheet_name(name: str, used: set) -> str:
+    """Geçersiz karakterleri "_" yapar, 31 karaktere kırpar; alınmış (büyük/küçük harf
+    duyarsız) adlara ~2, ~3 ... eki ekler. Böylece her Excel engine'i aynı kitabı yazar."""
+    base = _INVALID_SHEET_CHARS.sub("_", name).strip("'")[:SHEET_NAME_MAX] or "event"
+    sheet, n = base, 2
+    while sheet.lower() in used:
+        suffix = f"~{n}"
+        sheet = base[:SHEET_NAME_MAX - len(suffix)] + suffix
+        n += 1
+    used.add(sheet.lower())
+    return sheet
+
+
+def summary_sheets(summary_dict, dominance_df=None, stats_df=None):
+    """Özet sayfalarını Excel'deki sırasıyla (sayfa adı, DataFrame) listesi olarak döndürür:
+    Toplam, Dominance, ProfileStats, ardından her event (tekil sayfa adlarıyla)."""
+    sheets = []
+    # Toplam sheet first if present
+    if "Toplam" in summary_dict:
+        sheets.append(("Toplam", summary_dict["Toplam"]))
+    # dominance summary next (if provided)
+    if dominance_df is not None:
+        sheets.append(("Dominance", dominance_df))
+    # ProfileStats sheet (if provided)
+    if stats_df is not None:
+        sheets.append(("ProfileStats", stats_df))
+    # then each event
+    used = {name.lower() for name, _ in sheets}
+    for event, df in summary_dict.items():
+        if event == "Toplam":
+            continue
+        sheets.append((_unique_sheet_name(str(event), used), df))
+    return sheets
+
+def save_multi_sheet(summary_dict, out_path, dominance_df=None, stats_df=None, engine=None):
+    # sayfalar satır satır yazılır (excel_writer; engine=None -> xlsxwriter varsa o, yoksa openpyxl)
+    return write_sheets(summary_sheets(summary_dict, dominance_df, stats_df), out_path, engine=engine)
+
+def _json_safe_records(df):
+    """DataFrame'i JSON'a uygun kayıt listesine çevirir (NaN/inf -> None)."""
+    df = df.replace([np.inf, -np.inf], np.nan)
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict(orient="records")
+
+def save_summary_json(sheets, out_path, run_id=None, partial=False):
+    """Özet sayfalarını viewer'ın doğrudan sunabileceği JSON olarak kaydeder.
+
+    Args:
+        sheets: summary_sheets() çıktısı, [(sayfa adı, DataFrame), ...]
+        out_path: JSON dosya yolu (profile_summary{run_id}.json)
+        run_id: Run ID (dosyaya bilgi amaçlı yazılır)
+        partial: Run henüz sürüyorsa True (ara özet)
+    """
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    payload = {
+        "run_id": None if run_id is None else str(run_id),
+        "partial": bool(partial),
+        "sheet_names": [name for name, _ in sheets],
+        "sheets": {name: _json_safe_records(df) for name, df in sheets},
     }
-    
-    pct_window_cols = {
-        "Delta": col("pct_delta_window"),
-        "Theta": col("pct_theta_window"),
-        "Alpha": col("pct_alpha_window"),
-        "Beta":  col("pct_beta_window"),
-        "Gamma": col("pct_gamma_window"),
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+    os.replace(tmp_path, out_path)
+    return out_path
+
+def save_summary(summaries, dominance_df, stats_df, out_dir, run_id, partial=False):
+    """profile_summary{run_id}.xlsx ve .json dosyalarını yazar, xlsx yolunu döndürür.
+
+    partial=True iken (run sürerken) yalnızca JSON yazılır ve None döner.
+    """
+    sheets = summary_sheets(summaries, dominance_df, stats_df)
+    out_path = None
+    if not partial:
+        out_path = os.path.join(out_dir, f"profile_summary{run_id}.xlsx")
+        save_multi_sheet(summaries, out_path, dominance_df=dominance_df, stats_df=stats_df)
+    # Viewer için Excel'i her istekte parse etmek yerine hazır JSON (xlsx'ten sonra yazılır)
+    save_summary_json(sheets, os.path.join(out_dir, f"profile_summary{run_id}.json"), run_id=run_id, partial=partial)
+    return out_path
+
+DIAG_SAMPLE_ROWS = 5
+DIAG_UNIQUE_SAMPLES = 50
+
+def _log_diagnostics(df, prof_col):
+    """Hızlı analiz çıktısı için sayaçlar ve örnekler (chunk'lar _merge_diagnostics ile birleşir)."""
+    col = df[prof_col].fillna("").astype(str).str.strip()
+    display_cols = [c for c in ["event", "person_name", "source_file", prof_col] if c in df.columns]
+    uniques = []
+    for v in df[prof_col].dropna().astype(str).unique():
+        if len(uniques) >= DIAG_UNIQUE_SAMPLES:
+            break
+        uniques.append(v)
+    return {
+        "total": len(df),
+        "empty": int((col == "").sum()),
+        "nan_like": int(col.str.lower().isin(["nan","none","na"]).sum()),
+        "events": df["event"].value_counts() if "event" in df.columns else None,
+        "empty_rows": df[col == ""].head(DIAG_SAMPLE_ROWS)[display_cols],
+        "filled_rows": df[col != ""].head(DIAG_SAMPLE_ROWS)[display_cols],
+        "uniques": uniques,
     }
-    
-    level_cols = {
-        "Delta": col("level_delta"),
-        "Theta": col("level_theta"),
-        "Alpha": col("level_alpha"),
-        "Beta":  col("level_beta"),
-        "Gamma": col("level_gamma"),
+
+def _merge_diagnostics(a, b):
+    if a is None:
+        return b
+    events = a["events"]
+    if b["events"] is not None:
+        events = b["events"] if events is None else events.add(b["events"], fill_value=0).astype("int64").sort_values(ascending=False)
+    uniques = a["uniques"] + [v for v in b["uniques"] if v not in a["uniques"]]
+    return {
+        "total": a["total"] + b["total"],
+        "empty": a["empty"] + b["empty"],
+        "nan_like": a["nan_like"] + b["nan_like"],
+        "events": events,
+        "empty_rows": pd.concat([a["empty_rows"], b["empty_rows"]]).head(DIAG_SAMPLE_ROWS),
+        "filled_rows": pd.concat([a["filled_rows"], b["filled_rows"]]).head(DIAG_SAMPLE_ROWS),
+        "uniques": uniques[:DIAG_UNIQUE_SAMPLES],
     }
-    
-    # Build output DataFrame
-    results = []
-    profiles = sorted(set(list(counts_5.keys()) + list(counts_4.keys())))
-    
-    for prof in profiles:
-        c5 = counts_5.get(prof, 0)
-        c4 = counts_4.get(prof, 0)
-        
-        row_data = {
-            "Profile": prof,
-            "5_Uyumlu": c5,
-            "4_Uyumlu": c4,
-            "Toplam": c5 + c4
-        }
-        
-        # Get subset of rows for this profile
-        row_indices = profile_rows.get(prof, [])
-        if row_indices:
-            sub = df_all.loc[row_indices]
-            
-            # Drop rows where all pct_* are zero or NaN (no usable percentage data)
-            pct_cols_list = [pct_cols[b] for b in bands if pct_cols.get(b)]
-            if pct_cols_list:
-                pct_block = sub[pct_cols_list].apply(pd.to_numeric, errors="coerce").fillna(0.0)
-                pct_sum = pct_block.sum(axis=1)
-                sub = sub[pct_sum > 0.0]
-            
-            # If no valid rows remain, skip averaging
-            if sub.empty:
-                for b in bands:
-                    row_data[f"Avg_Score_{b}"] = None
-                    row_data[f"Avg_Pct_{b}"] = None
-                    row_data[f"Avg_PctWindow_{b}"] = None
-                    row_data[f"Mode_Level_{b}"] = None
-            else:
-                # Add average scores per band
-                for b in bands:
-                    c = score_cols.get(b)
-                    if c and c in sub.columns:
-                        vals = pd.to_numeric(sub[c], errors="coerce")
-                        row_data[f"Avg_Score_{b}"] = round(float(vals.mean(skipna=True)), 2) if not vals.isna().all() else None
-                    else:
-                        row_data[f"Avg_Score_{b}"] = None
-                
-                # Average global pct per band (ignore zeros and NaN)
-                for b in bands:
-                    c = pct_cols.get(b)
-                    key = f"Avg_Pct_{b}"
-                    if c and c in sub.columns:
-                        vals = pd.to_numeric(sub[c], errors="coerce")
-                        vals = vals[vals > 0]  # ignore 0 and NaN
-                        row_data[key] = round(float(vals.mean()), 4) if not vals.empty else None
-                    else:
-                        row_data[key] = None
-                
-                # Average window-filtered pct per band (ignore zeros and NaN)
-                for b in bands:
-                    c = pct_window_cols.get(b)
-                    key = f"Avg_PctWindow_{b}"
-                    if c and c in sub.columns:
-                        vals = pd.to_numeric(sub[c], errors="coerce")
-                        vals = vals[vals > 0]  # ignore 0 and NaN
-                        row_data[key] = round(float(vals.mean()), 4) if not vals.empty else None
-                    else:
-                        row_data[key] = None
-                
-                # Add mode (most frequent level) per band
-                for b in bands:
-                    c = level_cols.get(b)
-                    if c and c in sub.columns:
-                        levels = sub[c].dropna().astype(str).str.strip()
-                        levels = levels[levels != ""]
-                        if not levels.empty:
-                            from collections import Counter
-                            counter = Counter(levels)
-                            most_common = counter.most_common(1)[0][0]
-                            row_data[f"Mode_Level_{b}"] = most_common
-                        else:
-                            row_data[f"Mode_Level_{b}"] = None
-                    else:
-                        row_data[f"Mode_Level_{b}"] = None
-        else:
-            # No rows for this profile - set all to None
-            for b in bands:
-                row_data[f"Avg_Score_{b}"] = None
-                row_data[f"Avg_Pct_{b}"] = None
-                row_data[f"Avg_PctWindow_{b}"] = None
-                row_data[f"Mode_Level_{b}"] = None
-        
-        results.append(row_data)
-    
-    df_result = pd.DataFrame(results)
-    
-    # Sort by total occurrences
-    if "Toplam" in df_result.columns:
-        df_result = df_result.sort_values("Toplam", ascending=False).reset_index(drop=True)
-    
-    return df_result
 
+def _print_diagnostics(diagnostics, prof_col):
+    print("\n🔧 Hızlı Analiz:")
+    total = diagnostics["total"]
+    print(f"Toplam satır: {total}")
+    empty_cnt = diagnostics["empty"]
+    print(f"{prof_col}: boş/'' = {empty_cnt}, nan-like = {diagnostics['nan_like']}, dolu satır = {total - empty_cnt}")
 
-def save_multi_sheet(summary_dict, out_path, dominance_df=None, stats_df=None):
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
-        # write Toplam sheet first if present
-        if "Toplam" in summary_dict:
-            df_total = summary_dict.pop("Toplam")
-            sheet = "Toplam"[:31]
-            df_total.to_excel(writer, sheet_name=sheet or "Toplam", index=False)
-        # write dominance summary next (if provided)
-        if dominance_df is not None:
-            sheet = "Dominance"[:31]
-            dominance_df.to_excel(writer, sheet_name=sheet or "Dominance", index=False)
-        # write ProfileStats sheet (if provided)
-        if stats_df is not None:
-            sheet = "ProfileStats"[:31]
-            stats_df.to_excel(writer, sheet_name=sheet or "ProfileStats", index=False)
-        # then write each event
-        for event, df in summary_dict.items():
-            sheet = str(event).replace("/", "_").replace("\\", "_")[:31]
-            df.to_excel(writer, sheet_name=sheet or "event", index=False)
-    return out_path
+    if diagnostics["events"] is not None:
+        print("Event dağılımı (ilk 20):")
+        print(diagnostics["events"].head(20))
+    else:
+        print("event sütunu yok")
+
+    print(f"{prof_col} boş satır sayısı: {empty_cnt}. İlk {DIAG_SAMPLE_ROWS} örnek:")
+    if len(diagnostics["empty_rows"].columns):
+        print(diagnostics["empty_rows"])
 
-def main(log_arg=None, out_arg=None, run_id_arg=None):
+    print(f"{prof_col} dolu örnekler (ilk {DIAG_SAMPLE_ROWS}):")
+    if len(diagnostics["filled_rows"].columns):
+        print(diagnostics["filled_rows"])
+
+    # Kontrol: farklı türde NaN/None stringlerinin varlığı
+    print(f"{prof_col} unique örnekleri (örnek {DIAG_UNIQUE_SAMPLES}):")
+    print(np.array(diagnostics["uniques"], dtype=object))
+
+def main(log_arg=None, out_arg=None, run_id_arg=None, chunksize=None):
+    """Log'dan profile_summary{run_id}.xlsx/.json üretir.
+
+    chunksize verilirse (ya da log STREAMING_MIN_BYTES'tan büyükse) log chunk'lar halinde
+    okunur ve SummaryAccumulator ile özetlenir; bellek kullanımı log boyutundan bağımsızdır.
+    """
     log_path = find_log(log_arg)
     if not log_path:
         print("processing_log.csv bulunamadı. Yol verin veya log'u varsayılan konumdaki dosyayı oluşturun.")
         sys.exit(1)
     print(f"Log dosyası: {log_path}")
 
-    df = pd.read_csv(log_path, encoding="utf-8", dtype=str).fillna("")
+    columns = pd.read_csv(log_path, encoding="utf-8", dtype=str, nrows=0).columns
     # detect column name - prefer En_Iyi_Profiller (preserves 4-match tags), fallback to other variants
     prof_col = None
     for c in ["En_Iyi_Profiller", "en_iyi_profiller", "best_profile", "en_iyi_profiler"]:
-        if c in df.columns:
+        if c in columns:
             prof_col = c
             break
     if prof_col is None:
         raise RuntimeError("Log dosyasında 'best_profile' veya 'en_iyi_profiller' sütunu bulunamadı.")
+    event_col = "event" if "event" in columns else None
 
-    event_col = "event" if "event" in df.columns else None
-    if event_col is None:
-        # if no event column, treat entire file as single event named 'Toplam'
-        event_groups = {"Toplam": df}
-    else:
-        event_groups = {ev: grp for ev, grp in df.groupby(event_col)}
+    if chunksize is None and os.path.getsize(log_path) > STREAMING_MIN_BYTES:
+        chunksize = SUMMARY_CHUNK_ROWS
 
-    summaries = {}
-    # build per-event summaries
-    for event, group in event_groups.items():
-        summaries[event] = aggregate_event(group, prof_col=prof_col)
+    if chunksize:
+        print(f"Log chunk'lar halinde özetleniyor ({chunksize} satır)")
+        acc = SummaryAccumulator(prof_col=prof_col, event_col=event_col or "event")
+        diagnostics = None
+        for chunk in pd.read_csv(log_path, encoding="utf-8", dtype=str, chunksize=chunksize):
+            chunk = chunk.fillna("")
+            acc.add(chunk)
+            diagnostics = _merge_diagnostics(diagnostics, _log_diagnostics(chunk, prof_col))
+        summaries, dominance_df, stats_df = acc.summary_parts()
+    else:
+        df = pd.read_csv(log_path, encoding="utf-8", dtype=str).fillna("")
+        # profil sütununu bir kez aç, tüm özetler aynı explode sonucunu kullanır
+        exploded = explode_profiles(df, prof_col)
+        if event_col is None:
+            # if no event column, treat entire file as single event named 'Toplam'
+            summaries = {}
+        else:
+            # build per-event summaries
+            summaries = aggregate_events(df, prof_col=prof_col, event_col=event_col, exploded=exploded)
 
-    # create total summary across all events (Toplam)
-    total_df = aggregate_event(df, prof_col=prof_col)
-    # compute dominance summary across all rows (single sheet)
-    dominance_df = compute_dominance_summary(df, prof_col=prof_col)
-    # compute profile band stats
-    stats_df = compute_profile_band_stats(df, prof_col=prof_col)
+        # create total summary across all events (Toplam)
+        total_df = _event_summary(_profile_counts(exploded))
+        # compute dominance summary across all rows (single sheet)
+        dominance_df = compute_dominance_summary(df, prof_col=prof_col, exploded=exploded)
+        # compute profile band stats
+        stats_df = compute_profile_band_stats(df, prof_col=prof_col, exploded=exploded)
+        diagnostics = _log_diagnostics(df, prof_col)
 
-    # ensure Toplam key exists and will be written first, and include dominance sheet
-    summaries = {"Toplam": total_df, **{k: v for k, v in summaries.items() if k != "Toplam"}}
+        # ensure Toplam key exists and will be written first, and include dominance sheet
+        summaries = {"Toplam": total_df, **{k: v for k, v in summaries.items() if k != "Toplam"}}
 
     # Use provided run_id or extract from log filename or use counter file
     run_id = run_id_arg
@@ -397,58 +639,19 @@ def main(log_arg=None, out_arg=None, run_id_arg=None):
         run_id = 1005
     
     out_dir = os.path.dirname(log_path) if out_arg is None else out_arg
-    out_path = os.path.join(out_dir, f"profile_summary{run_id}.xlsx")
-    save_multi_sheet(summaries, out_path, dominance_df=dominance_df, stats_df=stats_df)
-    print(f"Özet Excel kaydedildi: {out_path}")
+    out_path = save_summary(summaries, dominance_df, stats_df, out_dir, run_id)
+    print(f"Özet Excel/JSON kaydedildi: {out_path}")
 
     # Yeni: hızlı analiz için diagnostic script
-    print("\n🔧 Hızlı Analiz:")
-    total = len(df)
-    print(f"Toplam satır: {total}")
-
-    # Check for profile column with case variations - prefer En_Iyi_Profiller (preserves 4-match tags)
-    prof_col_name = None
-    for possible_name in ["En_Iyi_Profiller", "en_iyi_profiller", "best_profile", "en_iyi_profiler"]:
-        if possible_name in df.columns:
-            prof_col_name = possible_name
-            break
-    
-    if prof_col_name is None:
-        print("⚠️ 'best_profile' veya 'en_iyi_profiller' sütunu bulunmuyor.")
-    else:
-        col = df[prof_col_name].fillna("").astype(str)
-        empty_cnt = (col.str.strip() == "").sum()
-        nan_like_cnt = col.str.strip().str.lower().isin(["nan","none","na"]).sum()
-        non_empty_cnt = total - empty_cnt
-        print(f"{prof_col_name}: boş/'' = {empty_cnt}, nan-like = {nan_like_cnt}, dolu satır = {non_empty_cnt}")
-
-    if "event" in df.columns:
-        print("Event dağılımı (ilk 20):")
-        print(df["event"].value_counts().head(20))
-    else:
-        print("event sütunu yok")
-
-    # Only proceed with diagnostic if profile column exists
-    if prof_col_name is not None:
-        empty_rows = df[col.str.strip() == ""]
-        print(f"{prof_col_name} boş satır sayısı: {len(empty_rows)}. İlk {5} örnek:")
-        display_cols = ["event", "person_name", "source_file", prof_col_name]
-        available_cols = [c for c in display_cols if c in df.columns]
-        if available_cols:
-            print(empty_rows.head(5)[available_cols])
-
-        print(f"{prof_col_name} dolu örnekler (ilk {5}):")
-        if available_cols:
-            print(df[col.str.strip() != ""].head(5)[available_cols])
-
-        # Kontrol: farklı türde NaN/None stringlerinin varlığı
-        print(f"{prof_col_name} unique örnekleri (örnek 50):")
-        print(df[prof_col_name].dropna().astype(str).unique()[:50])
+    _print_diagnostics(diagnostics, prof_col)
 
     return 0
 
 if __name__ == "__main__":
-    arg1 = sys.argv[1] if len(sys.argv) > 1 else None
-    arg2 = sys.argv[2] if len(sys.argv) > 2 else None
-    main(arg1, arg2)
+    # kullanım: analyze_processing_log.py [log.csv] [çıktı_klasörü] [--chunksize=N]
+    chunk_arg = next((a for a in sys.argv[1:] if a.startswith("--chunksize=")), None)
+    args = [a for a in sys.argv[1:] if a != chunk_arg]
+    arg1 = args[0] if len(args) > 0 else None
+    arg2 = args[1] if len(args) > 1 else None
+    main(arg1, arg2, chunksize=int(chunk_arg.split("=", 1)[1]) if chunk_arg else None)
 
@@ -0,0 +1,223 @@
+import io
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import existing modules (also when run as a script)
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+
+from analytics5 import band_level_codes
+from profile_analyzer5 import BANDS, load_profile_masks, match_level_codes
+from app.core.relevel import LEVEL_CODES, MATCHER_CODES, band_dominance, effective_thresholds, profile_csv_path
+from app.models.config import RunConfig
+from app.models.runs import ClassifyRequest
+
+# Score vectors accepted per request
+MAX_CLASSIFY_ROWS = 100_000
+# CSV input: an optional id column and one score column per band ("Delta" or "score_delta", any case)
+ID_COLUMNS = ("id", "person_name")
+# CSV output, named as in the processing log
+OUTPUT_COLUMNS = (
+    ["id"]
+    + [f"level_{b.lower()}" for b in BANDS]
+    + [f"status_{b.lower()}" for b in BANDS]
+    + ["Dalga_Farki", "En_Iyi_Profiller", "Tam_Uyumlu_Profiller", "En_Iyi_Puan"]
+)
+
+_LEVEL_TEXTS = np.array(LEVEL_CODES, dtype=object)
+_BAND_KEYS = {key: i for i, b in enumerate(BANDS) for key in (b.lower(), f"score_{b.lower()}")}
+
+
+def classify_scores(
+    scores: np.ndarray,
+    compiled: Dict[str, Any],
+    band_thresholds: Dict | None = None,
+    balance_threshold: float = 22.0,
+    denge_mean_threshold: float = 46.0,
+    dominance_delta: float = 29.0
+) -> Dict[str, np.ndarray]:
+    """Classify (people x band) scores the way process_pipeline does, column-wise.
+
+    Levels (analytics5), Dalga_Farki, dominance (compute_dominance), profile match on the
+    distinct level combinations, Denge Ustası / Yüksek Bilinçli and the Gamma "Baskın Düşük"
+    rename. NaN scores are missing bands.
+    """
+    scores = np.asarray(scores, dtype=float).reshape(-1, len(BANDS))
+    n = len(scores)
+    codes = np.column_stack([band_level_codes(scores[:, i], band, band_thresholds) for i, band in enumerate(BANDS)]) \
+        if n else np.zeros((0, len(BANDS)), dtype=np.int8)
+    combos, inverse = np.unique(codes, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    matches = match_level_codes(MATCHER_CODES[combos], compiled)
+    best = matches["en_iyi_profiller"][inverse]
+    full = matches["tam_uyumlu_profiller"][inverse]
+    points = matches["en_iyi_puan"][inverse]
+
+    finite = np.isfinite(scores)
+    valid_count = finite.sum(axis=1)
+    spread = np.where(finite, scores, -np.inf).max(axis=1, initial=-np.inf) - np.where(finite, scores, np.inf).min(axis=1, initial=np.inf)
+    dalga = np.where(valid_count >= 2, np.round(spread, 2), np.nan)
+    score_sum = np.where(finite, scores, 0.0).sum(axis=1)
+    mean_score = np.divide(score_sum, valid_count, out=np.full(n, np.nan), where=valid_count > 0)
+
+    # Denge Ustası: small spread between bands overrides the profile match
+    denge = np.isfinite(dalga) & (dalga <= balance_threshold)
+    best[denge] = np.where(mean_score[denge] >= denge_mean_threshold, "YÜKSEK BİLİNÇLİ", "DENGE USTASI")
+    full[denge] = ""
+    points[denge] = 0
+
+    high, low = band_dominance(scores, dominance_delta)
+    dominance = np.where(high, "Baskın Yüksek", np.where(low, "Baskın Düşük", "normal")).astype(object)
+
+    # Gamma "Baskın Düşük" renames HUZUR ODAKLI YAŞAYAN
+    names, name_ids = np.unique(best.astype(str), return_inverse=True)
+    renameable = np.array([("HUZUR ODAKLI YAŞAYAN" in p and "BASKIN DÜŞÜK" not in p) for p in names], dtype=bool)
+    rename = low[:, -1] & renameable[name_ids.reshape(-1)]
+    best[rename] = [p.replace("HUZUR ODAKLI YAŞAYAN", "ZİHİN YOLCUSU") for p in best[rename]]
+
+    return {
+        "levels": _LEVEL_TEXTS[codes],
+        "dominance": dominance,
+        "dalga_farki": dalga,
+        "en_iyi_profiller": best,
+        "tam_uyumlu_profiller": full,
+        "en_iyi_puan": points,
+    }
+
+
+def _band_index(key: str) -> int | None:
+    """"Delta" / "delta" / "score_delta" -> index in BANDS"""
+    return _BAND_KEYS.get(str(key).strip().lower())
+
+
+def vectors_from_rows(rows) -> Tuple[List[str | None], np.ndarray]:
+    """ids and the (people x band) score matrix of ClassifyRequest.rows"""
+    scores = np.full((len(rows), len(BANDS)), np.nan)
+    for i, row in enumerate(rows):
+        for key, value in row.scores.items():
+            band = _band_index(key)
+            if band is not None and value is not None:
+                scores[i, band] = value
+    return [row.id for row in rows], scores
+
+
+def vectors_from_csv(content: bytes) -> Tuple[List[str | None], np.ndarray]:
+    """ids and the (people x band) score matrix of a CSV upload (comma or semicolon separated;
+    semicolon files may use decimal commas, e.g. "3,5")"""
+    df = pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    decimal_comma = len(df.columns) < 2
+    if decimal_comma:
+        df = pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False, encoding="utf-8-sig", sep=";")
+    band_columns = {_band_index(c): c for c in reversed(df.columns)}
+    if not any(i is not None for i in band_columns):
+        raise ValueError(f"CSV has no score columns (expected {', '.join(BANDS)} or score_<band>)")
+    scores = np.full((len(df), len(BANDS)), np.nan)
+    for i, column in band_columns.items():
+        if i is not None:
+            # cells are read as text, so read_csv's decimal="," would not apply to them
+            values = df[column].str.replace(",", ".", regex=False) if decimal_comma else df[column]
+            scores[:, i] = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+    id_column = next((c for c in df.columns if str(c).strip().lower() in ID_COLUMNS), None)
+    ids = df[id_column].tolist() if id_column else [None] * len(df)
+    return ids, scores
+
+
+def classify_vectors(request: ClassifyRequest, ids: List[str | None], scores: np.ndarray) -> Dict[str, Any]:
+    """Classify score vectors with the request's profile set and thresholds (RunConfig defaults when unset)"""
+    if len(ids) > MAX_CLASSIFY_ROWS:
+        raise ValueError(f"Too many score vectors: {len(ids)} (max {MAX_CLASSIFY_ROWS})")
+    config = RunConfig(**request.model_dump(exclude_none=True, exclude={"band_thresholds", "rows"}))
+    started = time.perf_counter()
+    result = classify_scores(
+        scores,
+        load_profile_masks(str(profile_csv_path(config.profile_set_id))),
+        band_thresholds=effective_thresholds(config.band_thresholds, request.band_thresholds),
+        balance_threshold=config.balance_threshold,
+        denge_mean_threshold=config.denge_mean_threshold,
+        dominance_delta=config.dominance_delta
+    )
+    return {
+        "profile_set_id": config.profile_set_id,
+        "count": len(ids),
+        "ids": ids,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        **result,
+    }
+
+
+def result_records(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-person JSON records of a classify_vectors result"""
+    records = []
+    for i, person_id in enumerate(result["ids"]):
+        dalga = result["dalga_farki"][i]
+        records.append({
+            "id": person_id,
+            "levels": dict(zip(BANDS, result["levels"][i])),
+            "dominance": dict(zip(BANDS, result["dominance"][i])),
+            "dalga_farki": None if np.isnan(dalga) else float(dalga),
+            "en_iyi_profiller": result["en_iyi_profiller"][i],
+            "tam_uyumlu_profiller": result["tam_uyumlu_profiller"][i],
+            "en_iyi_puan": int(result["en_iyi_puan"][i]),
+        })
+    return records
+
+
+def result_csv(result: Dict[str, Any]) -> str:
+    """classify_vectors result as CSV (processing log column names)"""
+    df = pd.DataFrame({
+        "id": result["ids"],
+        **{f"level_{b.lower()}": result["levels"][:, i] for i, b in enumerate(BANDS)},
+        **{f"status_{b.lower()}": result["dominance"][:, i] for i, b in enumerate(BANDS)},
+        "Dalga_Farki": result["dalga_farki"],
+        "En_Iyi_Profiller": result["en_iyi_profiller"],
+        "Tam_Uyumlu_Profiller": result["tam_uyumlu_profiller"],
+        "En_Iyi_Puan": result["en_iyi_puan"],
+    }, columns=OUTPUT_COLUMNS)
+    return df.to_csv(index=False)
+
+
+def benchmark(rows: int = 10_000, profile_set_id: str = "meditasyon") -> List[tuple]:
+    """classify_scores vs the per-person pipeline path (analyze_profiles_from_metrics) on random scores"""
+    import contextlib
+    import os
+    from analytics5 import band_level_text
+    from profile_analyzer5 import analyze_profiles_from_metrics
+
+    profile_path = str(profile_csv_path(profile_set_id))
+    scores = np.round(np.random.default_rng(0).uniform(0, 100, (rows, len(BANDS))), 2)
+    compiled = load_profile_masks(profile_path)
+    classify_scores(scores[:10], compiled)  # warm-up (compiled masks, numpy)
+
+    results = []
+    t0 = time.perf_counter()
+    classify_scores(scores, compiled)
+    results.append(("classify_scores", rows, time.perf_counter() - t0))
+
+    # The scalar path prints debug lines per person; sample it and keep stdout quiet
+    sample = scores[:min(rows, 1000)]
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        t0 = time.perf_counter()
+        for vector in sample:
+            band_scores = dict(zip(BANDS, vector.tolist()))
+            metrics = {
+                "scores": band_scores,
+                "levels": {b: band_level_text(v, b, None) for b, v in band_scores.items()},
+                "dalga_farki": round(max(vector) - min(vector), 2),
+            }
+            analyze_profiles_from_metrics("benchmark", metrics, profile_csv_path=profile_path)
+        results.append(("per-person", len(sample), time.perf_counter() - t0))
+
+    print(f"📊 Classify benchmark ({profile_set_id})")
+    print(f"{'Path':<18} {'Rows':>8} {'Time (s)':>10} {'Rows/s':>12}")
+    for path, n, elapsed in results:
+        print(f"{path:<18} {n:>8} {elapsed:>10.3f} {n / elapsed:>12.0f}")
+    return results
+
+
+# Throughput benchmark: python -m app.core.classify [rows] (from backend/)
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
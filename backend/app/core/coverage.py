@@ -0,0 +1,91 @@
+import time
+from typing import Any, Dict
+
+import numpy as np
+
+from profile_analyzer5 import (
+    BANDS,
+    LEVEL_CODE_EMPTY,
+    TOK5_ASCII,
+    compile_profile_masks,
+    compile_profile_rules,
+    extract_profile_cells,
+    load_profile_masks,
+    match_level_codes,
+    pack_level_codes,
+    unpack_level_codes,
+)
+from app.core import results_store
+from app.core.profiles_manager import profile_set_frame
+from app.core.relevel import profile_csv_path
+from app.models.profiles import ProfileSet
+
+# Every canonical level combination as profile_analyzer5 level codes (Delta first): 5^5 = 3125 rows
+ALL_COMBINATIONS = np.indices((len(TOK5_ASCII),) * len(BANDS)).reshape(len(BANDS), -1).T
+# Level names as the profile set editor spells them, indexed by level code
+LEVEL_NAMES = ("düşük", "düşük orta", "orta", "yüksek orta", "yüksek", "", "?")
+STATUSES = ("covered", "ambiguous", "unmatched")
+
+
+def profile_set_coverage(compiled: Dict[str, Any], last_runs: int = 50) -> Dict[str, Any]:
+    """Classify every level combination against a compiled profile set (profile_analyzer5.compile_profile_masks).
+
+    A combination is unmatched when no profile gets 5 or 4 matching bands, ambiguous when
+    several profiles share the best score (tie-broken for 4-match), covered otherwise.
+    People per combination come from the results store's recent runs; observed combinations
+    with a missing or unrecognised level are classified too and only count towards `people`.
+    The Denge Ustası override and the Gamma rename are not applied.
+    """
+    started = time.perf_counter()
+    observed = results_store.level_combination_counts(last_runs=last_runs)
+    grid = pack_level_codes(ALL_COMBINATIONS)
+    keys = np.concatenate([grid, np.setdiff1d(observed["combinations"], grid)])
+    on_grid = np.arange(len(keys)) < len(grid)
+    people = np.zeros(len(keys), dtype=np.int64)
+    order = np.argsort(keys)
+    people[order[np.searchsorted(keys, observed["combinations"], sorter=order)]] = observed["counts"]
+
+    codes = unpack_level_codes(keys)
+    matches = match_level_codes(codes, compiled)
+    best = matches["en_iyi_profiller"]
+    status = np.where(best == "", 2, np.where(matches["en_iyi_aday_sayisi"] > 1, 1, 0))
+
+    summary = {
+        name: {"combinations": int((on_grid & (status == i)).sum()), "people": int(people[status == i].sum())}
+        for i, name in enumerate(STATUSES)
+    }
+    flagged = np.flatnonzero(status > 0)
+    flagged = flagged[np.lexsort((flagged, -people[flagged]))]
+    rows = [
+        {
+            "levels": {band: LEVEL_NAMES[c] for band, c in zip(BANDS, codes[i])},
+            "status": STATUSES[status[i]],
+            "people": int(people[i]),
+            "profiles": best[i],
+            "candidates": matches["tam_uyumlu_profiller"][i],
+            "complete": bool((codes[i] < LEVEL_CODE_EMPTY).all()),
+        }
+        for i in flagged
+    ]
+    return {
+        "profiles": len(compiled["names"]),
+        "combinations": len(grid),
+        "runs": observed["runs"],
+        "people": int(people.sum()),
+        "summary": summary,
+        "rows": rows,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def stored_profile_set_coverage(profile_set_id: str, last_runs: int = 50) -> Dict[str, Any]:
+    """Coverage of a saved profile set (compiled masks cached per file)"""
+    compiled = load_profile_masks(str(profile_csv_path(profile_set_id)))
+    return {"profile_set_id": profile_set_id, **profile_set_coverage(compiled, last_runs=last_runs)}
+
+
+def draft_profile_set_coverage(profile_set: ProfileSet, last_runs: int = 50) -> Dict[str, Any]:
+    """Coverage of an unsaved (edited) profile set, compiled in memory"""
+    df = profile_set_frame(profile_set)
+    compiled = compile_profile_masks(compile_profile_rules(df), extract_profile_cells(df))
+    return {"profile_set_id": profile_set.id, **profile_set_coverage(compiled, last_runs=last_runs)}
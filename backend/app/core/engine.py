@@ -1,17 +1,38 @@
 import os
 import sys
+import math
+import time
+import base64
+import tempfile
+import importlib.util
 from pathlib import Path
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List
 import json
 
 # Add parent directory to path to import existing modules
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
-from zenin_mac2 import process_pipeline
+from zenin_mac2 import (
+    analyze_recording,
+    pipeline_settings,
+    process_files,
+    process_pipeline,
+    process_recording,
+    read_manifest,
+    read_recording_csv,
+    reclassify_log_row,
+    write_log_rows,
+    write_unmatched_log
+)
+from compare_profile_sets import compare_profile_sets, report_json
+from recording_format import is_binary_recording
+from zenin_plot_generator import generate_eeg_plots
 from app.models.config import RunConfig
-from app.models.runs import RunResult
+from app.models.runs import ReclassifyRequest, RunResult
 from app.core.profiles_manager import get_profile_set
+from app.core.run_index import index_run
+from app.core.results_store import append_run, unmatched_log_paths
 
 RUNS_DIR = Path(__file__).parent.parent / "data" / "runs"
 
@@ -35,6 +56,45 @@ def _convert_band_thresholds_to_dict(band_thresholds: Dict) -> Dict:
     return result
 
 
+def _pipeline_output_options(config: RunConfig) -> Dict:
+    """Map RunConfig.outputs to process_pipeline switches (plots, live summary, unmatched xlsx)"""
+    outputs = set(config.outputs)
+    if "parquet" in outputs and not any(importlib.util.find_spec(m) for m in ("pyarrow", "fastparquet")):
+        raise ValueError("Parquet output requires pyarrow or fastparquet to be installed")
+    return {
+        "plot_mode": config.plot_mode if "plots" in outputs else "none",
+        "live_summary": "summary" in outputs,
+        "unmatched_xlsx": "unmatched_xlsx" in outputs,
+    }
+
+
+def write_parquet_log(log_path: Path) -> Path:
+    """Write the processing log next to the CSV as processing_log{run_id}.parquet"""
+    import pandas as pd
+
+    parquet_path = log_path.with_suffix(".parquet")
+    pd.read_csv(log_path, encoding="utf-8").to_parquet(parquet_path, index=False)
+    return parquet_path
+
+
+def _save_run_metadata(metadata: Dict, run_dir: Path, log_path: Path, profile_set_id: str) -> None:
+    """Write metadata.json and register the run in the run index and results store"""
+    metadata_path = run_dir / "metadata.json"
+    with open(metadata_path, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
+    
+    try:
+        index_run(metadata, run_dir)
+    except Exception as e:
+        print(f"⚠️ Could not update run index: {e}")
+    if log_path.exists():
+        try:
+            append_run(metadata["run_id"], log_path, metadata["timestamp"], profile_set_id,
+                       unmatched_paths=unmatched_log_paths(run_dir))
+        except Exception as e:
+            print(f"⚠️ Could not append run to results store: {e}")
+
+
 def generate_profile_summary(log_path: str, output_dir: str, run_id: str) -> Path | None:
     """
     Generate profile summary Excel file from processing log.
@@ -71,46 +131,96 @@ def generate_profile_summary(log_path: str, output_dir: str, run_id: str) -> Pat
         return None
 
 
-def run_batch(config: RunConfig) -> RunResult:
-    """Process all CSVs in config.data_root using the selected profile set and constants."""
-    if not config.data_root:
-        raise ValueError("data_root must be provided for batch processing")
-    
-    # Generate run_id (timestamp-based)
-    run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+def _new_run_dir(run_id: str | None = None) -> tuple:
+    """Timestamp-based run_id (unless given) and its (created) run directory"""
+    run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
     run_dir = RUNS_DIR / run_id
     run_dir.mkdir(parents=True, exist_ok=True)
+    return run_id, run_dir
+
+
+def _link_input(csv_path: Path, run_dir: Path) -> Path:
+    """Give the run its own reference to an input CSV without copying it.
+    
+    Files already inside the run directory are used as they are; others are hardlinked
+    into run_dir/input/. When linking is not possible (another filesystem), the original
+    path is processed in place.
+    """
+    csv_path = Path(csv_path).resolve()
+    if run_dir.resolve() in csv_path.parents:
+        return csv_path
+    linked = run_dir / "input" / csv_path.name
+    try:
+        linked.parent.mkdir(exist_ok=True)
+        os.link(csv_path, linked)
+        return linked
+    except OSError as e:
+        print(f"ℹ️ Could not hardlink {csv_path} into the run ({e}); processing it in place")
+        return csv_path
+
+
+def validate_run_config(config: RunConfig) -> Path:
+    """Check the profile set and requested outputs before a run directory is created.
     
+    Returns the profile CSV path; raises FileNotFoundError / ValueError otherwise.
+    """
     # Get profile CSV path from profile_set_id
     profiles_dir = Path(__file__).parent.parent / "data" / "profiles"
     profile_csv = profiles_dir / f"{config.profile_set_id}.csv"
     
     if not profile_csv.exists():
         raise FileNotFoundError(f"Profile set '{config.profile_set_id}' not found at {profile_csv}")
+    _pipeline_output_options(config)
+    return profile_csv
+
+
+def _pipeline_options(config: RunConfig, run_id: str, run_dir: Path) -> Dict:
+    """process_pipeline / process_files keyword arguments for a run of config into run_dir"""
+    profile_csv = validate_run_config(config)
+    return {
+        "run_id": run_id,
+        "output_dir": str(run_dir),
+        "profile_csv_path": str(profile_csv),
+        "dominance_delta": config.dominance_delta,
+        "balance_threshold": config.balance_threshold,
+        "denge_mean_threshold": config.denge_mean_threshold,
+        "window_secs": config.window_secs,
+        "window_samples": config.window_samples,
+        "band_thresholds": _convert_band_thresholds_to_dict(config.band_thresholds),
+        "plot_format": config.plot_format,
+        "plot_thumbnails": config.plot_thumbnails,
+        "prefetch": config.prefetch,
+        "prefetch_max_mb": config.prefetch_max_mb,
+        **_pipeline_output_options(config)
+    }
+
+
+def _execute_run(config: RunConfig, run_id: str, run_dir: Path, csv_files: List[str] | None = None,
+                 csv_root: str | None = None, extra_metadata: Dict | None = None) -> RunResult:
+    """Run the pipeline into run_dir and record the run.
     
-    # Convert band_thresholds
-    band_thresh_dict = _convert_band_thresholds_to_dict(config.band_thresholds)
+    Walks csv_root (process_pipeline) when csv_files is None, otherwise processes exactly
+    csv_files in place (process_files); then writes the summary fallback, parquet log and metadata.
+    """
+    pipeline_options = _pipeline_options(config, run_id, run_dir)
     
-    # Call refactored zenin_mac2.process_pipeline() with config params
+    # Call refactored zenin_mac2 pipeline with config params
     try:
-        result = process_pipeline(
-            csv_root=config.data_root,
-            run_id=run_id,
-            output_dir=str(run_dir),
-            profile_csv_path=str(profile_csv),
-            dominance_delta=config.dominance_delta,
-            balance_threshold=config.balance_threshold,
-            denge_mean_threshold=config.denge_mean_threshold,
-            window_secs=config.window_secs,
-            window_samples=config.window_samples,
-            band_thresholds=band_thresh_dict
-        )
+        if csv_files is None:
+            result = process_pipeline(csv_root=csv_root, **pipeline_options)
+        else:
+            result = process_files(csv_files, csv_root=csv_root, **pipeline_options)
     except Exception as e:
         print(f"❌ Pipeline error: {e}")
         import traceback
         traceback.print_exc()
         raise
-    
+    return _finish_run(config, run_id, run_dir, result, extra_metadata)
+
+
+def _finish_run(config: RunConfig, run_id: str, run_dir: Path, result: Dict,
+                extra_metadata: Dict | None = None) -> RunResult:
+    """Summary fallback, parquet log and metadata of a run whose pipeline result is `result`"""
     # Move log file to run directory if it's elsewhere
     log_path = Path(result.get("log_path", run_dir / f"processing_log{run_id}.csv"))
     if log_path.parent != run_dir:
@@ -122,9 +232,14 @@ def run_batch(config: RunConfig) -> RunResult:
     else:
         log_path = run_dir / f"processing_log{run_id}.csv"
     
-    # Generate profile summary Excel
-    summary_xlsx_path = None
-    if log_path.exists():
+    # Profile summary is maintained by the pipeline while it runs; fall back to
+    # generating it from the log if that did not produce one
+    summary_xlsx_path = Path(result["summary_path"]) if result.get("summary_path") else None
+    if "summary" not in config.outputs:
+        print("ℹ️ Profile summary skipped (not in outputs)")
+    elif summary_xlsx_path and summary_xlsx_path.exists():
+        print(f"✅ Profile summary created: {summary_xlsx_path}")
+    elif log_path.exists():
         print(f"✅ Generating profile summary from log: {log_path}")
         summary_xlsx_path = generate_profile_summary(
             log_path=str(log_path),
@@ -138,6 +253,12 @@ def run_batch(config: RunConfig) -> RunResult:
     else:
         print(f"⚠️ Log file not found at {log_path}, cannot generate summary")
     
+    if "parquet" in config.outputs and log_path.exists():
+        try:
+            print(f"✅ Parquet log written: {write_parquet_log(log_path)}")
+        except Exception as e:
+            print(f"⚠️ Could not write parquet log: {e}")
+    
     # Save run metadata
     metadata = {
         "run_id": run_id,
@@ -145,11 +266,10 @@ def run_batch(config: RunConfig) -> RunResult:
         "config": config.model_dump(),
         "processed_files": result.get("processed_files", 0),
         "matched_count": result.get("matched_count", 0),
-        "unmatched_count": result.get("unmatched_count", 0)
+        "unmatched_count": result.get("unmatched_count", 0),
+        **(extra_metadata or {})
     }
-    metadata_path = run_dir / "metadata.json"
-    with open(metadata_path, "w", encoding="utf-8") as f:
-        json.dump(metadata, f, indent=2, ensure_ascii=False)
+    _save_run_metadata(metadata, run_dir, log_path, config.profile_set_id)
     
     # Debug logging
     print(f"🔍 DEBUG - Run completed:")
@@ -176,123 +296,300 @@ def run_batch(config: RunConfig) -> RunResult:
     )
 
 
-def run_single(config: RunConfig, csv_path: str) -> RunResult:
-    """Process exactly one CSV file (by path or uploaded temp file)."""
-    # Generate run_id (timestamp-based)
-    run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-    run_dir = RUNS_DIR / run_id
-    run_dir.mkdir(parents=True, exist_ok=True)
+def run_batch(config: RunConfig) -> RunResult:
+    """Process all CSVs in config.data_root using the selected profile set and constants."""
+    if not config.data_root:
+        raise ValueError("data_root must be provided for batch processing")
+    validate_run_config(config)
     
-    # Copy CSV to run_dir if it's not already there
-    csv_path_obj = Path(csv_path)
-    if csv_path_obj.parent != run_dir:
-        input_csv = run_dir / "input.csv"
-        import shutil
-        shutil.copy2(csv_path, input_csv)
-        csv_path = str(input_csv)
-    else:
-        csv_path = str(csv_path_obj)
+    run_id, run_dir = _new_run_dir()
+    return _execute_run(config, run_id, run_dir, csv_root=config.data_root)
+
+
+def run_single(config: RunConfig, csv_path: str, run_id: str | None = None) -> RunResult:
+    """Process exactly one CSV file (by path or uploaded into the run directory), without copying it.
     
-    # Get profile CSV path from profile_set_id
+    run_id reuses an existing run directory (uploads are written there before the run starts).
+    """
+    if not Path(csv_path).is_file():
+        raise FileNotFoundError(f"CSV file not found: {csv_path}")
+    validate_run_config(config)
+    
+    run_id, run_dir = _new_run_dir(run_id)
+    csv_path = str(_link_input(Path(csv_path), run_dir))
+    return _execute_run(config, run_id, run_dir, csv_files=[csv_path], extra_metadata={"csv_path": csv_path})
+
+
+def run_files(config: RunConfig, csv_paths: List[str], csv_root: str | None = None) -> RunResult:
+    """Process an explicit list of CSV files in place (no directory walk, no copies).
+    
+    Events are the files' folders relative to csv_root (config.data_root when not given);
+    without a root every file belongs to the "root" event.
+    """
+    if not csv_paths:
+        raise ValueError("No CSV files given")
+    missing = [p for p in csv_paths if not Path(p).is_file()]
+    if missing:
+        raise FileNotFoundError(f"CSV file(s) not found: {', '.join(missing[:5])}")
+    validate_run_config(config)
+    
+    run_id, run_dir = _new_run_dir()
+    root = csv_root or config.data_root
+    return _execute_run(config, run_id, run_dir, csv_files=list(csv_paths), csv_root=root,
+                        extra_metadata={"csv_files": len(csv_paths)})
+
+
+def run_manifest(config: RunConfig, manifest_path: str) -> RunResult:
+    """Process the CSV files listed in a manifest (one path per line, relative to the manifest)."""
+    if not Path(manifest_path).is_file():
+        raise FileNotFoundError(f"Manifest not found: {manifest_path}")
+    return run_files(config, read_manifest(manifest_path), csv_root=str(Path(manifest_path).resolve().parent))
+
+
+def compare_profile_set_ids(config: RunConfig, profile_set_ids: List[str]) -> Dict:
+    """Classify every CSV in config.data_root against several profile sets in one pass.
+    
+    Analytics run once per recording; each person is then matched against every set.
+    An empty profile_set_ids compares all profile sets. Nothing is written to a run directory.
+    """
+    if not config.data_root:
+        raise ValueError("data_root must be provided for profile set comparison")
     profiles_dir = Path(__file__).parent.parent / "data" / "profiles"
-    profile_csv = profiles_dir / f"{config.profile_set_id}.csv"
+    if not profile_set_ids:
+        profile_set_ids = sorted(p.stem for p in profiles_dir.glob("*.csv"))
+    profile_csvs = []
+    for profile_set_id in profile_set_ids:
+        profile_csv = profiles_dir / f"{profile_set_id}.csv"
+        if not profile_csv.exists():
+            raise FileNotFoundError(f"Profile set '{profile_set_id}' not found at {profile_csv}")
+        profile_csvs.append(str(profile_csv))
+    
+    report = compare_profile_sets(
+        config.data_root,
+        profile_csvs,
+        dominance_delta=config.dominance_delta,
+        balance_threshold=config.balance_threshold,
+        denge_mean_threshold=config.denge_mean_threshold,
+        window_secs=config.window_secs,
+        window_samples=config.window_samples,
+        band_thresholds=_convert_band_thresholds_to_dict(config.band_thresholds)
+    )
+    return {"data_root": config.data_root, **report_json(report)}
+
+
+def _json_safe(value):
+    """NaN/inf -> None and numpy scalars -> Python types, recursively (metrics dicts)"""
+    if isinstance(value, dict):
+        return {k: _json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(v) for v in value]
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        value = value.item()
+    if isinstance(value, float) and (math.isnan(value) or math.isinf(value)):
+        return None
+    return value
+
+
+def _persist_analysis(content: bytes, config: RunConfig, df, metrics: Dict, dominance: Dict) -> RunResult:
+    """Store an already analyzed upload as a regular single-file run.
     
+    The recording is written into the run directory and goes through the pipeline's
+    per-recording output step (log or unmatched log, plots) with the given metrics,
+    so analytics are not repeated; summary and metadata follow as for run_single.
+    """
+    validate_run_config(config)
+    run_id, run_dir = _new_run_dir()
+    csv_path = run_dir / ("input.zrec" if is_binary_recording(content) else "input.csv")
+    csv_path.write_bytes(content)
+    
+    options = _pipeline_options(config, run_id, run_dir)
+    options.pop("prefetch")
+    options.pop("prefetch_max_mb")
+    settings = pipeline_settings(**options)
+    try:
+        record = process_recording(str(csv_path), "root", settings, df=df, analysis=(metrics, dominance))
+    finally:
+        settings["unmatched_log"].close()
+    result = {
+        "processed_files": 1,
+        "matched_count": int(record.matched),
+        "unmatched_count": int(not record.matched),
+        "log_path": settings["log_path"],
+    }
+    return _finish_run(config, run_id, run_dir, result, extra_metadata={"csv_path": str(csv_path)})
+
+
+def _render_plots(df, metrics: Dict, config: RunConfig, filename: str) -> List[Dict]:
+    """The recording's EEG plots rendered into a temporary folder, returned base64-encoded"""
+    media_types = {".png": "image/png", ".webp": "image/webp"}
+    name = Path(filename).name
+    with tempfile.TemporaryDirectory() as plot_dir:
+        plot_files = generate_eeg_plots(
+            dfs={name: df},
+            metrics_map={name: metrics},
+            balance_diff_map={name: metrics.get("dalga_farki", 0)},
+            best_profile_map={name: metrics.get("en_iyi_profiller", "")},
+            output_dir=plot_dir,
+            balance_threshold=config.balance_threshold,
+            dominance_delta=config.dominance_delta,
+            window_secs=config.window_secs,
+            image_format=config.plot_format,
+            thumbnails=False
+        )
+        return [{
+            "file": Path(path).name,
+            "media_type": media_types.get(Path(path).suffix.lower(), "application/octet-stream"),
+            "data": base64.b64encode(Path(path).read_bytes()).decode("ascii"),
+        } for path in plot_files or []]
+
+
+def analyze_upload(content: bytes, config: RunConfig, filename: str = "upload.csv",
+                   plot: bool = False, persist: bool = False) -> Dict:
+    """Analytics and profile match of one recording held in memory.
+    
+    Same steps as a single-file run (zenin_mac2.analyze_recording) without the run
+    directory, log, plots or summary. The compiled profile set stays cached between calls.
+    plot=True adds the recording's plots (base64) to the result; persist=True also stores
+    the analyzed recording as a run (with plots only if plot=True) and returns it as "run".
+    """
+    started = time.perf_counter()
+    profile_csv = Path(__file__).parent.parent / "data" / "profiles" / f"{config.profile_set_id}.csv"
     if not profile_csv.exists():
         raise FileNotFoundError(f"Profile set '{config.profile_set_id}' not found at {profile_csv}")
     
-    # Convert band_thresholds
-    band_thresh_dict = _convert_band_thresholds_to_dict(config.band_thresholds)
+    df = read_recording_csv(content, name=filename)
+    if df is None:
+        raise ValueError(f"Could not parse {filename} as CSV")
+    parsed = time.perf_counter()
+    metrics, dominance = analyze_recording(
+        df,
+        filename,
+        profile_csv_path=str(profile_csv),
+        dominance_delta=config.dominance_delta,
+        balance_threshold=config.balance_threshold,
+        denge_mean_threshold=config.denge_mean_threshold,
+        window_secs=config.window_secs,
+        window_samples=config.window_samples,
+        band_thresholds=_convert_band_thresholds_to_dict(config.band_thresholds)
+    )
+    df_for_plot = metrics.pop("dataframe_with_clean", df)
+    finished = time.perf_counter()
+    result = {
+        "name": Path(filename).stem,
+        "profile_set_id": config.profile_set_id,
+        **metrics,
+        "dominance": dominance,
+        "matched": bool((metrics.get("en_iyi_profiller") or "").strip()),
+        "timings_ms": {
+            "parse": round((parsed - started) * 1000, 2),
+            "analyze": round((finished - parsed) * 1000, 2),
+            "total": round((finished - started) * 1000, 2),
+        },
+    }
+    if persist:
+        outputs = ["log", "summary"] + (["plots"] if plot else [])
+        run = _persist_analysis(content, config.model_copy(update={"outputs": outputs, "plot_mode": "individual"}),
+                                df, {**metrics, "dataframe_with_clean": df_for_plot}, dominance)
+        result["run"] = json.loads(run.model_dump_json())
+    elif plot:
+        result["plots"] = _render_plots(df_for_plot, metrics, config, filename)
+    return _json_safe(result)
+
+
+def _stored_result_rows(run_dir: Path, run_id: str) -> list:
+    """All per-person rows of a finished run: matched rows from the processing log plus the unmatched log"""
+    import pandas as pd
+
+    rows = []
+    log_path = run_dir / f"processing_log{run_id}.csv"
+    if not log_path.exists():
+        log_path = next(iter(run_dir.glob("processing_log*.csv")), log_path)
+    for path in [log_path] + unmatched_log_paths(run_dir):
+        if path.exists():
+            rows.extend(pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8").to_dict("records"))
+    return rows
+
+
+def reclassify_run(source_run_id: str, request: ReclassifyRequest) -> RunResult:
+    """Re-classify a finished run with a different profile set / thresholds.
     
-    # Create a temporary directory structure for single file processing
-    # The pipeline expects a directory to walk, so we'll create a temp structure
-    temp_data_dir = run_dir / "temp_data"
-    temp_data_dir.mkdir(exist_ok=True)
+    Profile matching and dominance only need the per-band scores and levels, which
+    the processing log already stores, so raw CSVs are not read again. The result is
+    written as a new run that records source_run_id. Plots are not regenerated.
+    People that were unmatched in the source run come from the unmatched log, which
+    does not keep the pct_*/window/duration columns; those stay empty.
+    """
+    source_dir = RUNS_DIR / source_run_id
+    source_metadata_path = source_dir / "metadata.json"
+    if not source_metadata_path.exists():
+        raise FileNotFoundError(f"Run {source_run_id} not found")
+    with open(source_metadata_path, "r", encoding="utf-8") as f:
+        source_metadata = json.load(f)
     
-    # Copy the CSV to temp_data_dir
-    import shutil
-    shutil.copy2(csv_path, temp_data_dir / Path(csv_path).name)
+    config = RunConfig(**{**source_metadata.get("config", {}), **request.model_dump(exclude_none=True)})
+    profiles_dir = Path(__file__).parent.parent / "data" / "profiles"
+    profile_csv = profiles_dir / f"{config.profile_set_id}.csv"
+    if not profile_csv.exists():
+        raise FileNotFoundError(f"Profile set '{config.profile_set_id}' not found at {profile_csv}")
     
-    # Call process_pipeline with temp_data_dir as csv_root
-    try:
-        result = process_pipeline(
-            csv_root=str(temp_data_dir),
-            run_id=run_id,
-            output_dir=str(run_dir),
+    rows = _stored_result_rows(source_dir, source_metadata.get("run_id", source_run_id))
+    if not rows:
+        raise ValueError(f"Run {source_run_id} has no stored results to re-classify")
+    
+    run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    run_dir = RUNS_DIR / run_id
+    run_dir.mkdir(parents=True, exist_ok=True)
+    
+    matched_rows, unmatched_rows = [], []
+    for row in rows:
+        log_row, unmatched_row, is_unmatched = reclassify_log_row(
+            row,
             profile_csv_path=str(profile_csv),
             dominance_delta=config.dominance_delta,
             balance_threshold=config.balance_threshold,
-            denge_mean_threshold=config.denge_mean_threshold,
-            window_secs=config.window_secs,
-            window_samples=config.window_samples,
-            band_thresholds=band_thresh_dict
+            denge_mean_threshold=config.denge_mean_threshold
         )
-    except Exception as e:
-        print(f"❌ Pipeline error: {e}")
-        import traceback
-        traceback.print_exc()
-        raise
+        if is_unmatched:
+            unmatched_rows.append(unmatched_row)
+        else:
+            matched_rows.append(log_row)
     
-    # Move log file to run directory
-    log_path = Path(result.get("log_path", run_dir / f"processing_log{run_id}.csv"))
-    if log_path.parent != run_dir:
-        new_log_path = run_dir / log_path.name
-        if log_path.exists():
-            import shutil
-            shutil.move(str(log_path), str(new_log_path))
-        log_path = new_log_path
-    else:
-        log_path = run_dir / f"processing_log{run_id}.csv"
+    log_path = run_dir / f"processing_log{run_id}.csv"
+    write_log_rows(matched_rows, str(log_path))
+    if unmatched_rows:
+        write_unmatched_log(unmatched_rows, int(run_id) if run_id.isdigit() else 1005,
+                            str(run_dir / "UNMATCHED_DATA"), write_xlsx="unmatched_xlsx" in config.outputs)
     
-    # Generate profile summary Excel
     summary_xlsx_path = None
-    if log_path.exists():
-        print(f"✅ Generating profile summary from log: {log_path}")
-        summary_xlsx_path = generate_profile_summary(
-            log_path=str(log_path),
-            output_dir=str(run_dir),
-            run_id=run_id
-        )
-        if summary_xlsx_path:
-            print(f"✅ Profile summary created: {summary_xlsx_path}")
-        else:
-            print(f"⚠️ Profile summary generation failed")
-    else:
-        print(f"⚠️ Log file not found at {log_path}, cannot generate summary")
+    if "summary" in config.outputs and matched_rows:
+        summary_xlsx_path = generate_profile_summary(str(log_path), str(run_dir), run_id)
+    if "parquet" in config.outputs:
+        try:
+            write_parquet_log(log_path)
+        except Exception as e:
+            print(f"⚠️ Could not write parquet log: {e}")
     
-    # Save run metadata
     metadata = {
         "run_id": run_id,
         "timestamp": datetime.now().isoformat(),
         "config": config.model_dump(),
-        "processed_files": result.get("processed_files", 0),
-        "matched_count": result.get("matched_count", 0),
-        "unmatched_count": result.get("unmatched_count", 0),
-        "csv_path": csv_path
+        "processed_files": len(rows),
+        "matched_count": len(matched_rows),
+        "unmatched_count": len(unmatched_rows),
+        "source_run_id": source_run_id
     }
-    metadata_path = run_dir / "metadata.json"
-    with open(metadata_path, "w", encoding="utf-8") as f:
-        json.dump(metadata, f, indent=2, ensure_ascii=False)
-    
-    # Debug logging
-    print(f"🔍 DEBUG - Run completed:")
-    print(f"  Run ID: {run_id}")
-    print(f"  Run dir: {run_dir}")
-    print(f"  Log file: {log_path}")
-    print(f"  Summary file: {summary_xlsx_path}")
-    print(f"  Plots dir: {run_dir / 'graphs'}")
-    print(f"  Plots dir exists: {(run_dir / 'graphs').exists()}")
-    if (run_dir / 'graphs').exists():
-        plots_list = list((run_dir / 'graphs').rglob('*.png'))
-        print(f"  Plots count: {len(plots_list)}")
+    _save_run_metadata(metadata, run_dir, log_path, config.profile_set_id)
+    print(f"✅ Run {source_run_id} re-classified as {run_id}: {len(matched_rows)} matched, {len(unmatched_rows)} unmatched")
     
     return RunResult(
         run_id=run_id,
         timestamp=metadata["timestamp"],
         config=config,
-        processed_files=result.get("processed_files", 0),
-        matched_count=result.get("matched_count", 0),
-        unmatched_count=result.get("unmatched_count", 0),
+        processed_files=len(rows),
+        matched_count=len(matched_rows),
+        unmatched_count=len(unmatched_rows),
         log_file=str(log_path),
         plots_dir=str(run_dir / "graphs"),
-        summary_xlsx=summary_xlsx_path.name if summary_xlsx_path and summary_xlsx_path.exists() else None
+        summary_xlsx=summary_xlsx_path.name if summary_xlsx_path and summary_xlsx_path.exists() else None,
+        source_run_id=source_run_id
     )
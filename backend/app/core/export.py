@@ -0,0 +1,208 @@
+import json
+import os
+import re
+import uuid
+import zipfile
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+EXPORT_CHUNK_SIZE = 1024 * 1024
+EXPORTS_DIRNAME = "exports"
+EXPORT_SECTIONS = ("plots", "logs", "summary")
+
+# Already-compressed formats are stored as-is, everything else is deflated
+STORED_SUFFIXES = {".png", ".webp", ".xlsx", ".zip"}
+PLOT_SUFFIXES = {".png", ".webp"}
+
+
+class _ZipChunkSink:
+    """Write-only, non-seekable sink for zipfile.
+
+    Because it has no seek(), zipfile writes data descriptors after each
+    member, so the archive can be emitted front to back while it is built.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._pos = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _section_for(rel_path: Path) -> str | None:
+    """Classify a file inside a run directory into an export section"""
+    parts = rel_path.parts
+    if parts[0] == EXPORTS_DIRNAME or parts[0] in {"input", "input.csv", "input.zrec", "temp_data"}:
+        return None
+    if "thumbs" in parts[:-1]:
+        return None
+    name = rel_path.name
+    suffix = rel_path.suffix.lower()
+    if suffix in PLOT_SUFFIXES or name.startswith("plot_index"):
+        return "plots"
+    if name.startswith("profile_summary"):
+        return "summary"
+    if name == "metadata.json" or name.startswith("processing_log") or name.startswith("unmatched_profiles_log"):
+        return "logs"
+    return None
+
+
+def collect_export_files(run_dir: Path, sections: set) -> List[Tuple[Path, str]]:
+    """List (path, archive name) pairs for the requested sections, sorted by archive name"""
+    files = []
+    for root, dirs, names in os.walk(run_dir):
+        dirs[:] = [d for d in dirs if d != EXPORTS_DIRNAME]
+        for name in names:
+            path = Path(root) / name
+            rel_path = path.relative_to(run_dir)
+            if _section_for(rel_path) in sections:
+                files.append((path, rel_path.as_posix()))
+    files.sort(key=lambda item: item[1])
+    return files
+
+
+def export_cache_path(run_dir: Path, sections: set) -> Path:
+    """Cached archive location for a given section selection"""
+    key = "-".join(s for s in EXPORT_SECTIONS if s in sections) or "empty"
+    return run_dir / EXPORTS_DIRNAME / f"{run_dir.name}_{key}.zip"
+
+
+def export_manifest_path(cache_path: Path) -> Path:
+    """Manifest written next to a cached archive: its own size/mtime and its members"""
+    return cache_path.with_suffix(".manifest.json")
+
+
+def _member_signature(path: Path, arcname: str) -> list:
+    stat = path.stat()
+    return [arcname, stat.st_size, stat.st_mtime_ns]
+
+
+def is_export_cached(cache_path: Path, files: List[Tuple[Path, str]]) -> bool:
+    """A cached archive is valid when its manifest belongs to it and lists exactly the
+    current files (archive name, size, mtime), so added, removed or replaced files invalidate it"""
+    try:
+        with open(export_manifest_path(cache_path), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        stat = cache_path.stat()
+        members = [_member_signature(path, arcname) for path, arcname in files]
+    except (OSError, ValueError):
+        return False
+    return manifest.get("archive") == [stat.st_size, stat.st_mtime_ns] and manifest.get("files") == members
+
+
+def _write_export_manifest(cache_path: Path, archive_stat: os.stat_result, members: list) -> None:
+    manifest_path = export_manifest_path(cache_path)
+    part_path = manifest_path.with_name(f"{manifest_path.name}.{uuid.uuid4().hex}.part")
+    with open(part_path, "w", encoding="utf-8") as f:
+        json.dump({"archive": [archive_stat.st_size, archive_stat.st_mtime_ns], "files": members}, f)
+    os.replace(part_path, manifest_path)
+
+
+def iter_run_export(files: List[Tuple[Path, str]], cache_path: Path | None = None) -> Iterator[bytes]:
+    """Yield a zip archive of the given files chunk by chunk.
+
+    Nothing is buffered beyond one read chunk. If cache_path is given the
+    bytes are also written to it, and the cache only becomes visible
+    (atomic rename) once the archive is complete; its manifest follows it.
+    """
+    sink = _ZipChunkSink()
+    cache_file = None
+    part_path = None
+    if cache_path is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        part_path = cache_path.with_name(f"{cache_path.name}.{uuid.uuid4().hex}.part")
+        cache_file = open(part_path, "wb")
+
+    def _emit():
+        data = sink.drain()
+        if data and cache_file is not None:
+            cache_file.write(data)
+        return data
+
+    completed = False
+    members = []
+    try:
+        with zipfile.ZipFile(sink, "w") as zf:
+            for path, arcname in files:
+                members.append(_member_signature(path, arcname))
+                zinfo = zipfile.ZipInfo.from_file(path, arcname)
+                if path.suffix.lower() in STORED_SUFFIXES:
+                    zinfo.compress_type = zipfile.ZIP_STORED
+                else:
+                    zinfo.compress_type = zipfile.ZIP_DEFLATED
+                with open(path, "rb") as src, zf.open(zinfo, "w", force_zip64=zinfo.file_size > zipfile.ZIP64_LIMIT) as dest:
+                    while True:
+                        chunk = src.read(EXPORT_CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        dest.write(chunk)
+                        data = _emit()
+                        if data:
+                            yield data
+                data = _emit()
+                if data:
+                    yield data
+        # Central directory is written when the ZipFile closes
+        data = _emit()
+        if data:
+            yield data
+        completed = True
+    finally:
+        if cache_file is not None:
+            cache_file.close()
+            if completed:
+                archive_stat = part_path.stat()
+                os.replace(part_path, cache_path)
+                try:
+                    _write_export_manifest(cache_path, archive_stat, members)
+                except OSError as e:
+                    # the archive was still sent; without a manifest it is just not reused
+                    print(f"⚠️ Could not write export manifest: {e}")
+            else:
+                part_path.unlink(missing_ok=True)
+
+
+def parse_byte_range(range_header: str, size: int) -> Tuple[int, int] | None:
+    """Parse a single 'bytes=start-end' range. Returns inclusive (start, end) or None if unsatisfiable"""
+    match = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", range_header or "")
+    if not match or (not match.group(1) and not match.group(2)):
+        return None
+    start_s, end_s = match.groups()
+    if start_s:
+        start = int(start_s)
+        end = int(end_s) if end_s else size - 1
+    else:
+        # Suffix range: last N bytes
+        start = max(size - int(end_s), 0)
+        end = size - 1
+    end = min(end, size - 1)
+    if start > end:
+        return None
+    return start, end
+
+
+def iter_file_range(path: Path, start: int, end: int) -> Iterator[bytes]:
+    """Yield bytes start..end (inclusive) of a file"""
+    remaining = end - start + 1
+    with open(path, "rb") as f:
+        f.seek(start)
+        while remaining > 0:
+            chunk = f.read(min(EXPORT_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
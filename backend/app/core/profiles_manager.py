@@ -154,12 +154,8 @@ def get_profile_set(profile_set_id: str) -> ProfileSet:
     )
 
 
-def save_profile_set(profile_set: ProfileSet) -> None:
-    """Save a profile set to CSV file"""
-    PROFILES_DIR.mkdir(parents=True, exist_ok=True)
-    csv_path = PROFILES_DIR / f"{profile_set.id}.csv"
-    
-    # Build DataFrame
+def profile_set_frame(profile_set: ProfileSet) -> pd.DataFrame:
+    """Profile set as the table the CSV file holds (Profil Adı + one column per band)"""
     rows = []
     for profile in profile_set.profiles:
         rows.append({
@@ -170,8 +166,14 @@ def save_profile_set(profile_set: ProfileSet) -> None:
             "Beta": profile.beta_level,
             "Gamma": profile.gamma_level
         })
-    
-    df = pd.DataFrame(rows)
+    return pd.DataFrame(rows, columns=["Profil Adı", "Delta", "Theta", "Alpha", "Beta", "Gamma"])
+
+
+def save_profile_set(profile_set: ProfileSet) -> None:
+    """Save a profile set to CSV file"""
+    PROFILES_DIR.mkdir(parents=True, exist_ok=True)
+    csv_path = PROFILES_DIR / f"{profile_set.id}.csv"
+    df = profile_set_frame(profile_set)
     
     # Save as semicolon-separated CSV (matching original format)
     df.to_csv(csv_path, index=False, sep=';', encoding="utf-8-sig")
@@ -0,0 +1,295 @@
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+import json
+
+import numpy as np
+import pandas as pd
+
+from analytics5 import LEVEL_TEXTS, band_level_codes, band_threshold_cuts
+from profile_analyzer5 import BANDS, level_code, load_profile_masks, match_level_codes
+from app.core import results_store
+from app.models.config import RunConfig
+from app.models.runs import RelevelRequest
+from app.core.results_store import split_profiles, unmatched_log_paths
+
+RUNS_DIR = Path(__file__).parent.parent / "data" / "runs"
+PROFILES_DIR = Path(__file__).parent.parent / "data" / "profiles"
+
+THRESHOLD_KEYS = ("yuksek", "yuksek_orta", "orta", "dusuk_orta")
+SCORE_COLUMNS = [f"score_{b.lower()}" for b in BANDS]
+FRAME_COLUMNS = ["event"] + SCORE_COLUMNS + ["Dalga_Farki"]
+# Level codes: index into LEVEL_TEXTS, len(LEVEL_TEXTS) for a missing score
+LEVEL_CODES = LEVEL_TEXTS + ("",)
+# analytics5 level code -> profile_analyzer5 level code
+MATCHER_CODES = np.array([level_code(t) for t in LEVEL_CODES])
+
+# Score frames of recently re-leveled runs, keyed by run directory and validated by log mtimes
+SCORE_CACHE_SIZE = 8
+# Matcher output per profile file (path, mtime) and packed level combination; 7^5 combinations at most
+MATCH_CACHE_SIZE = 4
+
+_score_cache: "OrderedDict[str, Tuple[tuple, pd.DataFrame]]" = OrderedDict()
+_match_cache: "OrderedDict[tuple, Dict[int, str]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def profile_csv_path(profile_set_id: str) -> Path:
+    path = PROFILES_DIR / f"{profile_set_id}.csv"
+    if not path.exists():
+        raise FileNotFoundError(f"Profile set '{profile_set_id}' not found at {path}")
+    return path
+
+
+def _score_frame(paths: List[Path]) -> pd.DataFrame:
+    """event, score_* and Dalga_Farki of every row in the given processing/unmatched logs"""
+    frames = []
+    for path in paths:
+        df = pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8",
+                         usecols=lambda c: c in FRAME_COLUMNS or c == "dalga_farki")
+        # The unmatched log spells the column in lower case
+        frames.append(df.rename(columns={"dalga_farki": "Dalga_Farki"}))
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=FRAME_COLUMNS)
+    for col in FRAME_COLUMNS:
+        if col not in df.columns:
+            df[col] = ""
+    frame = df[["event"]].copy()
+    for col in SCORE_COLUMNS + ["Dalga_Farki"]:
+        frame[col] = pd.to_numeric(df[col], errors="coerce")
+    return frame
+
+
+def run_score_frame(run_dir: Path, run_id: str) -> pd.DataFrame:
+    """Stored scores of a finished run (processing log plus unmatched log), cached until the logs change"""
+    log_path = run_dir / f"processing_log{run_id}.csv"
+    if not log_path.exists():
+        log_path = next(iter(run_dir.glob("processing_log*.csv")), log_path)
+    paths = [p for p in [log_path] + unmatched_log_paths(run_dir) if p.exists()]
+    if not paths:
+        raise ValueError(f"Run {run_id} has no stored results to re-level")
+    signature = tuple((str(p), p.stat().st_mtime_ns) for p in paths)
+
+    key = str(run_dir)
+    with _cache_lock:
+        cached = _score_cache.get(key)
+        if cached is not None and cached[0] == signature:
+            _score_cache.move_to_end(key)
+            return cached[1]
+
+    frame = _score_frame(paths)
+    with _cache_lock:
+        _score_cache[key] = (signature, frame)
+        _score_cache.move_to_end(key)
+        while len(_score_cache) > SCORE_CACHE_SIZE:
+            _score_cache.popitem(last=False)
+    return frame
+
+
+def store_score_frame(last_runs: int = 50, profile_set_id: str | None = None) -> pd.DataFrame:
+    """Stored scores of the most recent runs in the cross-run results store (matched rows only)"""
+    run_filter = "WHERE profile_set_id = ?" if profile_set_id else ""
+    params = ([profile_set_id] if profile_set_id else []) + [last_runs]
+    sql = f"""
+        WITH recent AS (
+            SELECT run_key FROM runs {run_filter} ORDER BY timestamp DESC, run_key DESC LIMIT ?
+        )
+        SELECT ev.value AS event, {", ".join(f"r.{c}" for c in SCORE_COLUMNS)}, r.Dalga_Farki
+        FROM results r
+        JOIN recent USING (run_key)
+        LEFT JOIN categories ev ON ev.id = r.event
+    """
+    with closing(results_store._connect()) as conn:
+        rows = conn.execute(sql, params).fetchall()
+    frame = pd.DataFrame.from_records(rows, columns=FRAME_COLUMNS)
+    frame["event"] = frame["event"].fillna("")
+    for col in SCORE_COLUMNS + ["Dalga_Farki"]:
+        frame[col] = pd.to_numeric(frame[col], errors="coerce")
+    return frame
+
+
+def _match_table(profile_path: Path) -> Dict[int, str]:
+    key = (str(profile_path.resolve()), profile_path.stat().st_mtime_ns)
+    with _cache_lock:
+        table = _match_cache.get(key)
+        if table is None:
+            table = _match_cache[key] = {}
+        _match_cache.move_to_end(key)
+        while len(_match_cache) > MATCH_CACHE_SIZE:
+            _match_cache.popitem(last=False)
+    return table
+
+
+def _match_combinations(combos: np.ndarray, combo_codes: np.ndarray, profile_path: Path) -> List[str]:
+    """en_iyi_profiller of each packed level combination, memoized per profile file;
+    only combinations not seen before go through the bitmask matcher"""
+    table = _match_table(profile_path)
+    combos = combos.tolist()
+    missing = [i for i, combo in enumerate(combos) if combo not in table]
+    if missing:
+        matches = match_level_codes(MATCHER_CODES[combo_codes[missing]], load_profile_masks(str(profile_path)))
+        table.update(zip((combos[i] for i in missing), matches["en_iyi_profiller"]))
+    return [table[combo] for combo in combos]
+
+
+def band_dominance(scores: np.ndarray, dominance_delta: float) -> Tuple[np.ndarray, np.ndarray]:
+    """(Baskın Yüksek, Baskın Düşük) masks per person and band, as zenin_mac2.compute_dominance decides them"""
+    finite = np.isfinite(scores)
+    n = len(scores)
+    rows = np.arange(n)
+    eligible = finite.sum(axis=1) >= 2
+    high = np.zeros(scores.shape, dtype=bool)
+    low = np.zeros(scores.shape, dtype=bool)
+    if not n:
+        return high, low
+    for mask, filled in ((high, np.where(finite, scores, -np.inf)), (low, np.where(finite, -scores, -np.inf))):
+        # the first band in BANDS order wins a tie, so a tied top (or bottom) is never dominant
+        top = filled.argmax(axis=1)
+        ordered = np.sort(filled, axis=1)
+        mask[rows, top] = eligible & ((ordered[:, -1] - ordered[:, -2]) >= dominance_delta)
+    return high, low
+
+
+def relevel_scores(
+    frame: pd.DataFrame,
+    profile_path: Path,
+    band_thresholds: Dict | None = None,
+    balance_threshold: float = 22.0,
+    denge_mean_threshold: float = 46.0,
+    dominance_delta: float = 29.0
+) -> Dict[str, Any]:
+    """Level stored scores with new band thresholds and classify them the way the pipeline does.
+
+    Levels are computed column-wise as integer codes; the bitmask matcher runs only for
+    distinct level combinations not already memoized for the profile file. Denge Ustası / Yüksek Bilinçli and the Gamma "Baskın Düşük" rename
+    (HUZUR ODAKLI YAŞAYAN -> ZİHİN YOLCUSU) are applied as in the pipeline.
+    """
+    started = time.perf_counter()
+    scores = frame[SCORE_COLUMNS].to_numpy(dtype=float)
+    n = len(frame)
+
+    codes = np.column_stack([band_level_codes(scores[:, i], band, band_thresholds) for i, band in enumerate(BANDS)]) \
+        if n else np.zeros((0, len(BANDS)), dtype=np.int8)
+    packed = np.zeros(n, dtype=np.int64)
+    for i in range(len(BANDS)):
+        packed = packed * len(LEVEL_CODES) + codes[:, i]
+    combos, first, inverse = np.unique(packed, return_index=True, return_inverse=True)
+    names = _match_combinations(combos, codes[first], profile_path)
+
+    # Profiles are tracked as indices into `names`; the overrides below append their labels
+    profile_ids = inverse.reshape(-1).astype(np.int64)
+
+    # Denge Ustası: small spread between bands overrides the profile match
+    finite = np.isfinite(scores)
+    valid_count = finite.sum(axis=1)
+    score_sum = np.where(finite, scores, 0.0).sum(axis=1)
+    mean_score = np.divide(score_sum, valid_count, out=np.full(n, np.nan), where=valid_count > 0)
+    dalga = frame["Dalga_Farki"].to_numpy(dtype=float)
+    denge = np.isfinite(dalga) & (dalga <= balance_threshold)
+    profile_ids[denge] = len(names)
+    profile_ids[denge & (mean_score >= denge_mean_threshold)] = len(names) + 1
+    names += ["DENGE USTASI", "YÜKSEK BİLİNÇLİ"]
+
+    # Gamma "Baskın Düşük" renames HUZUR ODAKLI YAŞAYAN
+    gamma_low = band_dominance(scores, dominance_delta)[1][:, -1]
+    renameable = np.array(["HUZUR ODAKLI YAŞAYAN" in p and "BASKIN DÜŞÜK" not in p for p in names])
+    profile_ids[gamma_low & renameable[profile_ids]] += len(names)
+    names += [p.replace("HUZUR ODAKLI YAŞAYAN", "ZİHİN YOLCUSU") for p in names]
+
+    matched_names = np.array([p != "" for p in names])
+    matched = matched_names[profile_ids]
+    event_ids, events = pd.factorize(frame["event"].fillna(""), sort=True)
+    events = events.tolist()
+    counts = np.bincount((event_ids * len(names) + profile_ids)[matched], minlength=len(events) * len(names))
+    counts = counts.reshape(len(events), len(names))
+
+    # Split each labelled cell once into (profile, match) pairs, then add its per-event counts
+    # to the (event, profile, 5/4) cells with one np.add.at
+    pair_names, pair_profiles, pair_matches = [], [], []
+    profile_ids_by_name: Dict[str, int] = {}
+    for name_id in np.flatnonzero(counts.any(axis=0)):
+        for name, match in split_profiles(names[name_id]):
+            pair_names.append(name_id)
+            pair_profiles.append(profile_ids_by_name.setdefault(name, len(profile_ids_by_name)))
+            pair_matches.append(0 if match == 5 else 1)
+    profiles = list(profile_ids_by_name)
+    per_profile = np.zeros((len(events), len(profiles), 2), dtype=np.int64)
+    np.add.at(per_profile, (slice(None), pair_profiles, pair_matches), counts[:, pair_names])
+    totals = per_profile.sum(axis=2)
+    rows = [
+        {"event": events[e], "profile": profiles[p], "match_5": int(per_profile[e, p, 0]),
+         "match_4": int(per_profile[e, p, 1]), "total": int(totals[e, p])}
+        for e, p in zip(*np.nonzero(totals))
+    ]
+    rows.sort(key=lambda r: (r["event"], -r["total"], r["profile"]))
+
+    level_counts = {}
+    for i, band in enumerate(BANDS):
+        per_level = np.bincount(codes[:, i], minlength=len(LEVEL_CODES))
+        level_counts[band] = {t.strip("-"): int(c) for t, c in zip(LEVEL_TEXTS, per_level) if c}
+    return {
+        "people": n,
+        "matched_count": int(matched.sum()),
+        "unmatched_count": int(n - matched.sum()),
+        "level_combinations": len(combos),
+        "profiles": rows,
+        "levels": level_counts,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def _thresholds_dict(band_thresholds: Dict) -> Dict:
+    """BandThresholds models -> the snake_case dicts analytics5 accepts"""
+    return {band: t.model_dump() if hasattr(t, "model_dump") else dict(t) for band, t in band_thresholds.items()}
+
+
+def effective_thresholds(base: Dict, overrides: Dict) -> Dict:
+    """Thresholds of every band as a run with `base` used them (defaults / Alpha fallback included), with `overrides` on top"""
+    base = _thresholds_dict(base) or None
+    thresholds = {b: dict(zip(THRESHOLD_KEYS, band_threshold_cuts(b, base))) for b in BANDS}
+    thresholds.update(_thresholds_dict(overrides))
+    return thresholds
+
+
+def relevel_run(run_id: str, request: RelevelRequest) -> Dict[str, Any]:
+    """Re-level a finished run's stored scores with new band thresholds (nothing is written).
+
+    Bands missing from request.band_thresholds keep the thresholds the run was leveled
+    with; the other overrides fall back to the run's config as in reclassify.
+    """
+    run_dir = RUNS_DIR / run_id
+    metadata_path = run_dir / "metadata.json"
+    if not metadata_path.exists():
+        raise FileNotFoundError(f"Run {run_id} not found")
+    with open(metadata_path, "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+
+    overrides = request.model_dump(exclude_none=True, exclude={"band_thresholds"})
+    config = RunConfig(**{**metadata.get("config", {}), **overrides})
+    frame = run_score_frame(run_dir, metadata.get("run_id", run_id))
+    result = relevel_scores(
+        frame,
+        profile_csv_path(config.profile_set_id),
+        band_thresholds=effective_thresholds(config.band_thresholds, request.band_thresholds),
+        balance_threshold=config.balance_threshold,
+        denge_mean_threshold=config.denge_mean_threshold,
+        dominance_delta=config.dominance_delta
+    )
+    return {"run_id": run_id, "profile_set_id": config.profile_set_id, **result}
+
+
+def relevel_results(request: RelevelRequest, last_runs: int = 50) -> Dict[str, Any]:
+    """Re-level the most recent runs in the cross-run results store (runs filtered by request.profile_set_id)"""
+    config = RunConfig(**request.model_dump(exclude_none=True, exclude={"band_thresholds"}))
+    frame = store_score_frame(last_runs=last_runs, profile_set_id=request.profile_set_id)
+    result = relevel_scores(
+        frame,
+        profile_csv_path(config.profile_set_id),
+        band_thresholds=effective_thresholds({}, request.band_thresholds),
+        balance_threshold=config.balance_threshold,
+        denge_mean_threshold=config.denge_mean_threshold,
+        dominance_delta=config.dominance_delta
+    )
+    return {"last_runs": last_runs, "profile_set_id": request.profile_set_id, **result}
@@ -0,0 +1,421 @@
+import os
+import re
+import sqlite3
+import threading
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List
+import json
+
+import numpy as np
+import pandas as pd
+
+from analyze_processing_log import normalize_profile_name
+from profile_analyzer5 import level_code, pack_level_codes
+
+RUNS_DIR = Path(__file__).parent.parent / "data" / "runs"
+# Cross-run results store: every finished run's processing log, typed, in one
+# SQLite file. Level/status/event/profile strings are dictionary-encoded in
+# `categories`, and En_Iyi_Profiller is exploded into `result_profiles`.
+RESULTS_FILENAME = "results_store.sqlite3"
+
+BANDS = ("delta", "theta", "alpha", "beta", "gamma")
+CATEGORY_COLUMNS = ["event", "best_profile"] + [f"level_{b}" for b in BANDS] + [f"status_{b}" for b in BANDS]
+NUMERIC_COLUMNS = (
+    [f"score_{b}" for b in BANDS]
+    + [f"raw_mean_{b}" for b in BANDS]
+    + [f"raw_mean_{b}_window" for b in BANDS]
+    + [f"pct_{b}" for b in BANDS]
+    + [f"pct_{b}_window" for b in BANDS]
+    + ["rows", "duration_sec", "Dalga_Farki", "En_Iyi_Puan"]
+)
+TEXT_COLUMNS = ["person_name", "source_file", "processed_at_utc"]
+
+# Per-run score histograms (matched and unmatched people) for the thresholds editor.
+# Bin b holds scores in (b * width, (b + 1) * width], so "score > cut" counts are
+# exact for cuts on a bin edge.
+HISTOGRAM_BIN_WIDTH = 0.5
+LEVEL_COLUMNS = [f"level_{b}" for b in BANDS]
+
+_FOUR_MATCH_RE = re.compile(r"\(.*?4\s*uyumlu.*?\)|\b4\s*uyumlu\b", re.IGNORECASE)
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY,
+    value TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_key INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL UNIQUE,
+    timestamp TEXT NOT NULL,
+    profile_set_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_key INTEGER NOT NULL,
+    row_no INTEGER NOT NULL,
+    {", ".join(f"{c} INTEGER" for c in CATEGORY_COLUMNS)},
+    {", ".join(f"{c} REAL" for c in NUMERIC_COLUMNS)},
+    {", ".join(f"{c} TEXT" for c in TEXT_COLUMNS)},
+    PRIMARY KEY (run_key, row_no)
+);
+CREATE TABLE IF NOT EXISTS result_profiles (
+    run_key INTEGER NOT NULL,
+    row_no INTEGER NOT NULL,
+    event INTEGER,
+    profile INTEGER NOT NULL,
+    match INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS score_histograms (
+    run_key INTEGER NOT NULL,
+    band TEXT NOT NULL,
+    bin INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (run_key, band, bin)
+);
+CREATE TABLE IF NOT EXISTS level_combinations (
+    run_key INTEGER NOT NULL,
+    combination INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (run_key, combination)
+);
+CREATE INDEX IF NOT EXISTS idx_result_profiles_run ON result_profiles (run_key, event, profile);
+CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs (timestamp);
+"""
+
+# PRAGMA user_version of an up-to-date store. Each step fills a table that was added
+# after runs had already been stored (see _migrate)
+STORE_VERSION = 2
+# Histogram / level combination rows of a run with nothing to count, so every stored run has rows
+_EMPTY_HISTOGRAM_BAND = ""
+_EMPTY_COMBINATION = -1
+
+_write_lock = threading.Lock()
+
+
+def store_path() -> Path:
+    return RUNS_DIR / RESULTS_FILENAME
+
+
+def _connect(path: Path | None = None) -> sqlite3.Connection:
+    RUNS_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path or store_path()), timeout=30)
+    conn.executescript(_SCHEMA)
+    if conn.execute("PRAGMA user_version").fetchone()[0] < STORE_VERSION:
+        _migrate(conn)
+    return conn
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Backfill tables added after runs were stored, once per store (tracked in PRAGMA user_version)"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Another connection may have migrated while this one waited for the lock
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            _backfill_histograms(conn)
+        if version < 2:
+            _backfill_combinations(conn)
+        conn.execute(f"PRAGMA user_version = {STORE_VERSION}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _category_ids(conn: sqlite3.Connection, values) -> Dict[str, int]:
+    """Map category strings to ids, inserting unseen values"""
+    values = {v for v in values if v}
+    conn.executemany("INSERT OR IGNORE INTO categories (value) VALUES (?)", [(v,) for v in values])
+    ids = {}
+    values = list(values)
+    # Stay below SQLite's bound-parameter limit
+    for i in range(0, len(values), 500):
+        chunk = values[i:i + 500]
+        rows = conn.execute(
+            f"SELECT value, id FROM categories WHERE value IN ({', '.join('?' for _ in chunk)})", chunk
+        ).fetchall()
+        ids.update(rows)
+    return ids
+
+
+def split_profiles(value: str) -> List[tuple]:
+    """Split an En_Iyi_Profiller cell into (profile, match) pairs, match being 5 or 4"""
+    pairs = []
+    for part in str(value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name = normalize_profile_name(part)
+        if name:
+            pairs.append((name, 4 if _FOUR_MATCH_RE.search(part) else 5))
+    return pairs
+
+
+def unmatched_log_paths(run_dir: Path) -> List[Path]:
+    return sorted((run_dir / "UNMATCHED_DATA").glob("unmatched_profiles_log*.csv"))
+
+
+def _histogram_rows(run_key: int, frames) -> List[tuple]:
+    """(run_key, band, bin, count) rows for the score_* columns of the given frames
+    (one empty-band sentinel row when no score is finite)"""
+    rows = []
+    for band in BANDS:
+        col = f"score_{band}"
+        scores = pd.concat([pd.to_numeric(df[col], errors="coerce") for df in frames if col in df.columns] or [pd.Series(dtype=float)])
+        scores = scores.to_numpy(dtype=float)
+        scores = scores[np.isfinite(scores)]
+        bins, counts = np.unique(np.ceil(scores / HISTOGRAM_BIN_WIDTH).astype(np.int64) - 1, return_counts=True)
+        rows.extend((run_key, band, int(b), int(c)) for b, c in zip(bins, counts))
+    return rows or [(run_key, _EMPTY_HISTOGRAM_BAND, -1, 0)]
+
+
+def _combination_rows(run_key: int, frames) -> List[tuple]:
+    """(run_key, combination, count) rows for the level_* columns of the given frames (pack_level_codes keys;
+    one sentinel row when the frames are empty)"""
+    codes = []
+    for df in frames:
+        columns = []
+        for col in LEVEL_COLUMNS:
+            levels = df[col].fillna("") if col in df.columns else pd.Series("", index=df.index)
+            columns.append(levels.map({v: level_code(v) for v in levels.unique()}).to_numpy(dtype=np.int64))
+        codes.append(np.column_stack(columns).reshape(len(df), len(BANDS)))
+    keys = pack_level_codes(np.concatenate(codes) if codes else np.zeros((0, len(BANDS))))
+    combinations, counts = np.unique(keys, return_counts=True)
+    return [(run_key, int(k), int(c)) for k, c in zip(combinations, counts)] or [(run_key, _EMPTY_COMBINATION, 0)]
+
+
+def append_run(run_id: str, log_path: Path, timestamp: str, profile_set_id: str, unmatched_paths: List[Path] = ()) -> int:
+    """Append (or replace) one run's processing log in the store. Returns the number of rows stored.
+
+    unmatched_paths (the run's unmatched logs) only feed the score histograms and level combination counts.
+    """
+    df = pd.read_csv(log_path, dtype=str, keep_default_na=False)
+    unmatched = [pd.read_csv(p, dtype=str, keep_default_na=False) for p in unmatched_paths]
+    with _write_lock, closing(_connect()) as conn, conn:
+        _insert_run(conn, run_id, df, unmatched, timestamp, profile_set_id)
+    return len(df)
+
+
+def _insert_run(conn: sqlite3.Connection, run_id: str, df: pd.DataFrame, unmatched: List[pd.DataFrame],
+                timestamp: str, profile_set_id: str) -> None:
+    """Replace run_id's rows in the store with the given processing log (and unmatched logs)"""
+    for col in CATEGORY_COLUMNS + NUMERIC_COLUMNS + TEXT_COLUMNS + ["En_Iyi_Profiller"]:
+        if col not in df.columns:
+            df[col] = ""
+    profiles = [split_profiles(v) for v in df["En_Iyi_Profiller"]]
+
+    old = conn.execute("SELECT run_key FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+    if old is not None:
+        conn.execute("DELETE FROM results WHERE run_key = ?", old)
+        conn.execute("DELETE FROM result_profiles WHERE run_key = ?", old)
+        conn.execute("DELETE FROM score_histograms WHERE run_key = ?", old)
+        conn.execute("DELETE FROM level_combinations WHERE run_key = ?", old)
+        conn.execute("DELETE FROM runs WHERE run_key = ?", old)
+    run_key = conn.execute(
+        "INSERT INTO runs (run_id, timestamp, profile_set_id) VALUES (?, ?, ?)",
+        (run_id, timestamp, profile_set_id)
+    ).lastrowid
+
+    cat_values = set()
+    for col in CATEGORY_COLUMNS:
+        cat_values.update(df[col].unique())
+    cat_values.update(name for pairs in profiles for name, _ in pairs)
+    ids = _category_ids(conn, cat_values)
+
+    coded = {col: df[col].map(ids).astype("Int64") for col in CATEGORY_COLUMNS}
+    numeric = {col: pd.to_numeric(df[col], errors="coerce") for col in NUMERIC_COLUMNS}
+    columns = CATEGORY_COLUMNS + NUMERIC_COLUMNS + TEXT_COLUMNS
+    frame = pd.DataFrame({**coded, **numeric, **{col: df[col] for col in TEXT_COLUMNS}})[columns]
+    frame = frame.astype(object).where(frame.notna(), None)
+    conn.executemany(
+        f"INSERT INTO results (run_key, row_no, {', '.join(columns)}) VALUES ({', '.join('?' for _ in range(len(columns) + 2))})",
+        ((run_key, row_no, *values) for row_no, values in enumerate(frame.itertuples(index=False, name=None)))
+    )
+    event_ids = frame["event"].tolist()
+    conn.executemany(
+        "INSERT INTO result_profiles (run_key, row_no, event, profile, match) VALUES (?, ?, ?, ?, ?)",
+        (
+            (run_key, row_no, event_ids[row_no], ids[name], match)
+            for row_no, pairs in enumerate(profiles)
+            for name, match in pairs
+        )
+    )
+    conn.executemany(
+        "INSERT INTO score_histograms (run_key, band, bin, count) VALUES (?, ?, ?, ?)",
+        _histogram_rows(run_key, [df] + unmatched)
+    )
+    conn.executemany(
+        "INSERT INTO level_combinations (run_key, combination, count) VALUES (?, ?, ?)",
+        _combination_rows(run_key, [df] + unmatched)
+    )
+
+
+def _import_run_dirs(conn: sqlite3.Connection, skip: set) -> set:
+    """Import every run directory with metadata.json and a processing log whose name is not in skip.
+    Returns the imported directory names."""
+    imported = set()
+    for run_dir in sorted(RUNS_DIR.iterdir()) if RUNS_DIR.exists() else []:
+        metadata_path = run_dir / "metadata.json"
+        if run_dir.name in skip or not run_dir.is_dir() or not metadata_path.exists():
+            continue
+        try:
+            with open(metadata_path, "r", encoding="utf-8") as f:
+                metadata = json.load(f)
+            run_id = metadata.get("run_id", run_dir.name)
+            log_path = run_dir / f"processing_log{run_id}.csv"
+            if not log_path.exists():
+                continue
+            df = pd.read_csv(log_path, dtype=str, keep_default_na=False)
+            unmatched = [pd.read_csv(p, dtype=str, keep_default_na=False) for p in unmatched_log_paths(run_dir)]
+            with conn:
+                _insert_run(conn, run_id, df, unmatched, metadata.get("timestamp", ""),
+                            metadata.get("config", {}).get("profile_set_id", "meditasyon"))
+            imported.add(run_dir.name)
+        except Exception as e:
+            print(f"⚠️ Error importing run {run_dir.name}: {e}")
+    return imported
+
+
+def rebuild_store() -> int:
+    """Re-import every run directory that has metadata.json and a processing log. Returns the number of runs stored.
+
+    The store is built in a temporary file and swapped in under the write lock, so appends and
+    queries never see a missing or half-built store. Runs that finished during the rebuild (their
+    append went to the old store) are imported before the swap.
+    """
+    tmp_path = store_path().with_name(RESULTS_FILENAME + ".rebuild")
+    tmp_path.unlink(missing_ok=True)
+    try:
+        with closing(_connect(tmp_path)) as conn:
+            imported = _import_run_dirs(conn, set())
+            with _write_lock:
+                imported |= _import_run_dirs(conn, imported)
+                conn.close()
+                os.replace(tmp_path, store_path())
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return len(imported)
+
+
+def profile_distribution(last_runs: int = 50, profile_set_id: str | None = None) -> List[Dict[str, Any]]:
+    """Profile counts per event (split into 5- and 4-match) over the most recent runs"""
+    run_filter = "WHERE profile_set_id = ?" if profile_set_id else ""
+    params = ([profile_set_id] if profile_set_id else []) + [last_runs]
+    sql = f"""
+        WITH recent AS (
+            SELECT run_key FROM runs {run_filter} ORDER BY timestamp DESC, run_key DESC LIMIT ?
+        )
+        SELECT ev.value AS event, pr.value AS profile,
+               SUM(rp.match = 5) AS match_5, SUM(rp.match = 4) AS match_4, COUNT(*) AS total,
+               COUNT(DISTINCT rp.run_key) AS runs
+        FROM result_profiles rp
+        JOIN recent USING (run_key)
+        JOIN categories pr ON pr.id = rp.profile
+        LEFT JOIN categories ev ON ev.id = rp.event
+        GROUP BY rp.event, rp.profile
+        ORDER BY event, total DESC
+    """
+    with closing(_connect()) as conn:
+        conn.row_factory = sqlite3.Row
+        return [dict(r) for r in conn.execute(sql, params).fetchall()]
+
+
+
+def _backfill_histograms(conn: sqlite3.Connection) -> None:
+    """Histograms for runs stored before score_histograms existed: their stored (matched) rows plus
+    the unmatched logs still in the run directory, as append_run counts them"""
+    missing = conn.execute(
+        "SELECT run_key, run_id FROM runs WHERE run_key NOT IN (SELECT DISTINCT run_key FROM score_histograms)"
+    ).fetchall()
+    for run_key, run_id in missing:
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(f'score_{b}' for b in BANDS)} FROM results WHERE run_key = ?", conn, params=(run_key,)
+        )
+        unmatched = [pd.read_csv(p, dtype=str, keep_default_na=False) for p in unmatched_log_paths(RUNS_DIR / run_id)]
+        conn.executemany(
+            "INSERT INTO score_histograms (run_key, band, bin, count) VALUES (?, ?, ?, ?)",
+            _histogram_rows(run_key, [df] + unmatched)
+        )
+
+
+def score_histograms(last_runs: int = 50, profile_set_id: str | None = None) -> Dict[str, Any]:
+    """Per-band score histograms summed over the most recent runs.
+
+    For each band: `start` is the lower edge of the first bin, `counts[i]` the people in
+    (start + i * width, start + (i + 1) * width] and `above[i]` the people scoring above
+    start + i * width, so the level counts for any cut on a bin edge are differences of `above`.
+    """
+    run_filter = "WHERE profile_set_id = ?" if profile_set_id else ""
+    params = ([profile_set_id] if profile_set_id else []) + [last_runs]
+    recent = f"SELECT run_key FROM runs {run_filter} ORDER BY timestamp DESC, run_key DESC LIMIT ?"
+    with closing(_connect()) as conn:
+        runs = conn.execute(f"SELECT COUNT(*) FROM ({recent})", params).fetchone()[0]
+        rows = conn.execute(f"""
+            WITH recent AS ({recent})
+            SELECT band, bin, SUM(count) FROM score_histograms JOIN recent USING (run_key)
+            WHERE band != ? GROUP BY band, bin ORDER BY band, bin
+        """, params + [_EMPTY_HISTOGRAM_BAND]).fetchall()
+
+    bands = {}
+    for band in BANDS:
+        bins = np.array([r[1] for r in rows if r[0] == band], dtype=np.int64)
+        counts = np.array([r[2] for r in rows if r[0] == band], dtype=np.int64)
+        if len(bins):
+            dense = np.zeros(bins[-1] - bins[0] + 1, dtype=np.int64)
+            dense[bins - bins[0]] = counts
+        else:
+            dense = np.zeros(0, dtype=np.int64)
+        bands[band.capitalize()] = {
+            "start": float(bins[0] * HISTOGRAM_BIN_WIDTH) if len(bins) else 0.0,
+            "counts": dense.tolist(),
+            "above": dense[::-1].cumsum()[::-1].tolist(),
+            "total": int(dense.sum()),
+        }
+    return {"bin_width": HISTOGRAM_BIN_WIDTH, "runs": runs, "bands": bands}
+
+
+def _backfill_combinations(conn: sqlite3.Connection) -> None:
+    """Level combination counts for runs stored before level_combinations existed: their stored (matched)
+    rows plus the unmatched logs still in the run directory, as append_run counts them"""
+    missing = conn.execute(
+        "SELECT run_key, run_id FROM runs WHERE run_key NOT IN (SELECT DISTINCT run_key FROM level_combinations)"
+    ).fetchall()
+    joins = " ".join(f"LEFT JOIN categories c_{b} ON c_{b}.id = r.level_{b}" for b in BANDS)
+    for run_key, run_id in missing:
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(f'c_{b}.value AS level_{b}' for b in BANDS)} FROM results r {joins} WHERE r.run_key = ?",
+            conn, params=(run_key,)
+        )
+        unmatched = [pd.read_csv(p, dtype=str, keep_default_na=False) for p in unmatched_log_paths(RUNS_DIR / run_id)]
+        conn.executemany(
+            "INSERT INTO level_combinations (run_key, combination, count) VALUES (?, ?, ?)",
+            _combination_rows(run_key, [df] + unmatched)
+        )
+
+
+def level_combination_counts(last_runs: int = 50, profile_set_id: str | None = None) -> Dict[str, Any]:
+    """People per level combination (matched and unmatched) over the most recent runs.
+
+    `combinations` are pack_level_codes keys, `counts` the people with that combination.
+    """
+    run_filter = "WHERE profile_set_id = ?" if profile_set_id else ""
+    params = ([profile_set_id] if profile_set_id else []) + [last_runs]
+    recent = f"SELECT run_key FROM runs {run_filter} ORDER BY timestamp DESC, run_key DESC LIMIT ?"
+    with closing(_connect()) as conn:
+        runs = conn.execute(f"SELECT COUNT(*) FROM ({recent})", params).fetchone()[0]
+        rows = conn.execute(f"""
+            WITH recent AS ({recent})
+            SELECT combination, SUM(count) FROM level_combinations JOIN recent USING (run_key)
+            WHERE combination != ? GROUP BY combination ORDER BY combination
+        """, params + [_EMPTY_COMBINATION]).fetchall()
+    return {
+        "runs": runs,
+        "combinations": np.array([r[0] for r in rows], dtype=np.int64),
+        "counts": np.array([r[1] for r in rows], dtype=np.int64),
+    }
+
+
+# Rebuild from existing run directories: python -m app.core.results_store (from backend/)
+if __name__ == "__main__":
+    count = rebuild_store()
+    print(f"✅ Results store rebuilt: {count} runs -> {store_path()}")
@@ -0,0 +1,169 @@
+import json
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+RUNS_DIR = Path(__file__).parent.parent / "data" / "runs"
+# SQLite index of finished runs for the /runs listing. Lives next to the run
+# directories and is updated when a run finishes.
+INDEX_FILENAME = "runs_index.sqlite3"
+# PRAGMA user_version once rebuild_index has backfilled the existing run directories
+INDEX_VERSION = 1
+
+SORT_COLUMNS = {"run_id", "timestamp", "profile_set_id", "processed_files", "matched_count", "unmatched_count", "matched_rate"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    profile_set_id TEXT NOT NULL,
+    processed_files INTEGER NOT NULL,
+    matched_count INTEGER NOT NULL,
+    unmatched_count INTEGER NOT NULL,
+    matched_rate REAL,
+    dominance_delta REAL NOT NULL,
+    balance_threshold REAL NOT NULL,
+    window_secs INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs (timestamp);
+CREATE INDEX IF NOT EXISTS idx_runs_profile_set ON runs (profile_set_id);
+CREATE INDEX IF NOT EXISTS idx_runs_matched_rate ON runs (matched_rate);
+"""
+
+_COLUMNS = ("run_id", "timestamp", "profile_set_id", "processed_files", "matched_count", "unmatched_count",
+            "matched_rate", "dominance_delta", "balance_threshold", "window_secs")
+
+_rebuild_lock = threading.Lock()
+
+
+def index_path() -> Path:
+    return RUNS_DIR / INDEX_FILENAME
+
+
+def _connect() -> sqlite3.Connection:
+    RUNS_DIR.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(index_path()), timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def summary_row(metadata: Dict[str, Any], run_dir_name: str) -> Dict[str, Any]:
+    """Flatten a run's metadata.json into an index row (same defaults as RunSummary)"""
+    config_data = metadata.get("config", {})
+    matched = metadata.get("matched_count", 0)
+    unmatched = metadata.get("unmatched_count", 0)
+    return {
+        "run_id": metadata.get("run_id", run_dir_name),
+        "timestamp": metadata.get("timestamp", ""),
+        "profile_set_id": config_data.get("profile_set_id", "meditasyon"),
+        "processed_files": metadata.get("processed_files", 0),
+        "matched_count": matched,
+        "unmatched_count": unmatched,
+        "matched_rate": matched / (matched + unmatched) if (matched + unmatched) > 0 else None,
+        "dominance_delta": config_data.get("dominance_delta", 29.0),
+        "balance_threshold": config_data.get("balance_threshold", 22.0),
+        "window_secs": config_data.get("window_secs", 30),
+    }
+
+
+def _upsert(conn: sqlite3.Connection, row: Dict[str, Any]) -> None:
+    placeholders = ", ".join("?" for _ in _COLUMNS)
+    conn.execute(
+        f"INSERT OR REPLACE INTO runs ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+        [row[c] for c in _COLUMNS]
+    )
+
+
+def index_run(metadata: Dict[str, Any], run_dir: Path) -> None:
+    """Add or update a finished run in the index (backfilling the index first if it was never built)"""
+    ensure_index()
+    with closing(_connect()) as conn, conn:
+        _upsert(conn, summary_row(metadata, run_dir.name))
+
+
+def rebuild_index() -> int:
+    """Re-scan every run directory and replace the index contents. Returns the number of runs indexed"""
+    rows = []
+    RUNS_DIR.mkdir(parents=True, exist_ok=True)
+    for run_dir in RUNS_DIR.iterdir():
+        metadata_path = run_dir / "metadata.json"
+        if not run_dir.is_dir() or not metadata_path.exists():
+            continue
+        try:
+            with open(metadata_path, "r", encoding="utf-8") as f:
+                rows.append(summary_row(json.load(f), run_dir.name))
+        except Exception as e:
+            print(f"⚠️ Error reading run {run_dir.name}: {e}")
+
+    with _rebuild_lock, closing(_connect()) as conn, conn:
+        conn.execute("DELETE FROM runs")
+        for row in rows:
+            _upsert(conn, row)
+        conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+    return len(rows)
+
+
+def ensure_index() -> None:
+    """Build the index on first use (e.g. existing runs before the index was introduced).
+
+    Checks the version rebuild_index records rather than the file, which index_run
+    would otherwise create empty before the first listing.
+    """
+    with closing(_connect()) as conn:
+        built = conn.execute("PRAGMA user_version").fetchone()[0] >= INDEX_VERSION
+    if not built:
+        rebuild_index()
+
+
+def query_runs(
+    offset: int = 0,
+    limit: int | None = None,
+    sort: str = "run_id",
+    order: str = "desc",
+    profile_set_id: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    min_matched_rate: float | None = None,
+    max_matched_rate: float | None = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Return (rows, total matching rows) for one page of the runs listing"""
+    if sort not in SORT_COLUMNS:
+        raise ValueError(f"Invalid sort column: {sort}")
+    if order not in ("asc", "desc"):
+        raise ValueError(f"Invalid sort order: {order}")
+
+    where, params = [], []
+    if profile_set_id:
+        where.append("profile_set_id = ?")
+        params.append(profile_set_id)
+    if date_from:
+        where.append("substr(timestamp, 1, 10) >= ?")
+        params.append(date_from.isoformat())
+    if date_to:
+        where.append("substr(timestamp, 1, 10) <= ?")
+        params.append(date_to.isoformat())
+    if min_matched_rate is not None:
+        where.append("matched_rate >= ?")
+        params.append(min_matched_rate)
+    if max_matched_rate is not None:
+        where.append("matched_rate <= ?")
+        params.append(max_matched_rate)
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+
+    ensure_index()
+    with closing(_connect()) as conn:
+        total = conn.execute(f"SELECT COUNT(*) FROM runs {where_sql}", params).fetchone()[0]
+        # run_id as tie-breaker keeps pages stable
+        sql = f"SELECT * FROM runs {where_sql} ORDER BY {sort} {order.upper()}, run_id {order.upper()} LIMIT ? OFFSET ?"
+        rows = conn.execute(sql, params + [-1 if limit is None else limit, offset]).fetchall()
+    return [dict(r) for r in rows], total
+
+
+# Rebuild from existing run directories: python -m app.core.run_index (from backend/)
+if __name__ == "__main__":
+    count = rebuild_index()
+    print(f"✅ Run index rebuilt: {count} runs -> {index_path()}")
@@ -0,0 +1,76 @@
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Tuple
+import json
+
+from analyze_processing_log import save_summary_json
+
+# Parsed summaries kept in memory, keyed by JSON path and validated by ETag
+SUMMARY_CACHE_SIZE = 8
+
+_cache: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def find_summary_files(run_dir: Path, run_id: str) -> Tuple[Path, Path]:
+    """Return (json_path, xlsx_path) for a run, preferring the run-id named files"""
+    for stem in (f"profile_summary{run_id}", "profile_summary"):
+        json_path = run_dir / f"{stem}.json"
+        xlsx_path = run_dir / f"{stem}.xlsx"
+        if json_path.exists() or xlsx_path.exists():
+            return json_path, xlsx_path
+    return run_dir / f"profile_summary{run_id}.json", run_dir / f"profile_summary{run_id}.xlsx"
+
+
+def summary_etag(path: Path) -> str:
+    """Strong ETag derived from the file's mtime and size"""
+    st = path.stat()
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def backfill_summary_json(json_path: Path, xlsx_path: Path, run_id: str) -> Path:
+    """Build the JSON summary from an existing xlsx (runs created before the JSON existed)"""
+    import pandas as pd
+
+    sheets = pd.read_excel(str(xlsx_path), sheet_name=None)
+    save_summary_json(list(sheets.items()), str(json_path), run_id=run_id)
+    return json_path
+
+
+def load_summary(run_dir: Path, run_id: str) -> Tuple[str, Dict[str, Any]]:
+    """Return (etag, parsed summary) for a run.
+
+    Raises FileNotFoundError if the run has neither a JSON nor an xlsx summary.
+    """
+    json_path, xlsx_path = find_summary_files(run_dir, run_id)
+    if not json_path.exists() or (xlsx_path.exists() and xlsx_path.stat().st_mtime > json_path.stat().st_mtime):
+        if not xlsx_path.exists():
+            raise FileNotFoundError(str(xlsx_path))
+        backfill_summary_json(json_path, xlsx_path, run_id)
+
+    etag = summary_etag(json_path)
+    key = str(json_path)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[0] == etag:
+            _cache.move_to_end(key)
+            return cached
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    with _cache_lock:
+        _cache[key] = (etag, data)
+        _cache.move_to_end(key)
+        while len(_cache) > SUMMARY_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return etag, data
@@ -1,5 +1,10 @@
 from pydantic import BaseModel, Field
-from typing import Dict
+from typing import Dict, List, Literal
+
+# What a run writes besides the processing log CSV (which is always written).
+# Leaving out plots/summary/unmatched_xlsx gives a lean headless run.
+RunOutput = Literal["log", "plots", "summary", "unmatched_xlsx", "parquet"]
+DEFAULT_OUTPUTS = ["log", "plots", "summary", "unmatched_xlsx"]
 
 
 class BandThresholds(BaseModel):
@@ -18,3 +23,11 @@ class RunConfig(BaseModel):
     data_root: str | None = None
     profile_set_id: str = "meditasyon"
     band_thresholds: Dict[str, BandThresholds] = Field(default_factory=dict)
+    plot_format: Literal["png", "webp"] = "png"
+    plot_thumbnails: bool = True
+    plot_mode: Literal["individual", "montage", "both"] = "individual"
+    outputs: List[RunOutput] = Field(default_factory=lambda: list(DEFAULT_OUTPUTS))
+    # Recordings read ahead while the current one is analysed (0 = serial) and the
+    # on-disk size the read-ahead queue may hold; raise both for network-mounted data_root
+    prefetch: int = Field(2, ge=0, le=32)
+    prefetch_max_mb: int = Field(512, ge=1)
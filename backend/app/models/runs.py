@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from .config import RunConfig
+from pydantic import BaseModel, Field
+from typing import Dict, List
+from .config import BandThresholds, RunConfig
 
 
 class RunResult(BaseModel):
@@ -12,6 +13,30 @@ class RunResult(BaseModel):
     log_file: str
     plots_dir: str
     summary_xlsx: str | None = None
+    source_run_id: str | None = None
+
+
+class ReclassifyRequest(BaseModel):
+    """Overrides applied to a finished run's stored scores (unset fields keep the run's value)"""
+    profile_set_id: str | None = None
+    balance_threshold: float | None = None
+    denge_mean_threshold: float | None = None
+    dominance_delta: float | None = None
+
+
+class RelevelRequest(ReclassifyRequest):
+    """New band thresholds (per band) applied to stored scores; the result is returned, not saved"""
+    band_thresholds: Dict[str, BandThresholds] = Field(default_factory=dict)
+
+
+class ScoreVector(BaseModel):
+    id: str | None = None
+    scores: Dict[str, float | None]  # "Delta" ... "Gamma"
+
+
+class ClassifyRequest(RelevelRequest):
+    """Pre-computed score vectors to classify; unset fields use the RunConfig defaults"""
+    rows: List[ScoreVector] = Field(default_factory=list)
 
 
 class RunSummary(BaseModel):
@@ -24,3 +49,4 @@ class RunSummary(BaseModel):
     dominance_delta: float
     balance_threshold: float
     window_secs: int
+    matched_rate: float | None = None
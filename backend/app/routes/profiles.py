@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from app.core.coverage import draft_profile_set_coverage, stored_profile_set_coverage
 from app.core.profiles_manager import (
     list_profile_sets,
     get_profile_set,
@@ -25,6 +26,28 @@ async def get_profile_set_endpoint(profile_set_id: str):
         raise HTTPException(status_code=404, detail=str(e))
 
 
+@router.post("/coverage")
+async def draft_coverage_endpoint(profile_set: ProfileSet, last_runs: int = Query(50, ge=1, le=10000)):
+    """Coverage of an edited (unsaved) profile set over all level combinations, weighted by recent runs"""
+    try:
+        return draft_profile_set_coverage(profile_set, last_runs=last_runs)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{profile_set_id}/coverage")
+async def coverage_endpoint(profile_set_id: str, last_runs: int = Query(50, ge=1, le=10000)):
+    """Coverage of a saved profile set over all level combinations, weighted by recent runs"""
+    try:
+        return stored_profile_set_coverage(profile_set_id, last_runs=last_runs)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error analyzing coverage: {str(e)}")
+
+
 @router.post("", response_model=ProfileSet)
 async def create_profile_set_endpoint(profile_set: ProfileSet):
     """Create a new profile set"""
@@ -1,18 +1,54 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Body
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Body, Query, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from pydantic import ValidationError
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime
 import json
 import sys
 
-from app.core.engine import run_batch, run_single
+from app.core.classify import classify_vectors, result_csv, result_records, vectors_from_csv, vectors_from_rows
+from app.core.engine import (
+    analyze_upload,
+    compare_profile_set_ids,
+    reclassify_run,
+    run_batch,
+    run_files,
+    run_manifest,
+    run_single,
+    validate_run_config
+)
+from app.core.export import (
+    collect_export_files,
+    export_cache_path,
+    is_export_cached,
+    iter_run_export,
+    iter_file_range,
+    parse_byte_range
+)
+from app.core.relevel import relevel_results, relevel_run
+from app.core.results_store import profile_distribution, rebuild_store, score_histograms
+from app.core.run_index import SORT_COLUMNS, query_runs, rebuild_index
+from app.core.summaries import etag_matches, load_summary
 from app.models.config import RunConfig
-from app.models.runs import RunResult, RunSummary
+from app.models.runs import ClassifyRequest, ReclassifyRequest, RelevelRequest, RunResult, RunSummary
+from recording_format import is_binary_recording, is_recording_path
+from zenin_plot_generator import read_plot_index, thumbnail_path, THUMB_DIRNAME
 
 router = APIRouter()
 
 RUNS_DIR = Path(__file__).parent.parent / "data" / "runs"
 
+PLOT_MEDIA_TYPES = {
+    ".png": "image/png",
+    ".webp": "image/webp",
+}
+
+
+def _input_name(content: bytes) -> str:
+    """File name of an uploaded recording inside the run folder (binary .zrec or CSV)"""
+    return "input.zrec" if is_binary_recording(content) else "input.csv"
+
 
 @router.post("/run/batch", response_model=RunResult)
 async def run_batch_endpoint(config: RunConfig):
@@ -35,6 +71,157 @@ async def run_single_endpoint(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/run/files", response_model=RunResult)
+async def run_files_endpoint(
+    config: RunConfig = Body(...),
+    files: list[str] = Body(default_factory=list),
+    manifest: str | None = Body(None)
+):
+    """Run pipeline on an explicit list of CSV paths, or on the paths listed in a manifest file.
+    
+    Files are processed where they are (no copies); events are their folders relative to
+    config.data_root (or the manifest's folder).
+    """
+    try:
+        if manifest:
+            return run_manifest(config, manifest)
+        return run_files(config, files)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/run/compare-profile-sets")
+async def compare_profile_sets_endpoint(
+    config: RunConfig = Body(...),
+    profile_set_ids: list[str] = Body(default_factory=list)
+):
+    """Classify all CSVs in data_root against several profile sets in one pass and compare the results"""
+    try:
+        return compare_profile_set_ids(config, profile_set_ids)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/classify")
+async def classify_endpoint(
+    request: Request,
+    profile_set_id: str | None = Query(None),
+    balance_threshold: float | None = Query(None),
+    denge_mean_threshold: float | None = Query(None),
+    dominance_delta: float | None = Query(None)
+):
+    """Classify pre-computed per-band scores (JSON ClassifyRequest or a CSV body); no run is created.
+
+    Query parameters override the body (CSV bodies take them only from the query).
+    Send `Accept: text/csv` for a CSV response with processing log column names.
+    """
+    overrides = {
+        k: v for k, v in {
+            "profile_set_id": profile_set_id,
+            "balance_threshold": balance_threshold,
+            "denge_mean_threshold": denge_mean_threshold,
+            "dominance_delta": dominance_delta,
+        }.items() if v is not None
+    }
+    try:
+        # Parsing and classification are CPU-bound (up to MAX_CLASSIFY_ROWS rows): keep the event loop free
+        if "csv" in request.headers.get("content-type", ""):
+            payload = ClassifyRequest(**overrides)
+            ids, scores = await run_in_threadpool(vectors_from_csv, await request.body())
+        else:
+            body = await request.json()
+            if not isinstance(body, dict):
+                raise ValueError("Expected a JSON object with 'rows'")
+            payload = ClassifyRequest.model_validate({**body, **overrides})
+            ids, scores = await run_in_threadpool(vectors_from_rows, payload.rows)
+        result = await run_in_threadpool(classify_vectors, payload, ids, scores)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=json.loads(e.json()))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error classifying scores: {str(e)}")
+
+    if "text/csv" in request.headers.get("accept", ""):
+        return Response(content=await run_in_threadpool(result_csv, result), media_type="text/csv")
+    # Records are plain JSON types already; skipping jsonable_encoder matters for large batches
+    return JSONResponse({
+        "profile_set_id": result["profile_set_id"],
+        "count": result["count"],
+        "elapsed_ms": result["elapsed_ms"],
+        "results": await run_in_threadpool(result_records, result),
+    })
+
+
+@router.post("/analyze")
+async def analyze_endpoint(
+    request: Request,
+    name: str = Query("upload.csv"),
+    profile_set_id: str | None = Query(None),
+    dominance_delta: float | None = Query(None),
+    balance_threshold: float | None = Query(None),
+    denge_mean_threshold: float | None = Query(None),
+    window_secs: int | None = Query(None),
+    window_samples: int | None = Query(None),
+    plot: bool = Query(False),
+    persist: bool = Query(False)
+):
+    """Analyze one recording in memory and return its metrics, dominance and profile match.
+    
+    The body is the raw CSV, or multipart with `file` (and an optional `config` JSON as in
+    /run/upload). Query parameters override the config. plot=true adds the rendered plots
+    (base64) to the response. Nothing is written unless persist=true, which also stores the
+    analyzed recording as a regular single-file run (with plots only if plot=true).
+    """
+    overrides = {
+        k: v for k, v in {
+            "profile_set_id": profile_set_id,
+            "dominance_delta": dominance_delta,
+            "balance_threshold": balance_threshold,
+            "denge_mean_threshold": denge_mean_threshold,
+            "window_secs": window_secs,
+            "window_samples": window_samples,
+        }.items() if v is not None
+    }
+    try:
+        base = {}
+        if request.headers.get("content-type", "").startswith("multipart/form-data"):
+            form = await request.form()
+            upload = form.get("file")
+            if upload is None or isinstance(upload, str):
+                raise ValueError("Multipart body needs a 'file' field")
+            content = await upload.read()
+            name = upload.filename or name
+            if form.get("config"):
+                base = json.loads(form["config"])
+        else:
+            content = await request.body()
+        if not content:
+            raise ValueError("Empty recording")
+        config = RunConfig(**{**base, **overrides})
+        # CPU-bound: keep the event loop free for concurrent requests
+        result = await run_in_threadpool(analyze_upload, content, config, name, plot, persist)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=json.loads(e.json()))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error analyzing recording: {str(e)}")
+    return JSONResponse(result)
+
+
 @router.post("/run/upload", response_model=RunResult)
 async def run_upload_endpoint(
     file: UploadFile = File(...),
@@ -43,16 +230,17 @@ async def run_upload_endpoint(
     """Run pipeline on an uploaded CSV file"""
     try:
         config_obj = RunConfig.parse_raw(config)
+        validate_run_config(config_obj)
         run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         run_dir = RUNS_DIR / run_id
         run_dir.mkdir(parents=True, exist_ok=True)
         
-        csv_path = run_dir / "input.csv"
+        content = await file.read()
+        csv_path = run_dir / _input_name(content)
         with open(csv_path, "wb") as f:
-            content = await file.read()
             f.write(content)
         
-        return run_single(config_obj, str(csv_path))
+        return run_single(config_obj, str(csv_path), run_id=run_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -65,6 +253,7 @@ async def run_upload_batch_endpoint(
     """Run pipeline on multiple uploaded CSV files (folder upload)"""
     try:
         config_obj = RunConfig.parse_raw(config)
+        validate_run_config(config_obj)
         run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         run_dir = RUNS_DIR / run_id
         input_dir = run_dir / "input"
@@ -73,7 +262,7 @@ async def run_upload_batch_endpoint(
         # Save all uploaded CSV files (flatten directory structure)
         csv_count = 0
         for file in files:
-            if file.filename and file.filename.lower().endswith('.csv'):
+            if file.filename and is_recording_path(file.filename):
                 # Extract only the basename to flatten the directory structure
                 # This handles cases where webkitdirectory includes folder names like "sample data/file.csv"
                 safe_name = Path(file.filename).name
@@ -85,7 +274,7 @@ async def run_upload_batch_endpoint(
                 csv_count += 1
         
         if csv_count == 0:
-            raise ValueError("No CSV files found in uploaded folder")
+            raise ValueError("No recording files (.csv or .zrec) found in uploaded folder")
         
         # Update config to use the input directory as data_root
         config_obj.data_root = str(input_dir)
@@ -97,40 +286,98 @@ async def run_upload_batch_endpoint(
 
 
 @router.get("/runs", response_model=list[RunSummary])
-async def list_runs_endpoint():
-    """List all past runs"""
-    RUNS_DIR.mkdir(parents=True, exist_ok=True)
-    
-    runs = []
-    for run_dir in sorted(RUNS_DIR.iterdir(), reverse=True):
-        if not run_dir.is_dir():
-            continue
-        
-        metadata_path = run_dir / "metadata.json"
-        if not metadata_path.exists():
-            continue
-        
-        try:
-            with open(metadata_path, "r", encoding="utf-8") as f:
-                metadata = json.load(f)
-            
-            config_data = metadata.get("config", {})
-            runs.append(RunSummary(
-                run_id=metadata.get("run_id", run_dir.name),
-                timestamp=metadata.get("timestamp", ""),
-                profile_set_id=config_data.get("profile_set_id", "meditasyon"),
-                processed_files=metadata.get("processed_files", 0),
-                matched_count=metadata.get("matched_count", 0),
-                unmatched_count=metadata.get("unmatched_count", 0),
-                dominance_delta=config_data.get("dominance_delta", 29.0),
-                balance_threshold=config_data.get("balance_threshold", 22.0),
-                window_secs=config_data.get("window_secs", 30)
-            ))
-        except Exception as e:
-            print(f"⚠️ Error reading run {run_dir.name}: {e}")
-            continue
+async def list_runs_endpoint(
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1, le=1000, description="Page size (all runs if omitted)"),
+    sort: str = Query("run_id", description=f"One of: {', '.join(sorted(SORT_COLUMNS))}"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    profile_set_id: str | None = Query(None),
+    date_from: date | None = Query(None, description="Runs on or after this date (YYYY-MM-DD)"),
+    date_to: date | None = Query(None, description="Runs on or before this date (YYYY-MM-DD)"),
+    min_matched_rate: float | None = Query(None, ge=0, le=1),
+    max_matched_rate: float | None = Query(None, ge=0, le=1)
+):
+    """List past runs from the run index. Total matching runs is returned in X-Total-Count"""
+    try:
+        rows, total = query_runs(
+            offset=offset,
+            limit=limit,
+            sort=sort,
+            order=order,
+            profile_set_id=profile_set_id,
+            date_from=date_from,
+            date_to=date_to,
+            min_matched_rate=min_matched_rate,
+            max_matched_rate=max_matched_rate
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading run index: {str(e)}")
     
-    return runs
+    response.headers["X-Total-Count"] = str(total)
+    return [RunSummary(**row) for row in rows]
+
+
+@router.post("/runs/index/rebuild")
+async def rebuild_run_index_endpoint():
+    """Re-scan all run directories and rebuild the run index"""
+    try:
+        count = rebuild_index()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rebuilding run index: {str(e)}")
+    return {"indexed_runs": count}
+
+
+@router.get("/results/profile-distribution")
+async def profile_distribution_endpoint(
+    last_runs: int = Query(50, ge=1, le=10000),
+    profile_set_id: str | None = Query(None)
+):
+    """Profile counts per event across the most recent runs (from the cross-run results store)"""
+    try:
+        rows = profile_distribution(last_runs=last_runs, profile_set_id=profile_set_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error querying results store: {str(e)}")
+    return {"last_runs": last_runs, "profile_set_id": profile_set_id, "rows": rows}
+
+
+@router.get("/results/score-histograms")
+async def score_histograms_endpoint(
+    last_runs: int = Query(50, ge=1, le=10000),
+    profile_set_id: str | None = Query(None)
+):
+    """Per-band score histograms (with cumulative counts) over the most recent runs, for previewing band thresholds"""
+    try:
+        histograms = score_histograms(last_runs=last_runs, profile_set_id=profile_set_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error querying results store: {str(e)}")
+    return {"last_runs": last_runs, "profile_set_id": profile_set_id, **histograms}
+
+
+@router.post("/results/relevel")
+async def relevel_results_endpoint(
+    request: RelevelRequest = Body(default_factory=RelevelRequest),
+    last_runs: int = Query(50, ge=1, le=10000)
+):
+    """Profile distribution of the most recent stored runs re-leveled with new band thresholds (nothing is saved)"""
+    try:
+        return relevel_results(request, last_runs=last_runs)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error re-leveling stored results: {str(e)}")
+
+
+@router.post("/results/rebuild")
+async def rebuild_results_store_endpoint():
+    """Re-import every run's processing log into the cross-run results store"""
+    try:
+        count = rebuild_store()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rebuilding results store: {str(e)}")
+    return {"imported_runs": count}
 
 
 @router.get("/runs/{run_id}", response_model=RunResult)
@@ -174,12 +421,39 @@ async def get_run_endpoint(run_id: str):
             unmatched_count=metadata.get("unmatched_count", 0),
             log_file=str(log_file) if log_file.exists() else "",
             plots_dir=str(run_dir / "graphs"),
-            summary_xlsx=str(summary_xlsx) if summary_xlsx and summary_xlsx.exists() else None
+            summary_xlsx=str(summary_xlsx) if summary_xlsx and summary_xlsx.exists() else None,
+            source_run_id=metadata.get("source_run_id")
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/runs/{run_id}/reclassify", response_model=RunResult)
+async def reclassify_run_endpoint(run_id: str, request: ReclassifyRequest = Body(default_factory=ReclassifyRequest)):
+    """Apply a different profile set / thresholds to a run's stored scores and save it as a new run"""
+    try:
+        return reclassify_run(run_id, request)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/runs/{run_id}/relevel")
+async def relevel_run_endpoint(run_id: str, request: RelevelRequest = Body(default_factory=RelevelRequest)):
+    """Profile distribution of a run's stored scores re-leveled with new band thresholds (nothing is saved)"""
+    try:
+        return relevel_run(run_id, request)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/runs/{run_id}/log")
 async def get_run_log_endpoint(run_id: str):
     """Download the processing log CSV for a run"""
@@ -203,112 +477,154 @@ async def get_run_log_endpoint(run_id: str):
     )
 
 
+def _legacy_plot_entries(run_dir: Path) -> list[dict]:
+    """Build plot entries by walking graphs/ for runs created before the plot index existed"""
+    plots_dir = run_dir / "graphs"
+    if not plots_dir.exists():
+        return []
+    
+    entries = []
+    for png_file in plots_dir.rglob("*.png"):
+        if png_file.parent.name == THUMB_DIRNAME:
+            continue
+        rel_path = png_file.relative_to(run_dir)
+        entries.append({
+            "path": str(rel_path).replace("\\", "/"),  # Normalize path separators
+            "thumb": None,
+            "event": None,
+            "category": png_file.parent.name,
+            "unmatched": False,
+            "person": png_file.stem,
+            "profile": "",
+        })
+    return entries
+
+
 @router.get("/runs/{run_id}/plots")
-async def list_plots_endpoint(run_id: str):
-    """List all plot files for a run"""
+async def list_plots_endpoint(
+    run_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int | None = Query(None, ge=1),
+    event: str | None = None,
+    category: str | None = None
+):
+    """List plot files for a run (paginated, filterable by event and dominant/normal)"""
     run_dir = RUNS_DIR / run_id
     if not run_dir.exists():
         raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
     
-    plots_dir = run_dir / "graphs"
-    if not plots_dir.exists():
-        return {"plots": []}
+    # Read the per-run plot index written during the pipeline instead of walking the directory
+    index_path = run_dir / f"plot_index{run_id}.jsonl"
+    if index_path.exists():
+        entries = read_plot_index(str(index_path))
+    else:
+        entries = _legacy_plot_entries(run_dir)
     
-    # Recursively find all PNG files
-    plots = []
-    for png_file in plots_dir.rglob("*.png"):
-        rel_path = png_file.relative_to(plots_dir)
-        plots.append(str(rel_path).replace("\\", "/"))  # Normalize path separators
+    if event is not None:
+        entries = [e for e in entries if e.get("event") == event]
+    if category is not None:
+        entries = [e for e in entries if e.get("category") == category]
+    entries.sort(key=lambda e: e["path"])
     
-    return {"plots": sorted(plots)}
+    total = len(entries)
+    page = entries[offset:offset + limit] if limit is not None else entries[offset:]
+    
+    return {
+        "plots": [e["path"] for e in page],
+        "items": page,
+        "total": total,
+        "offset": offset,
+        "limit": limit
+    }
 
 
 @router.get("/runs/{run_id}/plots/{filename:path}")
-async def get_plot_endpoint(run_id: str, filename: str):
-    """Serve a plot image file"""
+async def get_plot_endpoint(run_id: str, filename: str, variant: str = "full"):
+    """Serve a plot image file (variant=thumb serves the thumbnail when one exists)"""
     run_dir = RUNS_DIR / run_id
     if not run_dir.exists():
         raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
     
-    plots_dir = run_dir / "graphs"
-    plot_path = plots_dir / filename
+    # Plot paths are relative to the run directory; older listings were relative to graphs/
+    plot_path = run_dir / filename
+    if not plot_path.exists():
+        plot_path = run_dir / "graphs" / filename
     
-    # Security: ensure the path is within plots_dir
+    # Security: ensure the path is within run_dir
     try:
-        plot_path.resolve().relative_to(plots_dir.resolve())
+        plot_path.resolve().relative_to(run_dir.resolve())
     except ValueError:
         raise HTTPException(status_code=403, detail="Invalid path")
     
+    media_type = PLOT_MEDIA_TYPES.get(plot_path.suffix.lower())
+    if media_type is None:
+        raise HTTPException(status_code=403, detail="Invalid path")
+    
     if not plot_path.exists():
         raise HTTPException(status_code=404, detail=f"Plot {filename} not found")
     
-    return FileResponse(str(plot_path), media_type="image/png")
+    if variant == "thumb":
+        thumb_path = Path(thumbnail_path(str(plot_path)))
+        if thumb_path.exists():
+            plot_path = thumb_path
+    
+    return FileResponse(str(plot_path), media_type=media_type)
 
 
 @router.get("/runs/{run_id}/summary")
-async def get_summary_endpoint(run_id: str):
-    """Get the profile summary as JSON for inline viewing"""
+async def get_summary_endpoint(
+    run_id: str,
+    request: Request,
+    sheet: str | None = Query(None, description="Return only this sheet"),
+    offset: int = Query(0, ge=0, description="Row offset (with sheet)"),
+    limit: int | None = Query(None, ge=1, le=10000, description="Max rows (with sheet)")
+):
+    """Get the profile summary as JSON for inline viewing.
+    
+    Served from the precomputed profile_summary JSON (backfilled from the xlsx
+    for older runs). Supports If-None-Match, and ?sheet= with row pagination.
+    While a run is in progress the summary is partial ("partial": true).
+    """
     run_dir = RUNS_DIR / run_id
     if not run_dir.exists():
         raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
     
-    # Try multiple possible file names
-    summary_file = run_dir / f"profile_summary{run_id}.xlsx"
-    if not summary_file.exists():
-        summary_file = run_dir / "profile_summary.xlsx"
-    
-    if not summary_file.exists():
-        raise HTTPException(status_code=404, detail=f"Summary file for run {run_id} not found")
-    
-    # Helper function to convert DataFrame to JSON-safe dict
-    def df_to_json_safe(df: "pd.DataFrame"):
-        """Convert DataFrame to JSON-safe dict, handling NaN and Infinity values"""
-        import numpy as np
-        import pandas as pd
-        import math
-        
-        # Replace inf and -inf with NaN first
-        df = df.replace([np.inf, -np.inf], np.nan)
-        
-        # Convert to dict first
-        records = df.to_dict(orient="records")
-        
-        # Now iterate through and replace any NaN/None values
-        cleaned_records = []
-        for record in records:
-            cleaned_record = {}
-            for key, value in record.items():
-                # Check if value is NaN (works for both float NaN and np.nan)
-                if isinstance(value, float) and math.isnan(value):
-                    cleaned_record[key] = None
-                elif value is None or (isinstance(value, float) and math.isinf(value)):
-                    cleaned_record[key] = None
-                else:
-                    cleaned_record[key] = value
-            cleaned_records.append(cleaned_record)
-        
-        return cleaned_records
-    
-    # Read the Excel file and convert to JSON
     try:
-        import pandas as pd
-        
-        # Read all sheets from the Excel file at once
-        sheets = pd.read_excel(str(summary_file), sheet_name=None)
-        
-        # Convert each sheet to JSON-safe dict
-        sheets_json = {
-            sheet_name: df_to_json_safe(df)
-            for sheet_name, df in sheets.items()
-        }
-        
-        return {
-            "run_id": run_id,
-            "sheets": sheets_json,
-            "download_url": f"/runs/{run_id}/summary/download"
-        }
+        etag, data = load_summary(run_dir, run_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Summary file for run {run_id} not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading summary file: {str(e)}")
+    
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    sheets = data.get("sheets", {})
+    sheet_names = data.get("sheet_names") or list(sheets.keys())
+    payload = {
+        "run_id": run_id,
+        "sheet_names": sheet_names,
+        "download_url": f"/runs/{run_id}/summary/download",
+        "partial": data.get("partial", False)
+    }
+    
+    if sheet is None:
+        payload["sheets"] = sheets
+    else:
+        if sheet not in sheets:
+            raise HTTPException(status_code=404, detail=f"Sheet '{sheet}' not found in summary for run {run_id}")
+        rows = sheets[sheet]
+        end = len(rows) if limit is None else offset + limit
+        payload.update({
+            "sheet": sheet,
+            "sheets": {sheet: rows[offset:end]},
+            "total_rows": len(rows),
+            "offset": offset,
+            "limit": limit
+        })
+    
+    return JSONResponse(payload, headers=headers)
 
 
 @router.get("/runs/{run_id}/summary/download")
@@ -331,3 +647,57 @@ async def download_summary_endpoint(run_id: str):
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         filename=f"profile_summary_{run_id}.xlsx"
     )
+
+
+@router.get("/runs/{run_id}/export")
+async def export_run_endpoint(
+    run_id: str,
+    request: Request,
+    plots: bool = True,
+    logs: bool = True,
+    summary: bool = True
+):
+    """Stream a zip of the run directory (plots, logs and/or summary).
+    
+    The archive is generated incrementally on the first request and cached in
+    the run directory; cached archives support resuming via HTTP Range.
+    """
+    run_dir = RUNS_DIR / run_id
+    if not run_dir.exists():
+        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+    
+    sections = {name for name, wanted in (("plots", plots), ("logs", logs), ("summary", summary)) if wanted}
+    if not sections:
+        raise HTTPException(status_code=400, detail="Select at least one of plots, logs or summary")
+    
+    files = collect_export_files(run_dir, sections)
+    cache_path = export_cache_path(run_dir, sections)
+    download_name = cache_path.name
+    headers = {"Content-Disposition": f'attachment; filename="{download_name}"'}
+    
+    if not is_export_cached(cache_path, files):
+        return StreamingResponse(
+            iter_run_export(files, cache_path=cache_path),
+            media_type="application/zip",
+            headers=headers
+        )
+    
+    size = cache_path.stat().st_size
+    headers["Accept-Ranges"] = "bytes"
+    range_header = request.headers.get("range")
+    if not range_header:
+        return FileResponse(str(cache_path), media_type="application/zip", filename=download_name)
+    
+    byte_range = parse_byte_range(range_header, size)
+    if byte_range is None:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        iter_file_range(cache_path, start, end),
+        status_code=206,
+        media_type="application/zip",
+        headers=headers
+    )
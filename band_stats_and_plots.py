@@ -13,6 +13,9 @@ import numpy as np
 import matplotlib.pyplot as plt
 from pathlib import Path
 
+from csv_reader import read_csv
+from recording_format import EXTENSION, prefer_binary, read_recording
+
 
 # Root directory for CSV files
 CSV_ROOT = r"/Users/umutkaya/Documents/Zenin Mind Reader/data"
@@ -29,7 +32,9 @@ BAND_COLUMNS = [
 
 def load_data(csv_root: str) -> pd.DataFrame:
     """
-    Load all CSV files from the root directory and merge them.
+    Load all CSV files (and binary .zrec recordings) from the root directory and merge them.
+    .zrec files are memory-mapped instead of parsed; a CSV with an up-to-date .zrec
+    copy next to it is skipped.
     
     Args:
         csv_root: Root directory path to search for CSV files
@@ -52,6 +57,8 @@ def load_data(csv_root: str) -> pd.DataFrame:
     # Also check directly in root directory
     csv_files_direct = glob.glob(os.path.join(csv_root, "*.csv"))
     csv_files = list(set(csv_files + csv_files_direct))  # Remove duplicates
+    csv_files += glob.glob(os.path.join(csv_root, "**", f"*{EXTENSION}"), recursive=True)
+    csv_files = prefer_binary(sorted(set(csv_files)))
     
     if not csv_files:
         print(f"No CSV files found in '{csv_root}'")
@@ -63,11 +70,18 @@ def load_data(csv_root: str) -> pd.DataFrame:
     dataframes = []
     for csv_file in csv_files:
         try:
+            if csv_file.endswith(EXTENSION):
+                # Only the band columns are needed; the rest of the memmap is never read
+                df = read_recording(csv_file)
+                df = df[[col for col in df.columns if col in BAND_COLUMNS]]
+                dataframes.append(df)
+                print(f"  Loaded: {os.path.basename(csv_file)} ({len(df)} rows)")
+                continue
             # Try different separators
-            df = pd.read_csv(csv_file, sep=';', encoding='utf-8', low_memory=False)
+            df = read_csv(csv_file, sep=';', encoding='utf-8')
             if df.empty or len(df.columns) < 2:
                 # Try comma separator
-                df = pd.read_csv(csv_file, sep=',', encoding='utf-8', low_memory=False)
+                df = read_csv(csv_file, sep=',', encoding='utf-8')
             
             if not df.empty:
                 dataframes.append(df)
@@ -0,0 +1,186 @@
+# compare_profile_sets.py
+# Birden fazla profil setini tek geçişte karşılaştırır: her kayıt için analitik
+# (compute_mail_csv_metrics) bir kez hesaplanır, kişi her profil setine ayrı ayrı
+# eşleştirilir. Profil kuralları dosya başına bir kez derlenir (load_profile_rules).
+
+import os
+import sys
+import glob
+import json
+import pandas as pd
+
+from analytics5 import compute_mail_csv_metrics
+from profile_analyzer5 import analyze_profiles_from_metrics, load_profile_rules
+from analyze_processing_log import aggregate_event, explode_profiles
+from excel_writer import write_sheets
+from zenin_mac2 import (
+    DOMINANCE_DELTA,
+    apply_profile_rename,
+    compute_dominance,
+    iter_event_csvs,
+    read_recording_csv,
+)
+
+# Varsayılan karşılaştırma: repo'daki tüm Zihin_Profilleri_*.csv varyantları
+PROFILE_SET_GLOB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Zihin_Profilleri_*.csv")
+
+
+def profile_set_name(profile_csv_path: str) -> str:
+    return os.path.splitext(os.path.basename(profile_csv_path))[0]
+
+
+def classify_against_sets(metrics: dict, profile_sets: dict, dominance: dict,
+                          balance_threshold: float = None, denge_mean_threshold: float = None) -> dict:
+    """Bir kişinin metrics'ini her profil setiyle eşleştirir: {set adı: en_iyi_profiller}.
+
+    process_pipeline ile aynı adımlar: analyze_profiles_from_metrics + Gamma "Baskın Düşük" rename.
+    metrics değiştirilmez.
+    """
+    assigned = {}
+    for name, path in profile_sets.items():
+        try:
+            profile_data = analyze_profiles_from_metrics(
+                name,
+                metrics,
+                profile_csv_path=path,
+                balance_threshold=balance_threshold,
+                denge_mean_threshold=denge_mean_threshold
+            ) or {}
+        except Exception as e:
+            print(f"⚠️ Profil analiz hatası ({name}): {e}")
+            profile_data = {}
+        result = {"en_iyi_profiller": profile_data.get("en_iyi_profiller", "") or ""}
+        apply_profile_rename(result, dominance)
+        assigned[name] = result["en_iyi_profiller"].strip()
+    return assigned
+
+
+def compare_profile_sets(
+    csv_root: str,
+    profile_csv_paths: list,
+    dominance_delta: float = None,
+    balance_threshold: float = None,
+    denge_mean_threshold: float = None,
+    window_secs: int = None,
+    window_samples: int = None,
+    band_thresholds: dict = None
+) -> dict:
+    """csv_root altındaki kayıtları profile_csv_paths'teki her sete göre sınıflandırır.
+
+    Returns:
+        dict: people (kişi başına atamalar), comparison (set başına eşleşme oranı,
+        eşleşmeyen sayısı, 5/4 uyumlu), distribution (set başına profil dağılımı)
+    """
+    profile_sets = {profile_set_name(p): p for p in profile_csv_paths}
+    for name, path in profile_sets.items():
+        # geçersiz set tüm kayıtlarda sessizce fallback kurallarına düşmesin
+        load_profile_rules(path)
+    dom_delta = dominance_delta if dominance_delta is not None else DOMINANCE_DELTA
+
+    people = []
+    seen = set()
+    for event, walk_root, csv_files in iter_event_csvs(csv_root):
+        for csv_file in csv_files:
+            csv_path = os.path.join(walk_root, csv_file)
+            norm_csv_path = os.path.normpath(os.path.realpath(csv_path))
+            if norm_csv_path in seen:
+                continue
+            seen.add(norm_csv_path)
+            df = read_recording_csv(csv_path)
+            if df is None:
+                continue
+            # analitik kayıt başına bir kez
+            metrics = compute_mail_csv_metrics(
+                df,
+                band_thresholds=band_thresholds,
+                window_secs=window_secs,
+                window_samples=window_samples
+            )
+            dominance = compute_dominance(metrics.get("scores", {}) or {}, dom_delta)
+            assigned = classify_against_sets(metrics, profile_sets, dominance,
+                                             balance_threshold=balance_threshold,
+                                             denge_mean_threshold=denge_mean_threshold)
+            people.append({
+                "event": event,
+                "person_name": os.path.splitext(csv_file)[0],
+                "source_file": csv_path,
+                **assigned,
+            })
+
+    people_df = pd.DataFrame(people, columns=["event", "person_name", "source_file"] + list(profile_sets))
+    comparison, distribution = [], []
+    for name in profile_sets:
+        assigned = people_df[name].fillna("")
+        matched = assigned != ""
+        exploded = explode_profiles(people_df[[name]], prof_col=name)
+        # kişi 4 uyumlu sayılır: atanan profillerin hepsi "4 uyumlu" ise
+        only_4 = exploded.groupby(level=0)["is_4"].all() if not exploded.empty else pd.Series(dtype=bool)
+        summary = aggregate_event(people_df[[name]], prof_col=name)
+        comparison.append({
+            "Profil Seti": name,
+            "Kişi": len(people_df),
+            "Eşleşen": int(matched.sum()),
+            "Eşleşmeyen": int((~matched).sum()),
+            "Eşleşme Oranı": round(matched.mean() * 100, 2) if len(people_df) else 0.0,
+            "5 Uyumlu": int((~only_4).sum()),
+            "4 Uyumlu": int(only_4.sum()),
+            "Farklı Profil": len(summary),
+        })
+        distribution.append(summary.assign(**{"Profil Seti": name}))
+
+    columns = ["Profil Seti", "Profile", "5 Uyumlu", "4 Uyumlu", "Toplam", "Yüzde"]
+    distribution_df = pd.concat(distribution, ignore_index=True)[columns] if distribution else pd.DataFrame(columns=columns)
+    return {
+        "profile_sets": list(profile_sets),
+        "people": people_df,
+        "comparison": pd.DataFrame(comparison),
+        "distribution": distribution_df,
+    }
+
+
+def comparison_sheets(report: dict) -> list:
+    """Rapor sayfaları: Karşılaştırma, Dağılım (profil x set), Kişiler."""
+    distribution = report["distribution"]
+    if distribution.empty:
+        pivot = pd.DataFrame(columns=["Profile"] + report["profile_sets"])
+    else:
+        pivot = distribution.pivot_table(index="Profile", columns="Profil Seti", values="Toplam",
+                                         aggfunc="sum", fill_value=0)
+        pivot = pivot.reindex(columns=report["profile_sets"], fill_value=0)
+        pivot = pivot.loc[pivot.sum(axis=1).sort_values(ascending=False).index].reset_index()
+    return [("Karşılaştırma", report["comparison"]), ("Dağılım", pivot), ("Kişiler", report["people"])]
+
+
+def report_json(report: dict) -> dict:
+    """Raporun JSON'a uygun hali (DataFrame'ler kayıt listesi olarak)."""
+    def records(df):
+        return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+    return {
+        "profile_sets": report["profile_sets"],
+        "comparison": records(report["comparison"]),
+        "distribution": records(report["distribution"]),
+        "people": records(report["people"]),
+    }
+
+
+def save_comparison(report: dict, out_dir: str, stem: str = "profile_set_comparison") -> str:
+    """{stem}.xlsx ve {stem}.json dosyalarını yazar, xlsx yolunu döndürür."""
+    xlsx_path = os.path.join(out_dir, f"{stem}.xlsx")
+    write_sheets(comparison_sheets(report), xlsx_path)
+    with open(os.path.join(out_dir, f"{stem}.json"), "w", encoding="utf-8") as f:
+        json.dump(report_json(report), f, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+    return xlsx_path
+
+
+# Kullanım: python compare_profile_sets.py <csv_kök_dizini> [profil.csv ...]
+# Profil verilmezse repo'daki tüm Zihin_Profilleri_*.csv dosyaları karşılaştırılır.
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Kullanım: python compare_profile_sets.py <csv_kök_dizini> [profil.csv ...]")
+        sys.exit(1)
+    root = sys.argv[1]
+    paths = sys.argv[2:] or sorted(glob.glob(PROFILE_SET_GLOB))
+    report = compare_profile_sets(root, paths)
+    out_path = save_comparison(report, root)
+    print(report["comparison"].to_string(index=False))
+    print(f"✅ Karşılaştırma raporu kaydedildi: {out_path}")
@@ -0,0 +1,188 @@
+# csv_reader.py
+# Kayıt CSV'leri için okuyucu backend'leri. pandas'ın C engine'i tek thread'li;
+# pyarrow ya da polars kuruluysa onların çok thread'li okuyucuları kullanılır,
+# değilse mevcut yola (pd.read_csv, C engine) düşülür. Her engine pandas
+# DataFrame döndürür: boş hücreler NaN, metin sütunları metin kalır (zaman
+# damgaları otomatik datetime'a çevrilmez).
+
+import io
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.csv as pa_csv
+except ImportError:  # opsiyonel bağımlılık
+    pa_csv = None
+
+try:
+    import polars as pl
+except ImportError:  # opsiyonel bağımlılık
+    pl = None
+
+# Tercih sırası: ilk kullanılabilir olan varsayılan engine olur
+ENGINE_PREFERENCE = ("pyarrow", "polars", "c")
+ENGINES = ENGINE_PREFERENCE
+
+# pyarrow'un ISO-8601 zaman damgası çıkarımını kapatır: hiçbir hücreyle eşleşmeyen bir biçim
+_NO_TIMESTAMP_PARSERS = ["\x00"]
+# polars tip çıkarımı için taranan satır (sonradan uymayan bir değer C engine'e düşürür)
+POLARS_INFER_ROWS = 10_000
+
+
+def available_engines() -> list:
+    """Bu ortamda kullanılabilir engine'ler (tercih sırasıyla)."""
+    installed = {"pyarrow": pa_csv is not None, "polars": pl is not None, "c": True}
+    return [e for e in ENGINES if installed[e]]
+
+
+def default_engine() -> str:
+    return available_engines()[0]
+
+
+def _source(source):
+    """bytes içerik dosya benzeri nesneye çevrilir; yol ve dosya nesneleri olduğu gibi."""
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    return source
+
+
+def _read_c(source, sep, encoding):
+    return pd.read_csv(_source(source), sep=sep, encoding=encoding, low_memory=False)
+
+
+def _read_pyarrow(source, sep, encoding):
+    table = pa_csv.read_csv(
+        _source(source),
+        read_options=pa_csv.ReadOptions(encoding=encoding),
+        parse_options=pa_csv.ParseOptions(delimiter=sep),
+        convert_options=pa_csv.ConvertOptions(
+            timestamp_parsers=_NO_TIMESTAMP_PARSERS,
+            strings_can_be_null=True
+        )
+    )
+    return table.to_pandas()
+
+
+def _read_polars(source, sep, encoding):
+    if encoding.replace("-", "").lower() != "utf8":
+        raise ValueError(f"polars yalnızca utf-8 okur ({encoding})")
+    return pl.read_csv(
+        _source(source),
+        separator=sep,
+        infer_schema_length=POLARS_INFER_ROWS
+    ).to_pandas()
+
+
+_READERS = {
+    "pyarrow": _read_pyarrow,
+    "polars": _read_polars,
+    "c": _read_c,
+}
+
+
+def read_csv(source, sep: str = ",", encoding: str = "utf-8", engine: str = None) -> pd.DataFrame:
+    """CSV'yi seçilen engine ile pandas DataFrame olarak okur.
+
+    Args:
+        source: dosya yolu, bytes (ör. yüklenen dosya) ya da dosya benzeri nesne
+        sep: ayırıcı
+        encoding: metin kodlaması
+        engine: "pyarrow", "polars" veya "c"; None ise default_engine()
+
+    Hızlı engine okuyamazsa (sonradan tipi değişen sütun, desteklenmeyen encoding vb.)
+    aynı kaynak C engine ile yeniden okunur; C engine'in hatası çağırana iletilir.
+    Not: pyarrow/polars sayıları tam yuvarlamayla okur (float_precision="round_trip");
+    C engine'in varsayılan hızlı ayrıştırıcısı bazı değerlerde son bitte farklıdır.
+    """
+    engine = engine or default_engine()
+    if engine not in _READERS:
+        raise ValueError(f"Bilinmeyen CSV engine: {engine} (seçenekler: {', '.join(ENGINES)})")
+    if engine not in available_engines():
+        raise ValueError(f"{engine} kurulu değil")
+    if engine != "c":
+        try:
+            return _READERS[engine](source, sep, encoding)
+        except Exception:
+            if hasattr(source, "seek"):
+                source.seek(0)
+    return _read_c(source, sep, encoding)
+
+
+def _benchmark_file(minutes: int, out_dir: str, hz: int = 256) -> str:
+    """Muse dışa aktarımına benzer (TimeStamp + band/HSI sütunları + seyrek Elements) sentetik kayıt."""
+    rng = np.random.default_rng(0)
+    rows = minutes * 60 * hz
+    df = pd.DataFrame({
+        "TimeStamp": (pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(rows) / hz, unit="s"))
+        .strftime("%Y-%m-%d %H:%M:%S.%f")
+    })
+    for band in ("Delta", "Theta", "Alpha", "Beta", "Gamma"):
+        for ch in ("TP9", "AF7", "AF8", "TP10"):
+            df[f"{band}_{ch}"] = rng.normal(0.5, 0.3, rows)
+    for ch in ("TP9", "AF7", "AF8", "TP10"):
+        df[f"HSI_{ch}"] = rng.integers(1, 5, rows)
+    df.loc[::50, "Delta_TP9"] = np.nan
+    df["Elements"] = None
+    df.loc[::5000, "Elements"] = "/muse/elements/blink"
+    path = os.path.join(out_dir, f"csv_benchmark_{minutes}min.csv")
+    df.to_csv(path, index=False)
+    return path
+
+
+def _same_values(a: pd.DataFrame, b: pd.DataFrame) -> str:
+    """Engine çıktısını C engine çıktısıyla karşılaştırır: "aynı" ya da farkların özeti."""
+    if list(a.columns) != list(b.columns) or len(a) != len(b):
+        return "sütun/satır farklı"
+    ulp = 0
+    for col in a.columns:
+        x, y = a[col], b[col]
+        if x.dtype.kind == "f" and y.dtype.kind == "f":
+            xv, yv = x.to_numpy(), y.to_numpy()
+            ulp += int(((xv != yv) & ~(np.isnan(xv) & np.isnan(yv))).sum())
+        elif not x.equals(y):
+            return f"{col} farklı ({x.dtype} / {y.dtype})"
+    return "aynı" if not ulp else f"{ulp} değer son bitte farklı"
+
+
+def benchmark(paths=None, minutes: int = 20, repeat: int = 3):
+    """Kullanılabilir engine'leri aynı dosyalarda karşılaştırır (en iyi süre, MB/s, C engine ile fark).
+
+    paths verilmezse ~{minutes} dakikalık 256 Hz sentetik kayıt üretilir (20 dk ~ 125 MB).
+    """
+    tmp_dir = None
+    if not paths:
+        tmp_dir = tempfile.mkdtemp(prefix="csv_benchmark_")
+        paths = [_benchmark_file(minutes, tmp_dir)]
+
+    results = []
+    for path in paths:
+        size_mb = os.path.getsize(path) / 1e6
+        reference = read_csv(path, engine="c")
+        for engine in available_engines():
+            timings = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                df = read_csv(path, engine=engine)
+                timings.append(time.perf_counter() - t0)
+            best = min(timings)
+            results.append((os.path.basename(path), engine, size_mb, best, size_mb / best, _same_values(df, reference)))
+
+    print(f"📊 CSV okuma benchmark (en iyi {repeat} deneme)")
+    print(f"{'Dosya':<28} {'Engine':<8} {'MB':>8} {'Süre (s)':>10} {'MB/s':>8}  C engine ile")
+    for name, engine, size_mb, best, speed, same in results:
+        print(f"{name:<28} {engine:<8} {size_mb:>8.1f} {best:>10.2f} {speed:>8.1f}  {same}")
+    if tmp_dir:
+        for f in os.listdir(tmp_dir):
+            os.remove(os.path.join(tmp_dir, f))
+        os.rmdir(tmp_dir)
+    return results
+
+
+# Kullanım: python csv_reader.py [kayıt.csv ...]
+# Dosya verilmezse 20 dakikalık 256 Hz sentetik bir Muse kaydı üzerinde ölçülür.
+if __name__ == "__main__":
+    benchmark(sys.argv[1:])
@@ -0,0 +1,170 @@
+# excel_writer.py
+# Özet ve unmatched log Excel dosyaları için yazıcı backend'leri.
+# DataFrame.to_excel tüm hücreleri openpyxl nesneleri olarak bellekte tutar; burada
+# her sayfa satır satır (stream) yazılır. xlsxwriter kuruluysa constant_memory
+# modunda kullanılır, değilse openpyxl write-only moduna düşülür.
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+try:
+    import xlsxwriter
+except ImportError:  # opsiyonel bağımlılık
+    xlsxwriter = None
+
+# Tercih sırası: ilk kullanılabilir olan varsayılan engine olur
+ENGINE_PREFERENCE = ("xlsxwriter", "openpyxl")
+# "pandas": eski yol (DataFrame.to_excel + openpyxl), benchmark karşılaştırması için
+ENGINES = ENGINE_PREFERENCE + ("pandas",)
+
+# pandas.to_excel ile aynı: NaN/None boş hücre, inf metin olarak yazılır
+INF_REP = "inf"
+
+
+def available_engines() -> list:
+    """Bu ortamda kullanılabilir engine'ler (tercih sırasıyla)."""
+    return [e for e in ENGINES if e != "xlsxwriter" or xlsxwriter is not None]
+
+
+def default_engine() -> str:
+    return available_engines()[0]
+
+
+def _cell(value):
+    """Hücre değerini yazıcıların kabul ettiği Python tipine çevirir."""
+    if value is None:
+        return None
+    if isinstance(value, (float, np.floating)):
+        if np.isnan(value):
+            return None
+        if np.isinf(value):
+            return INF_REP if value > 0 else f"-{INF_REP}"
+        return float(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return value
+
+
+def iter_sheet_rows(df: pd.DataFrame):
+    """Başlık satırı + veri satırları; DataFrame kopyalanmadan satır satır üretilir."""
+    yield [str(c) for c in df.columns]
+    for row in df.itertuples(index=False, name=None):
+        yield [_cell(v) for v in row]
+
+
+def _write_xlsxwriter(sheets, out_path):
+    # constant_memory: her satır yazıldıktan sonra diske atılır (satır sırasıyla yazılmalı)
+    workbook = xlsxwriter.Workbook(out_path, {"constant_memory": True, "strings_to_urls": False})
+    try:
+        header_fmt = workbook.add_format({"bold": True})
+        for sheet_name, df in sheets:
+            worksheet = workbook.add_worksheet(sheet_name)
+            for r, row in enumerate(iter_sheet_rows(df)):
+                worksheet.write_row(r, 0, row, header_fmt if r == 0 else None)
+    finally:
+        workbook.close()
+
+
+def _write_openpyxl(sheets, out_path):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    # write-only workbook: satırlar eklendikçe geçici dosyaya yazılır
+    workbook = Workbook(write_only=True)
+    bold = Font(bold=True)
+    for sheet_name, df in sheets:
+        worksheet = workbook.create_sheet(title=sheet_name)
+        rows = iter_sheet_rows(df)
+        header = []
+        for name in next(rows):
+            cell = WriteOnlyCell(worksheet, value=name)
+            cell.font = bold
+            header.append(cell)
+        worksheet.append(header)
+        for row in rows:
+            worksheet.append(row)
+    workbook.save(out_path)
+
+
+def _write_pandas(sheets, out_path):
+    with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
+        for sheet_name, df in sheets:
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+
+
+_WRITERS = {
+    "xlsxwriter": _write_xlsxwriter,
+    "openpyxl": _write_openpyxl,
+    "pandas": _write_pandas,
+}
+
+
+def write_sheets(sheets, out_path, engine=None):
+    """[(sayfa adı, DataFrame), ...] listesini tek bir xlsx dosyasına yazar.
+
+    Args:
+        sheets: (sayfa adı, DataFrame) çiftleri, Excel'deki sırasıyla
+        out_path: xlsx dosya yolu
+        engine: "xlsxwriter", "openpyxl" veya "pandas"; None ise default_engine()
+    """
+    engine = engine or default_engine()
+    if engine not in _WRITERS:
+        raise ValueError(f"Bilinmeyen Excel engine: {engine} (seçenekler: {', '.join(ENGINES)})")
+    if engine == "xlsxwriter" and xlsxwriter is None:
+        raise ValueError("xlsxwriter kurulu değil")
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    _WRITERS[engine](sheets, out_path)
+    return out_path
+
+
+def _benchmark_frame(rows: int) -> pd.DataFrame:
+    """Profil özetine benzer (metin + sayı sütunları) sentetik tablo."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "Profil": [f"Profil {i % 500}" for i in range(rows)],
+        "Adet": rng.integers(0, 1000, rows),
+        "Yuzde": rng.random(rows) * 100,
+    })
+    for band in ("Delta", "Theta", "Alpha", "Beta", "Gamma"):
+        df[f"Avg_Pct_{band}"] = rng.random(rows).round(4)
+        df[f"Mode_Level_{band}"] = rng.choice(["dusuk", "dusuk orta", "orta", "yuksek orta", "yuksek"], rows)
+    return df
+
+
+def benchmark(rows: int = 100_000, out_dir: str = "."):
+    """Kullanılabilir engine'leri aynı tablo üzerinde karşılaştırır (süre, tepe bellek, dosya boyutu)."""
+    import tracemalloc
+
+    sheets = [("Toplam", _benchmark_frame(rows))]
+    results = []
+    for engine in available_engines():
+        out_path = os.path.join(out_dir, f"excel_benchmark_{engine}.xlsx")
+        t0 = time.perf_counter()
+        write_sheets(sheets, out_path, engine=engine)
+        elapsed = time.perf_counter() - t0
+        # tracemalloc yazmayı belirgin yavaşlatır: bellek ayrı bir turda ölçülür
+        tracemalloc.start()
+        write_sheets(sheets, out_path, engine=engine)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append((engine, elapsed, peak / 1e6, os.path.getsize(out_path) / 1e6))
+        os.remove(out_path)
+
+    print(f"📊 Excel yazma benchmark: {rows} satır x {sheets[0][1].shape[1]} sütun")
+    print(f"{'Engine':<12} {'Süre (s)':>10} {'Tepe bellek (MB)':>18} {'Dosya (MB)':>12}")
+    for engine, elapsed, peak_mb, size_mb in results:
+        print(f"{engine:<12} {elapsed:>10.2f} {peak_mb:>18.1f} {size_mb:>12.2f}")
+    return results
+
+
+# Kullanım: python excel_writer.py [satır sayısı]
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -1,5 +1,5 @@
 import { apiClient } from './client';
-import { ProfileSet, ProfileSetSummary } from '../types/profiles';
+import { ProfileSet, ProfileSetCoverage, ProfileSetSummary } from '../types/profiles';
 
 export const listProfileSets = async (): Promise<ProfileSetSummary[]> => {
   const response = await apiClient.get<ProfileSetSummary[]>('/profiles');
@@ -21,6 +21,16 @@ export const createProfileSet = async (profileSet: ProfileSet): Promise<ProfileS
   return response.data;
 };
 
+export const getProfileSetCoverage = async (id: string, lastRuns = 50): Promise<ProfileSetCoverage> => {
+  const response = await apiClient.get<ProfileSetCoverage>(`/profiles/${id}/coverage`, { params: { last_runs: lastRuns } });
+  return response.data;
+};
+
+export const analyzeProfileSetCoverage = async (profileSet: ProfileSet, lastRuns = 50): Promise<ProfileSetCoverage> => {
+  const response = await apiClient.post<ProfileSetCoverage>('/profiles/coverage', profileSet, { params: { last_runs: lastRuns } });
+  return response.data;
+};
+
 export const deleteProfileSet = async (id: string): Promise<void> => {
   await apiClient.delete(`/profiles/${id}`);
 };
@@ -1,6 +1,17 @@
 import { apiClient } from './client';
 import { RunConfig } from '../types/config';
-import { RunResult, RunSummary } from '../types/runs';
+import {
+  ClassifyRequest,
+  ClassifyResult,
+  PlotListResponse,
+  ProfileSetComparison,
+  ReclassifyRequest,
+  RelevelRequest,
+  RelevelResult,
+  RunResult,
+  RunSummary,
+  ScoreHistograms,
+} from '../types/runs';
 
 // Get base URL (same logic as client.ts)
 const getBaseUrl = () => {
@@ -12,6 +23,14 @@ export const runBatch = async (config: RunConfig): Promise<RunResult> => {
   return response.data;
 };
 
+export const compareProfileSets = async (config: RunConfig, profileSetIds: string[] = []): Promise<ProfileSetComparison> => {
+  const response = await apiClient.post<ProfileSetComparison>('/run/compare-profile-sets', {
+    config,
+    profile_set_ids: profileSetIds,
+  });
+  return response.data;
+};
+
 export const runSingle = async (config: RunConfig, csvPath: string): Promise<RunResult> => {
   const response = await apiClient.post<RunResult>('/run/single', {
     ...config,
@@ -48,8 +67,20 @@ export const runUploadBatch = async (config: RunConfig, files: File[]): Promise<
   return response.data;
 };
 
-export const listRuns = async (): Promise<RunSummary[]> => {
-  const response = await apiClient.get<RunSummary[]>('/runs');
+export interface ListRunsParams {
+  offset?: number;
+  limit?: number;
+  sort?: 'run_id' | 'timestamp' | 'profile_set_id' | 'processed_files' | 'matched_count' | 'unmatched_count' | 'matched_rate';
+  order?: 'asc' | 'desc';
+  profile_set_id?: string;
+  date_from?: string;
+  date_to?: string;
+  min_matched_rate?: number;
+  max_matched_rate?: number;
+}
+
+export const listRuns = async (params: ListRunsParams = {}): Promise<RunSummary[]> => {
+  const response = await apiClient.get<RunSummary[]>('/runs', { params });
   return response.data;
 };
 
@@ -58,24 +89,78 @@ export const getRunDetails = async (runId: string): Promise<RunResult> => {
   return response.data;
 };
 
-export const listPlots = async (runId: string): Promise<{ plots: string[] }> => {
-  const response = await apiClient.get<{ plots: string[] }>(`/runs/${runId}/plots`);
+export const reclassifyRun = async (runId: string, request: ReclassifyRequest): Promise<RunResult> => {
+  const response = await apiClient.post<RunResult>(`/runs/${runId}/reclassify`, request);
   return response.data;
 };
 
-export const getPlotUrl = (runId: string, filename: string): string => {
-  return `${getBaseUrl()}/runs/${runId}/plots/${filename}`;
+export const relevelRun = async (runId: string, request: RelevelRequest): Promise<RelevelResult> => {
+  const response = await apiClient.post<RelevelResult>(`/runs/${runId}/relevel`, request);
+  return response.data;
+};
+
+export const relevelResults = async (request: RelevelRequest, lastRuns = 50): Promise<RelevelResult> => {
+  const response = await apiClient.post<RelevelResult>('/results/relevel', request, { params: { last_runs: lastRuns } });
+  return response.data;
+};
+
+export const classifyScores = async (request: ClassifyRequest): Promise<ClassifyResult> => {
+  const response = await apiClient.post<ClassifyResult>('/classify', request);
+  return response.data;
+};
+
+export interface ScoreHistogramsParams {
+  last_runs?: number;
+  profile_set_id?: string;
+}
+
+export const getScoreHistograms = async (params: ScoreHistogramsParams = {}): Promise<ScoreHistograms> => {
+  const response = await apiClient.get<ScoreHistograms>('/results/score-histograms', { params });
+  return response.data;
+};
+
+export interface ListPlotsParams {
+  offset?: number;
+  limit?: number;
+  event?: string;
+  category?: 'dominant' | 'normal' | 'montage';
+}
+
+export const listPlots = async (runId: string, params?: ListPlotsParams): Promise<PlotListResponse> => {
+  const response = await apiClient.get<PlotListResponse>(`/runs/${runId}/plots`, { params });
+  return response.data;
+};
+
+export const getPlotUrl = (runId: string, filename: string, variant: 'full' | 'thumb' = 'full'): string => {
+  const url = `${getBaseUrl()}/runs/${runId}/plots/${filename}`;
+  return variant === 'thumb' ? `${url}?variant=thumb` : url;
 };
 
 export const getLogUrl = (runId: string): string => {
   return `${getBaseUrl()}/runs/${runId}/log`;
 };
 
-export const getSummaryData = async (runId: string): Promise<any> => {
-  const response = await apiClient.get(`/runs/${runId}/summary`);
+export interface SummaryParams {
+  sheet?: string;
+  offset?: number;
+  limit?: number;
+}
+
+export const getSummaryData = async (runId: string, params: SummaryParams = {}): Promise<any> => {
+  const response = await apiClient.get(`/runs/${runId}/summary`, { params });
   return response.data;
 };
 
 export const getSummaryDownloadUrl = (runId: string): string => {
   return `${getBaseUrl()}/runs/${runId}/summary/download`;
 };
+
+export const getExportUrl = (
+  runId: string,
+  sections: { plots?: boolean; logs?: boolean; summary?: boolean } = {}
+): string => {
+  const params = new URLSearchParams();
+  Object.entries(sections).forEach(([key, value]) => params.append(key, String(value)));
+  const query = params.toString();
+  return `${getBaseUrl()}/runs/${runId}/export${query ? `?${query}` : ''}`;
+};
@@ -1,9 +1,11 @@
 import React from 'react';
 import { BandThresholds } from '../types/config';
+import { BandHistogram, ScoreHistograms } from '../types/runs';
 
 interface BandThresholdsEditorProps {
   bandThresholds: Record<string, BandThresholds>;
   onChange: (bandThresholds: Record<string, BandThresholds>) => void;
+  histograms?: ScoreHistograms | null;
 }
 
 const BANDS = ['Delta', 'Theta', 'Alpha', 'Beta', 'Gamma'] as const;
@@ -24,7 +26,22 @@ const DEFAULT_THRESHOLDS: Record<string, BandThresholds> = {
   Gamma: { yuksek: 34, yuksek_orta: 27, orta: 18, dusuk_orta: 13 }
 };
 
-export const BandThresholdsEditor: React.FC<BandThresholdsEditorProps> = ({ bandThresholds, onChange }) => {
+const LEVEL_SHORT_LABELS = ['Y', 'YO', 'O', 'DO', 'D'];
+
+// People scoring above `cut` (bins are (start + i*w, start + (i+1)*w], so cuts on a bin edge are exact)
+const countAbove = (hist: BandHistogram, binWidth: number, cut: number): number => {
+  const idx = Math.ceil((cut - hist.start) / binWidth - 1e-9);
+  if (idx <= 0) return hist.total;
+  return idx < hist.above.length ? hist.above[idx] : 0;
+};
+
+// Counts per level (yüksek ... düşük) for the given thresholds
+const levelCounts = (hist: BandHistogram, binWidth: number, thresholds: BandThresholds): number[] => {
+  const above = THRESHOLD_KEYS.map(key => countAbove(hist, binWidth, thresholds[key]));
+  return [above[0], above[1] - above[0], above[2] - above[1], above[3] - above[2], hist.total - above[3]];
+};
+
+export const BandThresholdsEditor: React.FC<BandThresholdsEditorProps> = ({ bandThresholds, onChange, histograms }) => {
   const updateThreshold = (band: string, key: keyof BandThresholds, value: number) => {
     onChange({
       ...bandThresholds,
@@ -65,6 +82,11 @@ export const BandThresholdsEditor: React.FC<BandThresholdsEditorProps> = ({ band
                   {THRESHOLD_LABELS[key]}
                 </th>
               ))}
+              {histograms && (
+                <th className="px-4 py-3 text-center font-semibold text-white">
+                  People ({histograms.runs} runs)
+                </th>
+              )}
             </tr>
           </thead>
           <tbody className="divide-y divide-slate-800">
@@ -84,6 +106,15 @@ export const BandThresholdsEditor: React.FC<BandThresholdsEditorProps> = ({ band
                       />
                     </td>
                   ))}
+                  {histograms && (
+                    <td className="px-4 py-2 text-xs text-gray-400 whitespace-nowrap">
+                      {histograms.bands[band]
+                        ? levelCounts(histograms.bands[band], histograms.bin_width, thresholds)
+                            .map((count, i) => `${LEVEL_SHORT_LABELS[i]} ${count}`)
+                            .join(' · ')
+                        : '-'}
+                    </td>
+                  )}
                 </tr>
               );
             })}
@@ -14,7 +14,7 @@ export const DataSourceSelector: React.FC<DataSourceSelectorProps> = ({ onSelect
   const handleFolderSelect = (e: React.ChangeEvent<HTMLInputElement>) => {
     if (e.target.files) {
       const csvFiles = Array.from(e.target.files).filter(f => 
-        f.name.toLowerCase().endsWith('.csv')
+        /\.(csv|zrec)$/i.test(f.name)
       );
       setSelectedFiles(csvFiles);
     }
@@ -136,7 +136,7 @@ export const DataSourceSelector: React.FC<DataSourceSelectorProps> = ({ onSelect
         <div className="space-y-4">
           <input
             type="file"
-            accept=".csv"
+            accept=".csv,.zrec"
             onChange={handleSingleFileSelect}
             className="hidden"
             id="file-upload"
@@ -47,8 +47,9 @@ export const PlotGallery: React.FC<PlotGalleryProps> = ({ runId, plots, maxPrevi
           >
             <div className="bg-gradient-to-br from-slate-800 to-slate-900 p-2">
               <img
-                src={getPlotUrl(runId, plot)}
+                src={getPlotUrl(runId, plot, 'thumb')}
                 alt={plot}
+                loading="lazy"
                 className="w-full h-40 object-contain"
               />
             </div>
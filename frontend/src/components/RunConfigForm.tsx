@@ -1,5 +1,7 @@
-import React from 'react';
+import React, { useEffect, useState } from 'react';
+import { getScoreHistograms } from '../api/runsApi';
 import { RunConfig } from '../types/config';
+import { ScoreHistograms } from '../types/runs';
 import { BandThresholdsEditor } from './BandThresholdsEditor';
 
 interface RunConfigFormProps {
@@ -8,6 +10,18 @@ interface RunConfigFormProps {
 }
 
 export const RunConfigForm: React.FC<RunConfigFormProps> = ({ config, onChange }) => {
+  const [histograms, setHistograms] = useState<ScoreHistograms | null>(null);
+
+  // Score histograms of recent runs with this profile set: the thresholds editor previews level counts from them
+  useEffect(() => {
+    getScoreHistograms({ profile_set_id: config.profile_set_id })
+      .then(setHistograms)
+      .catch((err) => {
+        console.error('Failed to load score histograms:', err);
+        setHistograms(null);
+      });
+  }, [config.profile_set_id]);
+
   const updateField = <K extends keyof RunConfig>(field: K, value: RunConfig[K]) => {
     onChange({ ...config, [field]: value });
   };
@@ -101,6 +115,7 @@ export const RunConfigForm: React.FC<RunConfigFormProps> = ({ config, onChange }
       <BandThresholdsEditor
         bandThresholds={config.band_thresholds}
         onChange={(bandThresholds) => updateField('band_thresholds', bandThresholds)}
+        histograms={histograms}
       />
     </div>
   );
@@ -1,8 +1,23 @@
 import React, { useState, useEffect } from 'react';
-import { ProfileSet, ProfileDefinition, WAVE_LEVELS } from '../types/profiles';
-import { listProfileSets, getProfileSet, saveProfileSet, createProfileSet, deleteProfileSet } from '../api/profilesApi';
+import { ProfileSet, ProfileDefinition, ProfileSetCoverage, WAVE_LEVELS } from '../types/profiles';
+import {
+  listProfileSets,
+  getProfileSet,
+  saveProfileSet,
+  createProfileSet,
+  deleteProfileSet,
+  analyzeProfileSetCoverage,
+} from '../api/profilesApi';
 import { ProfileSetSummary } from '../types/profiles';
 
+const COVERAGE_DEBOUNCE_MS = 300;
+const COVERAGE_ROWS = 15;
+const COVERAGE_STATUSES = [
+  { key: 'covered', label: 'Covered', className: 'text-green-700' },
+  { key: 'ambiguous', label: 'Ambiguous (tied)', className: 'text-yellow-700' },
+  { key: 'unmatched', label: 'Unmatched', className: 'text-red-700' },
+] as const;
+
 export const ProfileSetsPage: React.FC = () => {
   const [profileSets, setProfileSets] = useState<ProfileSetSummary[]>([]);
   const [currentProfileSet, setCurrentProfileSet] = useState<ProfileSet | null>(null);
@@ -10,6 +25,7 @@ export const ProfileSetsPage: React.FC = () => {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [newProfileSetName, setNewProfileSetName] = useState('');
+  const [coverage, setCoverage] = useState<ProfileSetCoverage | null>(null);
 
   useEffect(() => {
     loadProfileSets();
@@ -21,6 +37,28 @@ export const ProfileSetsPage: React.FC = () => {
     }
   }, [selectedId]);
 
+  // Re-analyze coverage of the edited (possibly unsaved) set once edits settle
+  useEffect(() => {
+    if (!currentProfileSet) {
+      setCoverage(null);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      analyzeProfileSetCoverage(currentProfileSet)
+        .then((result) => {
+          if (!cancelled) setCoverage(result);
+        })
+        .catch(() => {
+          if (!cancelled) setCoverage(null);
+        });
+    }, COVERAGE_DEBOUNCE_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [currentProfileSet]);
+
   const loadProfileSets = async () => {
     try {
       const sets = await listProfileSets();
@@ -276,6 +314,62 @@ export const ProfileSetsPage: React.FC = () => {
           </button>
         </div>
       )}
+
+      {currentProfileSet && coverage && (
+        <div className="bg-white p-6 rounded-lg shadow-md mt-6">
+          <h2 className="text-xl font-bold mb-1">Coverage</h2>
+          <p className="text-sm text-gray-600 mb-4">
+            All {coverage.combinations} level combinations, weighted by {coverage.people} people from the last{' '}
+            {coverage.runs} runs
+          </p>
+          <div className="grid grid-cols-3 gap-4 mb-4">
+            {COVERAGE_STATUSES.map(({ key, label, className }) => (
+              <div key={key} className="border rounded-md p-3">
+                <div className={`text-sm font-medium ${className}`}>{label}</div>
+                <div className="text-lg font-bold">{coverage.summary[key].combinations} combinations</div>
+                <div className="text-sm text-gray-600">
+                  {coverage.summary[key].people} people
+                  {coverage.people > 0 &&
+                    ` (${((coverage.summary[key].people / coverage.people) * 100).toFixed(1)}%)`}
+                </div>
+              </div>
+            ))}
+          </div>
+          {coverage.rows.length > 0 && (
+            <div className="overflow-x-auto">
+              <table className="min-w-full border-collapse border border-gray-300 text-sm">
+                <thead>
+                  <tr className="bg-gray-100">
+                    <th className="border border-gray-300 px-2 py-1">Status</th>
+                    {Object.keys(coverage.rows[0].levels).map((band) => (
+                      <th key={band} className="border border-gray-300 px-2 py-1">{band}</th>
+                    ))}
+                    <th className="border border-gray-300 px-2 py-1">People</th>
+                    <th className="border border-gray-300 px-2 py-1">Candidates</th>
+                  </tr>
+                </thead>
+                <tbody>
+                  {coverage.rows.slice(0, COVERAGE_ROWS).map((row, index) => (
+                    <tr key={index}>
+                      <td className="border border-gray-300 px-2 py-1">{row.status}</td>
+                      {Object.entries(row.levels).map(([band, level]) => (
+                        <td key={band} className="border border-gray-300 px-2 py-1">{level || '-'}</td>
+                      ))}
+                      <td className="border border-gray-300 px-2 py-1 text-right">{row.people}</td>
+                      <td className="border border-gray-300 px-2 py-1">{row.candidates || '-'}</td>
+                    </tr>
+                  ))}
+                </tbody>
+              </table>
+              {coverage.rows.length > COVERAGE_ROWS && (
+                <p className="text-xs text-gray-500 mt-2">
+                  Showing {COVERAGE_ROWS} of {coverage.rows.length} unmatched / ambiguous combinations
+                </p>
+              )}
+            </div>
+          )}
+        </div>
+      )}
     </div>
   );
 };
@@ -14,4 +14,10 @@ export interface RunConfig {
   data_root: string | null;
   profile_set_id: string;
   band_thresholds: Record<string, BandThresholds>;
+  plot_format?: 'png' | 'webp';
+  plot_thumbnails?: boolean;
+  plot_mode?: 'individual' | 'montage' | 'both';
+  outputs?: Array<'log' | 'plots' | 'summary' | 'unmatched_xlsx' | 'parquet'>;
+  prefetch?: number;
+  prefetch_max_mb?: number;
 }
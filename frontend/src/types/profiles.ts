@@ -23,5 +23,27 @@ export interface ProfileSetSummary {
   profile_count: number;
 }
 
+export type CoverageStatus = 'covered' | 'ambiguous' | 'unmatched';
+
+export interface CoverageRow {
+  levels: Record<string, string>;
+  status: CoverageStatus;
+  people: number;
+  profiles: string;
+  candidates: string;
+  complete: boolean;
+}
+
+export interface ProfileSetCoverage {
+  profile_set_id: string;
+  profiles: number;
+  combinations: number;
+  runs: number;
+  people: number;
+  summary: Record<CoverageStatus, { combinations: number; people: number }>;
+  rows: CoverageRow[];
+  elapsed_ms: number;
+}
+
 export const WAVE_LEVELS = ['yüksek', 'yüksek orta', 'orta', 'düşük orta', 'düşük'] as const;
 export type WaveLevel = typeof WAVE_LEVELS[number];
@@ -1,4 +1,4 @@
-import { RunConfig } from './config';
+import { BandThresholds, RunConfig } from './config';
 
 export interface RunResult {
   run_id: string;
@@ -10,6 +10,117 @@ export interface RunResult {
   log_file: string;
   plots_dir: string;
   summary_xlsx: string | null;
+  source_run_id?: string | null;
+}
+
+export interface ReclassifyRequest {
+  profile_set_id?: string;
+  balance_threshold?: number;
+  denge_mean_threshold?: number;
+  dominance_delta?: number;
+}
+
+export interface RelevelRequest extends ReclassifyRequest {
+  band_thresholds?: Record<string, BandThresholds>;
+}
+
+export interface RelevelProfileRow {
+  event: string;
+  profile: string;
+  match_5: number;
+  match_4: number;
+  total: number;
+}
+
+export interface RelevelResult {
+  run_id?: string;
+  last_runs?: number;
+  profile_set_id: string | null;
+  people: number;
+  matched_count: number;
+  unmatched_count: number;
+  level_combinations: number;
+  profiles: RelevelProfileRow[];
+  levels: Record<string, Record<string, number>>;
+  elapsed_ms: number;
+}
+
+export interface ScoreVector {
+  id?: string | null;
+  scores: Record<string, number | null>;
+}
+
+export interface ClassifyRequest extends RelevelRequest {
+  rows: ScoreVector[];
+}
+
+export interface ClassifiedScores {
+  id: string | null;
+  levels: Record<string, string>;
+  dominance: Record<string, string>;
+  dalga_farki: number | null;
+  en_iyi_profiller: string;
+  tam_uyumlu_profiller: string;
+  en_iyi_puan: number;
+}
+
+export interface ClassifyResult {
+  profile_set_id: string;
+  count: number;
+  elapsed_ms: number;
+  results: ClassifiedScores[];
+}
+
+export interface ProfileSetComparisonRow {
+  'Profil Seti': string;
+  'Kişi': number;
+  'Eşleşen': number;
+  'Eşleşmeyen': number;
+  'Eşleşme Oranı': number;
+  '5 Uyumlu': number;
+  '4 Uyumlu': number;
+  'Farklı Profil': number;
+}
+
+export interface ProfileSetComparison {
+  data_root: string;
+  profile_sets: string[];
+  comparison: ProfileSetComparisonRow[];
+  distribution: Record<string, string | number>[];
+  people: Record<string, string>[];
+}
+
+export interface BandHistogram {
+  start: number;
+  counts: number[];
+  above: number[];
+  total: number;
+}
+
+export interface ScoreHistograms {
+  last_runs: number;
+  profile_set_id: string | null;
+  bin_width: number;
+  runs: number;
+  bands: Record<string, BandHistogram>;
+}
+
+export interface PlotEntry {
+  path: string;
+  thumb: string | null;
+  event: string | null;
+  category: string;
+  unmatched: boolean;
+  person: string;
+  profile: string;
+}
+
+export interface PlotListResponse {
+  plots: string[];
+  items: PlotEntry[];
+  total: number;
+  offset: number;
+  limit: number | null;
 }
 
 export interface RunSummary {
@@ -22,4 +133,5 @@ export interface RunSummary {
   dominance_delta: number;
   balance_threshold: number;
   window_secs: number;
+  matched_rate?: number | null;
 }
@@ -354,6 +354,266 @@ def band_score_for_profile_cell(cell: str, person_level_5: str) -> int:
             best = max(best, token_points[p])
 
     return best
+
+def match_profile_levels(levels_canon: Dict[str, str], PROFILE_RULES: Dict[str, Dict[str, Set[str]]],
+                         PROFILE_CELLS: Dict[str, Dict[str, str]], verbose: bool = True) -> Dict[str, any]:
+    """Kanonik band seviyelerini profil kurallarıyla eşleştirir: 5/5 (yoksa 4/5) uyumlu adaylar,
+    hücre puanı ve beraberlik çözümü. verbose=False iken debug çıktısı basılmaz (toplu kullanım).
+
+    Returns:
+        dict: tam_uyumlu_profiller, en_iyi_profiller, en_iyi_puan
+    """
+    log = print if verbose else (lambda *args, **kwargs: None)
+
+    match_counts = count_profile_matches(levels_canon, PROFILE_RULES)
+    log(f"🔧 DEBUG - match_counts örnek (ilk 10): {list(match_counts.items())[:10]}")
+
+    perfect = [p for p, c in match_counts.items() if c == 5]
+    almost = [p for p, c in match_counts.items() if c == 4]
+
+    log(f"🔧 DEBUG - perfect matches: {perfect}")
+    log(f"🔧 DEBUG - almost matches: {almost}")
+
+    # ---- Eşleşme ayrıntıları (yalnızca verbose) ----
+    log("\n--- DEBUGGING PROFIL EŞLEŞMESİ ---")
+    log(f"Kişinin normalize edilmiş seviyeleri (levels_canon): {levels_canon}")
+    sorted_matches = sorted(match_counts.items(), key=lambda item: item[1], reverse=True)
+    log("En yüksek eşleşme sayıları:")
+    for profile, count in sorted_matches[:10]: # En iyi 10 sonucu göster
+        if count > 0: # Sadece 0'dan büyükleri göster
+            log(f"  - Profil: '{profile}', Eşleşme Sayısı: {count}")
+    log(f"Sonuç -> 'perfect' listesi (5 uyumlu) boş mu?: {not perfect}")
+    log(f"Sonuç -> 'almost' listesi (4 uyumlu) boş mu?: {not almost}")
+    log("--- DEBUGGING SONU ---\n")
+    # ---------------------------------------------
+
+    
+    # Hiçbir profil eşleşmezse boş döndür (profil ataması yapma)
+    if not perfect and not almost:
+        log(f"⚠️ DEBUG - Profil eşleşmesi yok. Person levels canonical: {levels_canon}")
+        """
+        # Eşleşme olmadığında "Eşleşme Yok" yazan eski kod (etkisiz)
+        return {
+            "dalga_farki": dalga_farki,
+            "tam_uyumlu_profiller": "",
+            "en_iyi_profiller": "Eşleşme Yok",
+            "en_iyi_puan": 0,
+            "controlled_mean": mean_score,
+            "controlled_label": ""
+        }
+        """
+        # Yeni davranış: Eşleşme yoksa boş döndür
+        return {
+            "tam_uyumlu_profiller": "",
+            "en_iyi_profiller": "",
+            "en_iyi_puan": 0
+        }
+
+
+    candidate_profiles = perfect if perfect else almost
+    candidate_tag = {p: "" for p in perfect} if perfect else {p: " (4 uyumlu)" for p in almost}
+    tam_text = ", ".join(perfect) if perfect else ", ".join(f"{p} (4 uyumlu)" for p in almost)
+
+    scored = []
+    for prof in candidate_profiles:
+        total = 0
+        for b in BANDS:
+            cell = PROFILE_CELLS.get(prof, {}).get(b, "")
+            total += band_score_for_profile_cell(cell, levels_canon.get(b, ""))
+        scored.append((prof, total))
+
+    max_score = max((s for _, s in scored), default=0)
+    tied = [p for p, s in scored if s == max_score]
+
+    is_almost = (not perfect) and bool(almost)
+    if len(tied) > 1 and is_almost:
+        def resolve_tie_by_earliest_mismatch(tied_list):
+            priority_order = ["Delta", "Theta", "Alpha", "Beta", "Gamma"]
+            band_to_idx = {b: i for i, b in enumerate(priority_order)}
+            mismatched_bands = {}
+            for prof in tied_list:
+                person_level_map = {b: canon5((levels_canon.get(b, "") or "").strip("-")) for b in BANDS}
+                prof_rules = PROFILE_RULES.get(prof, {})
+                for band in priority_order:
+                    person_level = person_level_map.get(band, "")
+                    allowed = prof_rules.get(band, set())
+                    if person_level and person_level not in allowed:
+                        mismatched_bands[prof] = (band, band_to_idx[band])
+                        break
+                else:
+                    mismatched_bands[prof] = (None, 999)
+            log(f"🔧 TIE-BREAK DEBUG: tied={tied_list}, mismatched={mismatched_bands}")
+            no_mismatch = [p for p in tied_list if mismatched_bands.get(p, (None, 999))[0] is None]
+            if no_mismatch:
+                log(f"✅ TIE-BREAK: Uyumsuz dalgası olmayanlar (tam uyum): {no_mismatch}")
+                return no_mismatch[:1]
+            min_idx = min(mismatched_bands[p][1] for p in tied_list)
+            selected = [p for p in tied_list if mismatched_bands.get(p, (None, 999))[1] == min_idx]
+            log(f"🔧 TIE-BREAK: min_idx={min_idx} ({priority_order[min_idx] if min_idx < 5 else 'N/A'})")
+            log(f"✅ TIE-BREAK: Seçilen profil(ler): {selected}")
+            if len(selected) == 1:
+                return selected
+            else:
+                return selected[:1]
+        resolved = resolve_tie_by_earliest_mismatch(tied)
+        tied = resolved
+
+    top = [f"{p}{candidate_tag.get(p,'')}" for p in tied]
+    
+    # Atanan profil adını bir string haline getir
+    final_profile_str = ", ".join(top)
+
+    return {
+        "tam_uyumlu_profiller": tam_text,
+        "en_iyi_profiller": final_profile_str,
+        "en_iyi_puan": max_score
+    }
+
+# Derlenmiş profil kuralları dosya başına bir kez hesaplanır (dosya değişirse yeniden)
+_PROFILE_RULES_CACHE = {}
+
+def load_profile_rules(path: str) -> Tuple[Dict[str, Dict[str, Set[str]]], Dict[str, Dict[str, str]]]:
+    """Profil dosyasından (PROFILE_RULES, PROFILE_CELLS) döndürür; (yol, mtime) ile önbelleklenir."""
+    key = (os.path.abspath(path), os.path.getmtime(path)) if os.path.exists(path) else None
+    if key is not None and key in _PROFILE_RULES_CACHE:
+        return _PROFILE_RULES_CACHE[key]
+    profiles_df = load_profiles_table(path)
+    compiled = (compile_profile_rules(profiles_df), extract_profile_cells(profiles_df))
+    if key is not None:
+        for old_key in [k for k in _PROFILE_RULES_CACHE if k[0] == key[0]]:
+            del _PROFILE_RULES_CACHE[old_key]  # dosyanın eski sürümü
+        _PROFILE_RULES_CACHE[key] = compiled
+    return compiled
+
+# --- BİTMASKE EŞLEŞTİRİCİ (toplu kullanım) ---
+# Seviye kodları: TOK5_ASCII indeksi; boş seviye ve tanınmayan etiket ayrı kodlar alır
+LEVEL_CODE = {tok: i for i, tok in enumerate(TOK5_ASCII)}
+LEVEL_CODE_EMPTY = len(TOK5_ASCII)
+LEVEL_CODE_OTHER = len(TOK5_ASCII) + 1
+LEVEL_CODE_BASE = LEVEL_CODE_OTHER + 1
+
+def level_code(level: str) -> int:
+    """Band seviyesi ("-yüksek orta-", "yuksek orta", ...) -> seviye kodu."""
+    canon = canon5((level or "").strip().strip("-").strip())
+    if not canon:
+        return LEVEL_CODE_EMPTY
+    return LEVEL_CODE.get(canon, LEVEL_CODE_OTHER)
+
+def pack_level_codes(codes: np.ndarray) -> np.ndarray:
+    """(kişi x band) seviye kodları -> kişi başına tek tamsayı (Delta en anlamlı basamak)."""
+    codes = np.asarray(codes, dtype=np.int64).reshape(-1, len(BANDS))
+    keys = np.zeros(len(codes), dtype=np.int64)
+    for b in range(len(BANDS)):
+        keys = keys * LEVEL_CODE_BASE + codes[:, b]
+    return keys
+
+def unpack_level_codes(keys: np.ndarray) -> np.ndarray:
+    """pack_level_codes'un tersi."""
+    keys = np.asarray(keys, dtype=np.int64).reshape(-1)
+    codes = np.zeros((len(keys), len(BANDS)), dtype=np.int64)
+    for b in reversed(range(len(BANDS))):
+        keys, codes[:, b] = np.divmod(keys, LEVEL_CODE_BASE)
+    return codes
+
+def compile_profile_masks(PROFILE_RULES: Dict[str, Dict[str, Set[str]]],
+                          PROFILE_CELLS: Dict[str, Dict[str, str]]) -> Dict[str, any]:
+    """Profil kurallarını dizilere derler: her profil/band için izinli seviyeler 5 bitlik maske,
+    hücre puanları ise (profil, band, seviye kodu) tablosu (band_score_for_profile_cell ile)."""
+    names = list(PROFILE_RULES.keys())
+    masks = np.zeros((len(names), len(BANDS)), dtype=np.uint8)
+    points = np.zeros((len(names), len(BANDS), LEVEL_CODE_OTHER + 1), dtype=np.int32)
+    for p, prof in enumerate(names):
+        for b, band in enumerate(BANDS):
+            allowed = PROFILE_RULES[prof].get(band, set())
+            masks[p, b] = sum(1 << i for i, tok in enumerate(TOK5_ASCII) if tok in allowed)
+            cell = PROFILE_CELLS.get(prof, {}).get(band, "")
+            for i, tok in enumerate(TOK5_ASCII):
+                points[p, b, i] = band_score_for_profile_cell(cell, tok)
+    defined = np.array([[bool(PROFILE_RULES[prof].get(band)) for band in BANDS] for prof in names], dtype=bool)
+    defined = defined.reshape(len(names), len(BANDS))
+    return {"names": names, "masks": masks, "defined": defined, "points": points}
+
+_PROFILE_MASKS_CACHE = {}
+
+def load_profile_masks(path: str) -> Dict[str, any]:
+    """load_profile_rules + compile_profile_masks; (yol, mtime) ile önbelleklenir."""
+    key = (os.path.abspath(path), os.path.getmtime(path)) if os.path.exists(path) else None
+    if key is not None and key in _PROFILE_MASKS_CACHE:
+        return _PROFILE_MASKS_CACHE[key]
+    compiled = compile_profile_masks(*load_profile_rules(path))
+    if key is not None:
+        for old_key in [k for k in _PROFILE_MASKS_CACHE if k[0] == key[0]]:
+            del _PROFILE_MASKS_CACHE[old_key]
+        _PROFILE_MASKS_CACHE[key] = compiled
+    return compiled
+
+def _joined_profile_names(selected: np.ndarray, four_match: np.ndarray, names: List[str]) -> np.ndarray:
+    """Seçili profil adlarını satır başına "A, B" (4 uyumluysa "A (4 uyumlu), ...") metnine çevirir.
+    Metin, aynı seçim için bir kez üretilir."""
+    keys = np.concatenate([np.packbits(selected, axis=1), four_match[:, None].astype(np.uint8)], axis=1)
+    keys = np.ascontiguousarray(keys).view(f"V{keys.shape[1]}").ravel()
+    uniq, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    texts = []
+    for row in first:
+        tag = " (4 uyumlu)" if four_match[row] else ""
+        texts.append(", ".join(f"{names[p]}{tag}" for p in np.flatnonzero(selected[row])))
+    return np.array(texts, dtype=object)[inverse.reshape(-1)]
+
+def match_level_codes(codes: np.ndarray, compiled: Dict[str, any]) -> Dict[str, np.ndarray]:
+    """match_profile_levels'ın toplu hali: codes (kişi x band) seviye kodu matrisi.
+
+    Eşleşme sayıları, 5/5 ve 4/5 adaylar ve hücre puanları tüm kişiler için birlikte
+    hesaplanır; 4 uyumlu beraberlikte resolve_tie_by_earliest_mismatch kuralı aynen
+    uygulanır. Sonuç sütun bazlıdır: tam_uyumlu_profiller, en_iyi_profiller, en_iyi_puan
+    (her biri kişi başına bir değer, match_profile_levels ile aynı) ve en_iyi_aday_sayisi
+    (en yüksek puanı paylaşan aday sayısı, tie-break öncesi).
+    """
+    codes = np.asarray(codes, dtype=np.int64).reshape(-1, len(BANDS))
+    names = compiled["names"]
+    n = len(codes)
+    if not n or not names:
+        return {
+            "tam_uyumlu_profiller": np.full(n, "", dtype=object),
+            "en_iyi_profiller": np.full(n, "", dtype=object),
+            "en_iyi_puan": np.zeros(n, dtype=np.int64),
+            "en_iyi_aday_sayisi": np.zeros(n, dtype=np.int64)
+        }
+
+    # (kişi, profil, band): kişinin seviyesi profilin izinli seviyelerinde mi
+    known = codes < LEVEL_CODE_EMPTY
+    allowed = (compiled["masks"][None, :, :] >> np.where(known, codes, 0).astype(np.uint8)[:, None, :]) & 1
+    allowed = allowed.astype(bool) & known[:, None, :]
+    counts = (allowed & compiled["defined"][None, :, :]).sum(axis=2)
+    perfect = counts == 5
+    has_perfect = perfect.any(axis=1)
+    candidates = np.where(has_perfect[:, None], perfect, counts == 4)
+    has_candidate = candidates.any(axis=1)
+
+    profile_idx = np.arange(len(names))[None, :, None]
+    band_idx = np.arange(len(BANDS))[None, None, :]
+    scores = compiled["points"][profile_idx, band_idx, codes[:, None, :]].sum(axis=2)
+    max_score = np.where(candidates, scores, -1).max(axis=1)
+    top = candidates & (scores == max_score[:, None])
+    top_count = top.sum(axis=1)
+
+    # Tie-break (yalnızca 4 uyumlu): uyumsuz dalgası olmayan ilk profil, yoksa uyumsuzluğu
+    # en erken dalgada (Delta, Theta, Alpha, Beta, Gamma) olan ilk profil
+    resolve = ~has_perfect & (top_count > 1)
+    if resolve.any():
+        mismatch = (codes != LEVEL_CODE_EMPTY)[:, None, :] & ~allowed
+        first_mismatch = np.where(mismatch.any(axis=2), mismatch.argmax(axis=2), -1)
+        winner = np.where(top, first_mismatch, len(BANDS)).argmin(axis=1)
+        top[resolve] = False
+        top[np.flatnonzero(resolve), winner[resolve]] = True
+
+    four_match = has_candidate & ~has_perfect
+    return {
+        "tam_uyumlu_profiller": _joined_profile_names(candidates, four_match, names),
+        "en_iyi_profiller": _joined_profile_names(top, four_match, names),
+        "en_iyi_puan": np.where(has_candidate, max_score, 0),
+        "en_iyi_aday_sayisi": top_count
+    }
+
 # --- ANA FONKSİYON (GÜNCELLENDİ) ---
 def analyze_profiles_from_metrics(csv_name: str, metrics: Dict, profile_csv_path: str = None, balance_threshold: float = None, denge_mean_threshold: float = None) -> Dict[str, any]:
     # Use provided parameters or fall back to defaults
@@ -362,9 +622,7 @@ def analyze_profiles_from_metrics(csv_name: str, metrics: Dict, profile_csv_path
     denge_mean_thresh = denge_mean_threshold if denge_mean_threshold is not None else DENGE_MEAN_THRESHOLD
     
     try:
-        profiles_df = load_profiles_table(profiles_file)
-        PROFILE_RULES = compile_profile_rules(profiles_df)
-        PROFILE_CELLS = extract_profile_cells(profiles_df)
+        PROFILE_RULES, PROFILE_CELLS = load_profile_rules(profiles_file)
         print(f"🔧 PROFILE DEBUG: Derlenen profil sayısı: {len(PROFILE_RULES)}")
     except Exception as e:
         print(f"⚠️  Profil dosyası yüklenemedi veya okunamadı: {e}")
@@ -467,118 +725,14 @@ def analyze_profiles_from_metrics(csv_name: str, metrics: Dict, profile_csv_path
         except Exception as ex:
             print(f"⚠️ DEBUG - dalga_farki karşılaştırmada hata: {ex}")
 
-    match_counts = count_profile_matches(levels_canon, PROFILE_RULES)
-    print(f"🔧 DEBUG - match_counts örnek (ilk 10): {list(match_counts.items())[:10]}")
-
-    perfect = [p for p, c in match_counts.items() if c == 5]
-    almost = [p for p, c in match_counts.items() if c == 4]
-
-    print(f"🔧 DEBUG - perfect matches: {perfect}")
-    print(f"🔧 DEBUG - almost matches: {almost}")
-
-    # YER: profile_analyzer5.py -> analyze_profiles_from_metrics fonksiyonu
-
-
-    # ---- YENİ DEBUG BLOĞUNU BURAYA EKLEYİN ----
-    print("\n--- DEBUGGING PROFIL EŞLEŞMESİ ---")
-    print(f"Kişinin normalize edilmiş seviyeleri (levels_canon): {levels_canon}")
-    sorted_matches = sorted(match_counts.items(), key=lambda item: item[1], reverse=True)
-    print("En yüksek eşleşme sayıları:")
-    for profile, count in sorted_matches[:10]: # En iyi 10 sonucu göster
-        if count > 0: # Sadece 0'dan büyükleri göster
-            print(f"  - Profil: '{profile}', Eşleşme Sayısı: {count}")
-    print(f"Sonuç -> 'perfect' listesi (5 uyumlu) boş mu?: {not perfect}")
-    print(f"Sonuç -> 'almost' listesi (4 uyumlu) boş mu?: {not almost}")
-    print("--- DEBUGGING SONU ---\n")
-    # ---------------------------------------------
-
-    
-    # Hiçbir profil eşleşmezse boş döndür (profil ataması yapma)
-    if not perfect and not almost:
-        print(f"⚠️ DEBUG - Profil eşleşmesi yok. Person levels canonical: {levels_canon}")
-        """
-        # Eşleşme olmadığında "Eşleşme Yok" yazan eski kod (etkisiz)
-        return {
-            "dalga_farki": dalga_farki,
-            "tam_uyumlu_profiller": "",
-            "en_iyi_profiller": "Eşleşme Yok",
-            "en_iyi_puan": 0,
-            "controlled_mean": mean_score,
-            "controlled_label": ""
-        }
-        """
-        # Yeni davranış: Eşleşme yoksa boş döndür
-        return {
-            "dalga_farki": dalga_farki,
-            "tam_uyumlu_profiller": "",
-            "en_iyi_profiller": "",
-            "en_iyi_puan": 0,
-            "controlled_mean": mean_score,
-            "controlled_label": ""
-        }
-
-
-    candidate_profiles = perfect if perfect else almost
-    candidate_tag = {p: "" for p in perfect} if perfect else {p: " (4 uyumlu)" for p in almost}
-    tam_text = ", ".join(perfect) if perfect else ", ".join(f"{p} (4 uyumlu)" for p in almost)
-
-    scored = []
-    for prof in candidate_profiles:
-        total = 0
-        for b in BANDS:
-            cell = PROFILE_CELLS.get(prof, {}).get(b, "")
-            total += band_score_for_profile_cell(cell, levels_canon.get(b, ""))
-        scored.append((prof, total))
-
-    max_score = max((s for _, s in scored), default=0)
-    tied = [p for p, s in scored if s == max_score]
-
-    is_almost = (not perfect) and bool(almost)
-    if len(tied) > 1 and is_almost:
-        def resolve_tie_by_earliest_mismatch(tied_list):
-            priority_order = ["Delta", "Theta", "Alpha", "Beta", "Gamma"]
-            band_to_idx = {b: i for i, b in enumerate(priority_order)}
-            mismatched_bands = {}
-            for prof in tied_list:
-                person_level_map = {b: canon5((levels_canon.get(b, "") or "").strip("-")) for b in BANDS}
-                prof_rules = PROFILE_RULES.get(prof, {})
-                for band in priority_order:
-                    person_level = person_level_map.get(band, "")
-                    allowed = prof_rules.get(band, set())
-                    if person_level and person_level not in allowed:
-                        mismatched_bands[prof] = (band, band_to_idx[band])
-                        break
-                else:
-                    mismatched_bands[prof] = (None, 999)
-            print(f"🔧 TIE-BREAK DEBUG: tied={tied_list}, mismatched={mismatched_bands}")
-            no_mismatch = [p for p in tied_list if mismatched_bands.get(p, (None, 999))[0] is None]
-            if no_mismatch:
-                print(f"✅ TIE-BREAK: Uyumsuz dalgası olmayanlar (tam uyum): {no_mismatch}")
-                return no_mismatch[:1]
-            min_idx = min(mismatched_bands[p][1] for p in tied_list)
-            selected = [p for p in tied_list if mismatched_bands.get(p, (None, 999))[1] == min_idx]
-            print(f"🔧 TIE-BREAK: min_idx={min_idx} ({priority_order[min_idx] if min_idx < 5 else 'N/A'})")
-            print(f"✅ TIE-BREAK: Seçilen profil(ler): {selected}")
-            if len(selected) == 1:
-                return selected
-            else:
-                return selected[:1]
-        resolved = resolve_tie_by_earliest_mismatch(tied)
-        tied = resolved
-
-    top = [f"{p}{candidate_tag.get(p,'')}" for p in tied]
-    
-    # Atanan profil adını bir string haline getir
-    final_profile_str = ", ".join(top)
+    match = match_profile_levels(levels_canon, PROFILE_RULES, PROFILE_CELLS)
     
     # Kontrollü Yaşayan profilini ikiye bölme özelliği kaldırıldı
     # Profil olduğu gibi kullanılacak
     
     result = {
         "dalga_farki": dalga_farki,
-        "tam_uyumlu_profiller": tam_text,
-        "en_iyi_profiller": final_profile_str, # Potansiyel olarak güncellenmiş profil adını kullan
-        "en_iyi_puan": max_score,
+        **match,
         # controlled_mean artık adjusted scores ortalamasıyla raporlanıyor
         "controlled_mean": mean_score,
         "controlled_label": ""
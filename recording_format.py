@@ -0,0 +1,364 @@
+# recording_format.py
+# Kayıtlar için ikili (.zrec) arşiv biçimi. CSV her çalıştırmada yeniden ayrıştırılır;
+# .zrec dosyası np.memmap ile açılır, analiz ayrıştırma olmadan başlar.
+#
+# Dosya düzeni (little-endian):
+#   [0, HEADER_SIZE)     sabit başlık: _PREAMBLE (magic, sürüm, satır, örnekleme hızı,
+#                        blok sütun sayıları, ek bölüm konumu) + JSON (sütun adları, sıra)
+#   zaman damgası bloğu  int64, epoch'tan nanosaniye (NaT = int64 min), satır sayısı kadar
+#   band bloğu           float32, (sütun, satır): HSI dışındaki her sayısal sütun ardışık
+#   HSI bloğu            float32, (sütun, satır)
+#   ek bölüm             JSON: sayısal olmayan sütunların dolu hücreleri (ör. Elements)
+# Sütunlar bitişik saklandığı için tek bir kanal tüm dosya okunmadan kullanılabilir.
+
+import os
+import sys
+import json
+import time
+import struct
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b"ZREC"
+FORMAT_VERSION = 1
+EXTENSION = ".zrec"
+# Pipeline'ın okuduğu kayıt dosyaları
+RECORDING_EXTENSIONS = (".csv", EXTENSION)
+HEADER_SIZE = 4096
+TIME_COLUMN = "TimeStamp"
+HSI_PREFIX = "HSI_"
+
+# magic, sürüm, bayraklar, satır, örnekleme hızı (Hz), band sütunu, HSI sütunu,
+# JSON uzunluğu, ek bölüm konumu, ek bölüm uzunluğu
+_PREAMBLE = struct.Struct("<4sHHQdIIIQQ")
+_HAS_TIME = 1
+_NAT = np.iinfo(np.int64).min
+
+# Kayıt olmayan CSV'ler (pipeline çıktıları) dönüştürülmez
+_SKIP_PREFIXES = ("processing_log", "unmatched_profiles_log")
+_SKIP_DIRS = {"graphs", "unmatched_data"}
+_RECORDING_COLUMN_PREFIXES = ("Delta_", "Theta_", "Alpha_", "Beta_", "Gamma_", HSI_PREFIX)
+
+
+class BinaryRecording:
+    """Açık .zrec kaydı: bloklar np.memmap (dosyadan) ya da bellekteki içeriğin görünümü.
+
+    timestamps: int64 ns (yoksa None), bands / hsi: (sütun, satır) float32.
+    memmap'ler copy-on-write açılır; DataFrame üzerinde yapılan değişiklik dosyaya yazılmaz.
+    """
+
+    def __init__(self, header: dict, timestamps, bands, hsi, extras: dict, path: str = None):
+        self.header = header
+        self.timestamps = timestamps
+        self.bands = bands
+        self.hsi = hsi
+        self.extras = extras
+        self.path = path
+
+    @property
+    def rows(self) -> int:
+        return self.header["rows"]
+
+    @property
+    def sample_rate_hz(self) -> float:
+        return self.header["sample_rate_hz"]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Orijinal sütun sırasıyla DataFrame; sayısal sütunlar bloklara kopyasız bakar."""
+        h = self.header
+        data = {}
+        blocks = {name: self.bands[i] for i, name in enumerate(h["band_columns"])}
+        blocks.update({name: self.hsi[i] for i, name in enumerate(h["hsi_columns"])})
+        for name in h["columns"]:
+            if name == h["time_column"]:
+                data[name] = self.timestamps.view("datetime64[ns]")
+            elif name in blocks:
+                data[name] = blocks[name]
+            else:
+                values = np.full(self.rows, None, dtype=object)
+                cells = self.extras.get(name, {})
+                if cells:
+                    values[np.array(cells["rows"], dtype=np.int64)] = cells["values"]
+                data[name] = values
+        return pd.DataFrame(data, columns=h["columns"], copy=False)
+
+
+def is_recording_path(path: str) -> bool:
+    return str(path).lower().endswith(RECORDING_EXTENSIONS)
+
+
+def is_binary_recording(source) -> bool:
+    """Yol (.zrec uzantısı) ya da bellekteki içerik (magic) ikili kayıt mı."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source[:len(MAGIC)]) == MAGIC
+    return str(source).lower().endswith(EXTENSION)
+
+
+def _sample_rate(stamps: np.ndarray) -> float:
+    """Geçerli zaman damgalarından ortalama örnekleme hızı (bilinmiyorsa 0)."""
+    valid = stamps[stamps != _NAT]
+    if len(valid) < 2:
+        return 0.0
+    span = (valid.max() - valid.min()) / 1e9
+    return float((len(valid) - 1) / span) if span > 0 else 0.0
+
+
+def write_recording(df: pd.DataFrame, path: str, time_column: str = TIME_COLUMN, source: str = None) -> dict:
+    """DataFrame'i .zrec olarak yazar (geçici dosyaya yazıp yerine taşır), başlığı döndürür.
+
+    Sayısal sütunlar float32'ye çevrilir (infinity -> NaN); HSI_* sütunları HSI bloğuna,
+    diğerleri band bloğuna gider. Sayısal olmayan sütunların yalnızca dolu hücreleri saklanır.
+    """
+    columns = [str(c) for c in df.columns]
+    stamps = None
+    band_columns, hsi_columns, extras = [], [], {}
+    for name in columns:
+        series = df[name]
+        if name == time_column:
+            parsed = pd.to_datetime(series, errors="coerce")
+            stamps = parsed.to_numpy(dtype="datetime64[ns]").view(np.int64)
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            (hsi_columns if name.startswith(HSI_PREFIX) else band_columns).append(name)
+        else:
+            filled = series.notna().to_numpy()
+            rows = np.flatnonzero(filled)
+            if len(rows):
+                extras[name] = {"rows": rows.tolist(), "values": series.to_numpy()[filled].astype(str).tolist()}
+
+    def block(names):
+        out = np.empty((len(names), len(df)), dtype=np.float32)
+        for i, name in enumerate(names):
+            out[i] = df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+        out[np.isinf(out)] = np.nan
+        return out
+
+    bands, hsi = block(band_columns), block(hsi_columns)
+    meta = json.dumps({
+        "columns": columns,
+        "time_column": time_column if stamps is not None else None,
+        "band_columns": band_columns,
+        "hsi_columns": hsi_columns,
+        "source": source,
+    }, ensure_ascii=False).encode("utf-8")
+    if _PREAMBLE.size + len(meta) > HEADER_SIZE:
+        raise ValueError(f"Sütun adları başlığa sığmıyor ({len(meta)} bayt)")
+    extras_json = json.dumps(extras, ensure_ascii=False).encode("utf-8") if extras else b""
+    ts_bytes = stamps.nbytes if stamps is not None else 0
+    extras_offset = HEADER_SIZE + ts_bytes + bands.nbytes + hsi.nbytes
+    sample_rate = _sample_rate(stamps) if stamps is not None else 0.0
+    preamble = _PREAMBLE.pack(
+        MAGIC, FORMAT_VERSION, _HAS_TIME if stamps is not None else 0, len(df), sample_rate,
+        len(band_columns), len(hsi_columns), len(meta), extras_offset, len(extras_json)
+    )
+
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write((preamble + meta).ljust(HEADER_SIZE, b"\0"))
+            if stamps is not None:
+                f.write(np.ascontiguousarray(stamps, dtype="<i8").tobytes())
+            f.write(bands.astype("<f4", copy=False).tobytes())
+            f.write(hsi.astype("<f4", copy=False).tobytes())
+            f.write(extras_json)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return _header(preamble, meta)
+
+
+def _header(preamble: bytes, meta: bytes) -> dict:
+    magic, version, flags, rows, sample_rate, n_band, n_hsi, meta_len, extras_offset, extras_len = \
+        _PREAMBLE.unpack(preamble[:_PREAMBLE.size])
+    if magic != MAGIC:
+        raise ValueError("Kayıt dosyası değil (magic uyuşmuyor)")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Desteklenmeyen kayıt sürümü: {version}")
+    header = json.loads(meta[:meta_len].decode("utf-8"))
+    header.update({
+        "version": version,
+        "rows": rows,
+        "sample_rate_hz": sample_rate,
+        "has_time": bool(flags & _HAS_TIME),
+        "extras_offset": extras_offset,
+        "extras_len": extras_len,
+    })
+    if len(header["band_columns"]) != n_band or len(header["hsi_columns"]) != n_hsi:
+        raise ValueError("Kayıt başlığı bozuk (sütun sayıları uyuşmuyor)")
+    return header
+
+
+def open_recording(source) -> BinaryRecording:
+    """.zrec dosyasını (yol) memmap ile ya da bellekteki içeriği (bytes) kopyasız açar."""
+    in_memory = isinstance(source, (bytes, bytearray, memoryview))
+    if in_memory:
+        raw = bytes(source[:HEADER_SIZE])
+    else:
+        with open(source, "rb") as f:
+            raw = f.read(HEADER_SIZE)
+    if len(raw) < _PREAMBLE.size:
+        raise ValueError("Kayıt dosyası değil (başlık eksik)")
+    header = _header(raw, raw[_PREAMBLE.size:])
+    rows = header["rows"]
+    n_band, n_hsi = len(header["band_columns"]), len(header["hsi_columns"])
+
+    def view(dtype, shape, offset):
+        if not int(np.prod(shape)):
+            return np.empty(shape, dtype=dtype)
+        if in_memory:
+            count = int(np.prod(shape))
+            return np.frombuffer(source, dtype=dtype, count=count, offset=offset).reshape(shape)
+        return np.memmap(source, dtype=dtype, mode="c", offset=offset, shape=shape)
+
+    offset = HEADER_SIZE
+    timestamps = None
+    if header["has_time"]:
+        timestamps = view("<i8", (rows,), offset)
+        offset += rows * 8
+    bands = view("<f4", (n_band, rows), offset)
+    offset += n_band * rows * 4
+    hsi = view("<f4", (n_hsi, rows), offset)
+
+    extras = {}
+    if header["extras_len"]:
+        if in_memory:
+            extras_raw = bytes(source[header["extras_offset"]:header["extras_offset"] + header["extras_len"]])
+        else:
+            with open(source, "rb") as f:
+                f.seek(header["extras_offset"])
+                extras_raw = f.read(header["extras_len"])
+        extras = json.loads(extras_raw.decode("utf-8"))
+    return BinaryRecording(header, timestamps, bands, hsi, extras, path=None if in_memory else str(source))
+
+
+def read_recording(source) -> pd.DataFrame:
+    """.zrec kaydını DataFrame olarak açar (zenin_mac2.read_recording_csv ile aynı sütunlar)."""
+    return open_recording(source).to_frame()
+
+
+def binary_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + EXTENSION
+
+
+def prefer_binary(paths) -> list:
+    """Aynı klasörde güncel .zrec kopyası olan CSV'leri listeden çıkarır (kayıt iki kez işlenmesin).
+    .zrec, CSV'den eskiyse CSV kullanılır ve .zrec atlanır."""
+    paths = list(paths)
+    present = set(paths)
+    keep = []
+    for path in paths:
+        if path.lower().endswith(".csv"):
+            zrec = binary_path(path)
+            if zrec in present and os.path.getmtime(zrec) >= os.path.getmtime(path):
+                continue
+        elif path.lower().endswith(EXTENSION):
+            csv_path = os.path.splitext(path)[0] + ".csv"
+            if csv_path in present and os.path.getmtime(path) < os.path.getmtime(csv_path):
+                continue
+        keep.append(path)
+    return keep
+
+
+def _is_recording_frame(df: pd.DataFrame) -> bool:
+    """Band ya da HSI sütunu olan CSV'ler kayıttır (ör. Delta_TP9, HSI_AF7)."""
+    return any(str(c).startswith(_RECORDING_COLUMN_PREFIXES) for c in df.columns)
+
+
+def convert_tree(root: str, out_root: str = None, force: bool = False) -> list:
+    """root altındaki kayıt CSV'lerini .zrec'e çevirir; (csv, zrec, durum) listesi döner.
+
+    out_root verilirse klasör yapısı orada kurulur, yoksa .zrec CSV'nin yanına yazılır.
+    graphs/unmatched_data klasörleri ve pipeline log'ları atlanır; hedef CSV'den yeniyse
+    (force değilse) dosya yeniden çevrilmez.
+    """
+    from zenin_mac2 import read_recording_csv
+
+    results = []
+    sources = [root] if os.path.isfile(root) else None
+    if sources is None:
+        sources = []
+        for walk_root, dirs, files in os.walk(root):
+            dirs[:] = sorted(d for d in dirs if d.lower() not in _SKIP_DIRS)
+            sources.extend(
+                os.path.join(walk_root, f) for f in sorted(files)
+                if f.lower().endswith(".csv") and not f.startswith(_SKIP_PREFIXES)
+            )
+        base = root
+    else:
+        base = os.path.dirname(root)
+
+    for csv_path in sources:
+        if out_root:
+            target = binary_path(os.path.join(out_root, os.path.relpath(csv_path, base)))
+        else:
+            target = binary_path(csv_path)
+        if not force and os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(csv_path):
+            results.append((csv_path, target, "güncel"))
+            continue
+        df = read_recording_csv(csv_path)
+        if df is None:
+            results.append((csv_path, target, "okunamadı"))
+            continue
+        if not _is_recording_frame(df):
+            results.append((csv_path, target, "kayıt değil"))
+            continue
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        try:
+            write_recording(df, target, source=os.path.basename(csv_path))
+        except (OSError, ValueError) as e:
+            print(f"❌ Dönüştürülemedi: {csv_path} -> {e}")
+            results.append((csv_path, target, "hata"))
+            continue
+        results.append((csv_path, target, "çevrildi"))
+    return results
+
+
+def benchmark(paths, repeat: int = 3):
+    """Aynı kayıtların CSV (read_recording_csv) ve .zrec (read_recording) okuma süreleri."""
+    from zenin_mac2 import read_recording_csv
+
+    results = []
+    for csv_path in paths:
+        zrec = binary_path(csv_path)
+        if not os.path.exists(zrec):
+            write_recording(read_recording_csv(csv_path), zrec, source=os.path.basename(csv_path))
+        row = [os.path.basename(csv_path), os.path.getsize(csv_path) / 1e6, os.path.getsize(zrec) / 1e6]
+        for read in (read_recording_csv, read_recording):
+            timings = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                read(csv_path if read is read_recording_csv else zrec)
+                timings.append(time.perf_counter() - t0)
+            row.append(min(timings))
+        results.append(tuple(row))
+
+    print(f"📊 Kayıt okuma benchmark (en iyi {repeat} deneme)")
+    print(f"{'Dosya':<28} {'CSV MB':>8} {'zrec MB':>8} {'CSV (s)':>9} {'zrec (s)':>9}")
+    for name, csv_mb, zrec_mb, csv_s, zrec_s in results:
+        print(f"{name:<28} {csv_mb:>8.1f} {zrec_mb:>8.1f} {csv_s:>9.3f} {zrec_s:>9.3f}")
+    return results
+
+
+# Kullanım:
+#   python recording_format.py <csv klasörü | kayıt.csv> [çıktı klasörü] [--force]
+#   python recording_format.py --benchmark kayıt.csv [...]
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if "--benchmark" in sys.argv:
+        benchmark(args)
+    elif not args:
+        print("Kullanım: python recording_format.py <csv klasörü | kayıt.csv> [çıktı klasörü] [--force]")
+        sys.exit(1)
+    else:
+        results = convert_tree(args[0], args[1] if len(args) > 1 else None, force="--force" in sys.argv)
+        counts = {}
+        for csv_path, target, status in results:
+            counts[status] = counts.get(status, 0) + 1
+            if status not in ("çevrildi", "güncel"):
+                print(f"⚠️ {status}: {csv_path}")
+        csv_mb = sum(os.path.getsize(c) for c, _, s in results if s == "çevrildi") / 1e6
+        zrec_mb = sum(os.path.getsize(t) for _, t, s in results if s == "çevrildi") / 1e6
+        print(f"✅ {len(results)} CSV: " + ", ".join(f"{n} {s}" for s, n in counts.items())
+              + (f" ({csv_mb:.1f} MB -> {zrec_mb:.1f} MB)" if csv_mb else ""))
@@ -0,0 +1,293 @@
+# shared_recording.py
+# Kayıtları süreçler arasında kopyalamadan taşımak için paylaşımlı bellek blokları.
+# Okuma, analitik ve grafik ayrı süreçlerde çalıştığında büyük DataFrame'leri
+# pickle'lamak işin kendisinden pahalıya patlar; burada kayıt tek bir adlandırılmış
+# float32 bloğa (satır x sütun) yazılır, süreçler arasında yalnızca küçük bir
+# tanımlayıcı (RecordingDescriptor) gider ve işçi süreçler bloğa kopyasız bağlanır.
+#
+# Yaşam döngüsü: bloğu yaratan süreç (share_recording) sahibidir ve kapatınca siler.
+# Sahip çökerse multiprocessing resource tracker bloğu siler; tracker da öldüyse
+# cleanup_stale_blocks() süreci yaşamayan blokları temizler.
+
+import os
+import sys
+import time
+import atexit
+import pickle
+import multiprocessing
+from dataclasses import dataclass, field
+from multiprocessing import resource_tracker, shared_memory
+from uuid import uuid4
+
+import numpy as np
+import pandas as pd
+
+# Blok adları: <önek>_<sahip pid>_<rastgele>; pid sayesinde sahipsiz bloklar bulunur
+SHM_PREFIX = "zenin_rec"
+SHM_DIR = "/dev/shm"
+TIME_COLUMN = "TimeStamp"
+
+# Bu süreçte yaratılmış ve henüz silinmemiş bloklar (çıkışta silinir)
+_OWNED = {}
+
+# Tracker, işçi süreçler başlamadan çalışıyor olmalı: sonradan fork edilen işçi
+# kendi tracker'ını açar ve bağlandığı blokları çıkarken sızıntı sanıp siler
+if os.name == "posix":
+    resource_tracker.ensure_running()
+
+
+@dataclass
+class RecordingDescriptor:
+    """Paylaşımlı bloktaki kaydın tanımı; pickle'lanıp işçi süreçlere gönderilir."""
+    name: str  # paylaşımlı bellek bloğunun adı
+    shape: tuple  # (satır, sütun)
+    columns: dict  # sütun adı -> bloktaki sütun indeksi (orijinal sırayla)
+    dtype: str = "float32"
+    time_column: str = None  # zaman damgası sütunu (blokta time_origin'e göre saniye)
+    time_origin: str = None  # ilk geçerli zaman damgası (ISO biçimi)
+    dropped: list = field(default_factory=list)  # sayısal olmadığı için taşınmayan sütunlar
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape)) * np.dtype(self.dtype).itemsize
+
+
+class SharedRecording:
+    """Bloğun sahibi: share_recording ile yaratılır, close() (ya da with bloğu sonu) bloğu siler."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, descriptor: RecordingDescriptor):
+        self.shm = shm
+        self.descriptor = descriptor
+        _OWNED[shm.name] = shm
+
+    def close(self):
+        shm = _OWNED.pop(self.shm.name, None)
+        if shm is not None:
+            _release(shm, unlink=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AttachedRecording:
+    """İşçi tarafı: bloğa kopyasız bağlanmış DataFrame (frame). close() yalnızca bağlantıyı kapatır."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, frame: pd.DataFrame):
+        self.shm = shm
+        self.frame = frame
+
+    def close(self):
+        # numpy görünümleri yaşarken blok kapatılamaz: önce DataFrame bırakılır
+        self.frame = None
+        _release(self.shm, unlink=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _release(shm: shared_memory.SharedMemory, unlink: bool):
+    try:
+        shm.close()
+    except BufferError:
+        # blok üzerinde hâlâ görünüm var (çağıran DataFrame'i tutuyor); süreç çıkışında kapanır
+        pass
+    if unlink:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def share_recording(df: pd.DataFrame, dtype=np.float32, time_column: str = TIME_COLUMN) -> SharedRecording:
+    """Kaydın sayısal sütunlarını (ve zaman damgasını) yeni bir paylaşımlı bloğa yazar.
+
+    Zaman damgası ilk geçerli değere göre saniye (offset) olarak saklanır; okunamayan
+    damgalar NaN. Sayısal olmayan diğer sütunlar taşınmaz (descriptor.dropped).
+    float32 bellek ve kopya maliyetini yarıya indirir; analitik için tam hassasiyet
+    gerekiyorsa dtype=np.float64 verilebilir.
+    """
+    columns, arrays, dropped = {}, [], []
+    time_origin = None
+    for col in df.columns:
+        series = df[col]
+        if col == time_column:
+            stamps = pd.to_datetime(series, errors="coerce")
+            valid = stamps.dropna()
+            if valid.empty:
+                dropped.append(col)
+                continue
+            origin = valid.iloc[0]
+            time_origin = origin.isoformat()
+            arrays.append(((stamps - origin) / pd.Timedelta(seconds=1)).to_numpy(dtype=np.float64))
+        elif pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            arrays.append(series.to_numpy(dtype=np.float64, na_value=np.nan))
+        else:
+            dropped.append(col)
+            continue
+        columns[col] = len(arrays) - 1
+
+    rows = len(df)
+    shape = (rows, len(arrays))
+    size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+    shm = shared_memory.SharedMemory(name=f"{SHM_PREFIX}_{os.getpid()}_{uuid4().hex[:12]}", create=True, size=size)
+    block = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    for i, values in enumerate(arrays):
+        block[:, i] = values
+    del block
+    descriptor = RecordingDescriptor(
+        name=shm.name,
+        shape=shape,
+        columns=columns,
+        dtype=np.dtype(dtype).name,
+        time_column=time_column if time_origin is not None else None,
+        time_origin=time_origin,
+        dropped=dropped
+    )
+    return SharedRecording(shm, descriptor)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    shm = shared_memory.SharedMemory(name=name)
+    # Python < 3.13: bağlanan süreç de bloğu resource tracker'a kaydeder. multiprocessing
+    # ile başlatılan işçiler sahibin tracker'ını paylaşır (kayıt tekrarı etkisiz); bağımsız
+    # bir süreçteyse kendi tracker'ı bloğu süreç çıkarken silerdi, kayıt geri alınır
+    # (sahibin kendi bağlantısında kayıt sahibindir, dokunulmaz)
+    if multiprocessing.parent_process() is None and name not in _OWNED:
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+    return shm
+
+
+def attach_recording(descriptor: RecordingDescriptor, timestamps: bool = True) -> AttachedRecording:
+    """Bloğa kopyasız bağlanır; frame sütunları bloğun görünümüdür (salt okunur kullanılmalı).
+
+    timestamps=True ise zaman sütunu time_origin + offset olarak datetime'a çevrilir
+    (yalnızca bu sütun için yeni bellek ayrılır), False ise saniye offset'i kalır.
+    """
+    shm = _attach(descriptor.name)
+    block = np.ndarray(descriptor.shape, dtype=descriptor.dtype, buffer=shm.buf)
+    names = sorted(descriptor.columns, key=descriptor.columns.get)
+    frame = pd.DataFrame(block, columns=names, copy=False)
+    if timestamps and descriptor.time_column in descriptor.columns:
+        offsets = frame[descriptor.time_column].to_numpy(dtype=np.float64)
+        frame[descriptor.time_column] = pd.Timestamp(descriptor.time_origin) + pd.to_timedelta(offsets, unit="s")
+    return AttachedRecording(shm, frame)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def cleanup_stale_blocks(shm_dir: str = SHM_DIR) -> list:
+    """Sahibi artık çalışmayan (çökmüş) süreçlerin bloklarını siler, silinen adları döndürür.
+
+    Yalnızca blokları dosya olarak gösteren sistemlerde (Linux /dev/shm) çalışır.
+    """
+    removed = []
+    if not os.path.isdir(shm_dir):
+        return removed
+    for entry in os.listdir(shm_dir):
+        if not entry.startswith(SHM_PREFIX + "_"):
+            continue
+        try:
+            pid = int(entry[len(SHM_PREFIX) + 1:].split("_")[0])
+        except ValueError:
+            continue
+        if pid != os.getpid() and not _pid_alive(pid):
+            try:
+                os.remove(os.path.join(shm_dir, entry))
+                removed.append(entry)
+            except OSError as e:
+                print(f"⚠️ Paylaşımlı blok silinemedi: {entry} -> {e}")
+    return removed
+
+
+@atexit.register
+def _cleanup_owned():
+    """Normal çıkışta kapatılmamış blokları sil."""
+    for name in list(_OWNED):
+        _release(_OWNED.pop(name), unlink=True)
+
+
+def _worker_column_means(payload):
+    """Benchmark işçisi: pickle'lanmış DataFrame ya da descriptor alır, sütun ortalamalarını döndürür."""
+    if isinstance(payload, RecordingDescriptor):
+        with attach_recording(payload, timestamps=False) as attached:
+            return float(attached.frame.to_numpy().mean())
+    return float(payload.select_dtypes("number").to_numpy().mean())
+
+
+def benchmark(path: str = None, minutes: int = 20, repeat: int = 5):
+    """Kaydı bir işçi sürece göndermenin maliyeti: DataFrame pickle vs paylaşımlı blok + descriptor."""
+    from concurrent.futures import ProcessPoolExecutor
+    from csv_reader import read_csv
+
+    if path:
+        df = read_csv(path)
+    else:
+        hz = 256
+        rows = minutes * 60 * hz
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({
+            TIME_COLUMN: (pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(rows) / hz, unit="s"))
+            .strftime("%Y-%m-%d %H:%M:%S.%f")
+        })
+        for band in ("Delta", "Theta", "Alpha", "Beta", "Gamma", "HSI"):
+            for ch in ("TP9", "AF7", "AF8", "TP10"):
+                df[f"{band}_{ch}"] = rng.normal(0.5, 0.3, rows)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        pool.submit(int, 0).result()  # işçiyi ısıt
+        timings = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            pool.submit(_worker_column_means, df).result()
+            timings.append(time.perf_counter() - t0)
+        results.append(("pickle DataFrame", min(timings), len(pickle.dumps(df)) / 1e6))
+
+        timings = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            with share_recording(df) as shared:
+                pool.submit(_worker_column_means, shared.descriptor).result()
+            timings.append(time.perf_counter() - t0)
+        results.append(("shared float32", min(timings), len(pickle.dumps(shared.descriptor)) / 1e6))
+
+        # Blok bir kez yazılıp birden çok aşamaya verildiğinde aşama başına maliyet
+        with share_recording(df) as shared:
+            timings = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                pool.submit(_worker_column_means, shared.descriptor).result()
+                timings.append(time.perf_counter() - t0)
+        results.append(("  yalnız aktarım", min(timings), len(pickle.dumps(shared.descriptor)) / 1e6))
+
+    print(f"📊 Kayıt aktarım benchmark: {len(df)} satır x {df.shape[1]} sütun")
+    print(f"{'Yol':<18} {'Süre (s)':>10} {'Gönderilen (MB)':>16}")
+    for name, elapsed, sent_mb in results:
+        print(f"{name:<18} {elapsed:>10.3f} {sent_mb:>16.3f}")
+    return results
+
+
+# Kullanım: python shared_recording.py [kayıt.csv]
+# Dosya verilmezse 20 dakikalık 256 Hz sentetik kayıt kullanılır.
+if __name__ == "__main__":
+    removed = cleanup_stale_blocks()
+    if removed:
+        print(f"🧹 Sahipsiz {len(removed)} blok silindi")
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
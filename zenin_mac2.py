@@ -1,13 +1,27 @@
 import os
+import io
+import sys
+import collections
+from concurrent.futures import ThreadPoolExecutor
 import csv
 import time
 import re
 import math
+from dataclasses import dataclass, field
 import pandas as pd
 import numpy as np
 from analytics5 import compute_mail_csv_metrics, to_sheet_row, HEADERS
 from profile_analyzer5 import analyze_profiles_from_metrics
-from zenin_plot_generator import generate_eeg_plots
+from zenin_plot_generator import (
+    generate_eeg_plots, generate_event_montage, build_montage_panel,
+    append_plot_index, thumbnail_path
+)
+from analyze_processing_log import SummaryAccumulator, save_summary
+from excel_writer import write_sheets
+from csv_reader import read_csv
+from recording_format import (
+    RECORDING_EXTENSIONS, is_binary_recording, is_recording_path, prefer_binary, read_recording
+)
 
 # CSV kök dizini: data içindeki etkinlik klasörleri
 CSV_ROOT = r"/Users/umutkaya/Documents/Zenin Mind Reader/data"
@@ -25,11 +39,40 @@ UNMATCHED_LOG_HEADERS = [
     "dalga_farki","controlled_mean","controlled_label",
     "processed_at_utc"
 ]
+# Ana log sütunları: event + status sütunları (zenin_mac2'de hesaplanır) + HEADERS
+LOG_HEADERS = ["event", "status_delta", "status_theta", "status_alpha", "status_beta", "status_gamma"] + HEADERS
+# Canlı özet bu kadar eşleşen kayıtta bir (ve her etkinlik sonunda) güncellenir
+SUMMARY_FLUSH_ROWS = 25
 UNMATCHED_KEY_COLS = ("event", "person_name", "source_file")
 
 # DOMINANCE_DELTA sabiti
 DOMINANCE_DELTA = 29.0
 
+# Grafik modları: kişi başına grafik, etkinlik başına montaj sayfaları veya ikisi
+PLOT_MODES = {"individual", "montage", "both", "none"}
+
+# Önden okuma: sıradaki bu kadar kayıt arka plan thread'lerinde okunur (0: seri okuma);
+# okunmayı bekleyen kayıtların toplam (disk) boyutu PREFETCH_MAX_MB'ı aşmaz
+PREFETCH_DEPTH = 2
+PREFETCH_MAX_MB = 512
+
+
+@dataclass
+class RecordingResult:
+    """Tek kaydın pipeline sonucu (process_recording, iter_process_files / iter_pipeline)."""
+    event: str
+    person_name: str
+    source_file: str
+    matched: bool
+    profile: str  # en_iyi_profiller ("" eşleşmeyen kayıtlarda)
+    metrics: dict  # compute_mail_csv_metrics + profil alanları (dataframe_with_clean hariç)
+    dominance: dict  # band -> "normal" / "Baskın Yüksek" / "Baskın Düşük"
+    log_row: list  # LOG_HEADERS sırasında log satırı
+    log_path: str  # satırın yazıldığı log (eşleşmeyen: UNMATCHED_DATA CSV'si)
+    plot_files: list = field(default_factory=list)
+    timings_ms: dict = field(default_factory=dict)  # read (okumayı bekleme), analyze, output, total
+    montage_panel: object = field(default=None, repr=False)
+
 def _get_and_increment_run_id() -> int:
     """Run ID'yi oku, artır ve kaydet. İlk çalışmada 1005 döner."""
     default_id = 1005
@@ -78,11 +121,6 @@ def _append_log_row(row: list, log_path: str):
         row: List of values in order: [event] + HEADERS values from to_sheet_row()
         log_path: Path to the CSV log file
     """
-    # LOG_HEADERS = ["event"] + status columns + HEADERS
-    # Status columns are computed in zenin_mac2.py and need to be preserved
-    status_cols = ["status_delta", "status_theta", "status_alpha", "status_beta", "status_gamma"]
-    LOG_HEADERS = ["event"] + status_cols + HEADERS
-    
     os.makedirs(os.path.dirname(log_path), exist_ok=True)
     write_header = not os.path.exists(log_path)
     with open(log_path, "a", newline="", encoding="utf-8") as f:
@@ -99,60 +137,84 @@ def _unmatched_row_key(row: dict):
         key.append(((row.get(col, "") or "")).strip())
     return tuple(key)
 
-def _append_unmatched_log_row(row: dict, run_id: int, unmatched_dir: str = None):
-    """Unmatched profiller için Excel ve CSV log dosyalarına satır ekle."""
-    unmatched_data_dir = unmatched_dir if unmatched_dir else UNMATCHED_DATA_DIR
-    if unmatched_data_dir is None:
-        unmatched_data_dir = os.path.join(CSV_ROOT, "UNMATCHED_DATA")
-    os.makedirs(unmatched_data_dir, exist_ok=True)
-    log_xlsx = os.path.join(unmatched_data_dir, f"unmatched_profiles_log{run_id}.xlsx")
-    log_csv = os.path.join(unmatched_data_dir, f"unmatched_profiles_log{run_id}.csv")
-    data_row = {k: row.get(k, "") for k in UNMATCHED_LOG_HEADERS}
-    row_key = _unmatched_row_key(data_row)
-
-    # Excel append (read + rewrite to preserve formatting)
-    try:
-        if os.path.exists(log_xlsx):
-            try:
-                df_existing = pd.read_excel(log_xlsx, engine="openpyxl")
-            except Exception as e:
-                print(f"⚠️ Unmatched log (xlsx) okunamadı, CSV denenecek: {e}")
-                df_existing = pd.DataFrame(columns=UNMATCHED_LOG_HEADERS)
-        elif os.path.exists(log_csv):
+def write_log_rows(rows: list, log_path: str):
+    """Log satırlarını (process_pipeline formatında) yeni bir log CSV'ye toplu yazar."""
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    with open(log_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(LOG_HEADERS)
+        writer.writerows(rows)
+
+def write_unmatched_log(rows: list, run_id: int, unmatched_dir: str, write_xlsx: bool = True):
+    """Unmatched log satırlarını (dict, UNMATCHED_LOG_HEADERS) toplu olarak CSV (ve xlsx) yazar."""
+    os.makedirs(unmatched_dir, exist_ok=True)
+    df = pd.DataFrame(rows, columns=UNMATCHED_LOG_HEADERS)
+    df.to_csv(os.path.join(unmatched_dir, f"unmatched_profiles_log{run_id}.csv"), index=False, encoding="utf-8")
+    if write_xlsx:
+        write_sheets([("Sheet1", df)], os.path.join(unmatched_dir, f"unmatched_profiles_log{run_id}.xlsx"))
+
+class UnmatchedLog:
+    """Run'ın unmatched profil log'u: satırlar geldikçe CSV'ye tek satır olarak eklenir.
+
+    Tekrar kontrolü için yalnızca anahtarlar bellekte tutulur (mevcut CSV'den ilk eklemede
+    bir kez okunur). write_xlsx=True ise xlsx, close() çağrıldığında CSV'den tek seferde yazılır.
+    """
+
+    def __init__(self, unmatched_dir: str, run_id: int, write_xlsx: bool = True):
+        self.unmatched_dir = unmatched_dir
+        self.csv_path = os.path.join(unmatched_dir, f"unmatched_profiles_log{run_id}.csv")
+        self.xlsx_path = os.path.join(unmatched_dir, f"unmatched_profiles_log{run_id}.xlsx")
+        self.write_xlsx = write_xlsx
+        self.added = 0
+        self._keys = None
+
+    def _load_keys(self) -> set:
+        keys = set()
+        if os.path.exists(self.csv_path):
             try:
-                df_existing = pd.read_csv(log_csv, encoding="utf-8")
+                with open(self.csv_path, newline="", encoding="utf-8") as f:
+                    for existing in csv.DictReader(f):
+                        keys.add(_unmatched_row_key(existing))
             except Exception as e:
-                print(f"⚠️ Unmatched log (csv) okunamadı, yeni dosya oluşturulacak: {e}")
-                df_existing = pd.DataFrame(columns=UNMATCHED_LOG_HEADERS)
-        else:
-            df_existing = pd.DataFrame(columns=UNMATCHED_LOG_HEADERS)
+                print(f"⚠️ Unmatched log (csv) okunamadı, tekrar kontrolü yalnızca bu run için: {e}")
+        return keys
 
-        if df_existing.empty:
-            existing_keys = set()
-        else:
-            # ensure missing columns exist
-            for col in UNMATCHED_LOG_HEADERS:
-                if col not in df_existing.columns:
-                    df_existing[col] = ""
-            existing_keys = set(
-                tuple((str(df_existing.at[idx, col]) if col in df_existing else "").strip()
-                      for col in UNMATCHED_KEY_COLS)
-                for idx in df_existing.index
-            )
-        if row_key in existing_keys:
+    def add(self, row: dict) -> bool:
+        """Satırı ekler; aynı anahtarlı satır zaten varsa atlar (False döner)."""
+        if self._keys is None:
+            self._keys = self._load_keys()
+        data_row = {k: row.get(k, "") for k in UNMATCHED_LOG_HEADERS}
+        row_key = _unmatched_row_key(data_row)
+        if row_key in self._keys:
             print(f"ℹ️ Unmatched log satırı zaten mevcut (event={row.get('event')}, person={row.get('person_name')}, file={row.get('source_file')}). Atlanıyor.")
-            return
+            return False
+        try:
+            os.makedirs(self.unmatched_dir, exist_ok=True)
+            write_header = not os.path.exists(self.csv_path)
+            with open(self.csv_path, "a", newline="", encoding="utf-8") as f:
+                # pandas to_csv (write_unmatched_log) ile aynı satır sonu
+                writer = csv.writer(f, lineterminator="\n")
+                if write_header:
+                    writer.writerow(UNMATCHED_LOG_HEADERS)
+                writer.writerow([data_row[k] for k in UNMATCHED_LOG_HEADERS])
+        except Exception as e:
+            print(f"❌ Unmatched log yazma hatası: {e}")
+            return False
+        self._keys.add(row_key)
+        self.added += 1
+        print(f"✅ Unmatched profil log'a eklendi: {row.get('person_name', 'unknown')}")
+        return True
 
-        df_new = pd.DataFrame([data_row])
-        df_combined = pd.concat([df_existing, df_new], ignore_index=True)
-        df_combined.to_excel(log_xlsx, index=False, engine="openpyxl")
-        df_combined.to_csv(log_csv, index=False, encoding="utf-8")
-    except Exception as e:
-        print(f"❌ Unmatched Excel log yazma hatası: {e}")
-        import traceback
-        traceback.print_exc()
-
-    print(f"✅ Unmatched profil log'a eklendi: {row.get('person_name', 'unknown')}")
+    def close(self):
+        """Bu run'da satır eklendiyse xlsx'i CSV'nin tamamından bir kez yazar."""
+        if not (self.write_xlsx and self.added and os.path.exists(self.csv_path)):
+            return
+        try:
+            df = pd.read_csv(self.csv_path, encoding="utf-8", float_precision="round_trip")
+            write_sheets([("Sheet1", df)], self.xlsx_path)
+        except Exception as e:
+            print(f"❌ Unmatched Excel log yazma hatası: {e}")
+        self.added = 0
 
 def _build_plot_key(csv_path: str, event: str, csv_root: str = None) -> str:
     """Grafik çıktısı için eşsiz bir isim üretir."""
@@ -166,7 +228,395 @@ def _build_plot_key(csv_path: str, event: str, csv_root: str = None) -> str:
     safe_rel = re.sub(r"[\\/]+", "__", rel_path)
     return f"{safe_event}__{safe_rel}"
 
-def process_pipeline(
+def _plot_index_entries(plot_files: list, out_dir: str, event: str, person_name: str,
+                        profile: str, unmatched: bool, thumbnails: bool) -> list:
+    """Üretilen grafikler için run grafik indeksine yazılacak kayıtları hazırla.
+
+    Yollar out_dir'e göreli tutulur; kategori (dominant/normal) grafiğin
+    kaydedildiği alt klasörden okunur.
+    """
+    def _rel(path):
+        return os.path.relpath(path, out_dir).replace(os.sep, "/")
+
+    entries = []
+    for path in plot_files or []:
+        thumb = thumbnail_path(path)
+        entries.append({
+            "path": _rel(path),
+            "thumb": _rel(thumb) if thumbnails and os.path.exists(thumb) else None,
+            "event": event,
+            "category": os.path.basename(os.path.dirname(path)),
+            "unmatched": unmatched,
+            "person": person_name,
+            "profile": profile or "",
+        })
+    return entries
+
+
+def iter_event_csvs(root: str, skip_files=()):
+    """root altındaki klasörleri gezer: (event, klasör, kayıt dosyaları) üretir.
+    Kayıtlar CSV ya da ikili .zrec (recording_format); aynı kaydın güncel .zrec kopyası
+    varsa CSV atlanır. graphs/unmatched_data klasörleri ve skip_files atlanır;
+    event = root'a göre göreli yol ("root")."""
+    for walk_root, dirs, files in os.walk(root):
+        # prevent descending into graphs/unmatched_data folders altogether
+        dirs[:] = [d for d in dirs if d.lower() not in {"graphs", "unmatched_data"}]
+        if os.path.basename(walk_root).lower() in {"graphs", "unmatched_data"}:
+            continue
+
+        # collect recording files but skip the central log file if present
+        csv_files = [f for f in files if f.lower().endswith(RECORDING_EXTENSIONS) and f not in skip_files]
+        csv_files = [os.path.basename(p) for p in prefer_binary(os.path.join(walk_root, f) for f in csv_files)]
+        if not csv_files:
+            continue
+
+        # Determine event name as path relative to root (use "." -> root_event)
+        event = os.path.relpath(walk_root, root)
+        if event == ".":
+            event = "root"
+        yield event, walk_root, csv_files
+
+
+def read_recording_csv(csv_path, name: str = None):
+    """Kayıt CSV'sini okur (utf-8, olmazsa cp1254) ve infinity değerlerini NaN yapar.
+    csv_path dosya yolu ya da bellekteki içerik (bytes, ör. yüklenen dosya) olabilir.
+    Okuma csv_reader üzerinden (kuruluysa çok thread'li engine). İkili .zrec kayıtları
+    (uzantı ya da içerik başındaki magic) ayrıştırılmadan memmap ile açılır. Okunamazsa None döner."""
+    in_memory = isinstance(csv_path, (bytes, bytearray))
+    label = name or ("upload.csv" if in_memory else csv_path)
+    if is_binary_recording(csv_path):
+        # infinity değerleri dönüştürülürken NaN yapıldı
+        try:
+            return read_recording(csv_path)
+        except (OSError, ValueError) as e:
+            print(f"❌ Kayıt okunamadı: {label} -> {e}")
+            return None
+    try:
+        df = read_csv(csv_path, encoding="utf-8")
+    except Exception:
+        try:
+            df = read_csv(csv_path, encoding="cp1254")
+        except Exception as e:
+            print(f"❌ CSV okunamadı: {label} -> {e}")
+            return None
+
+    # Replace infinity values with NaN before processing
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    inf_count = 0
+    for col in numeric_cols:
+        inf_mask = np.isinf(df[col])
+        if inf_mask.any():
+            inf_count += inf_mask.sum()
+            df.loc[inf_mask, col] = np.nan
+    if inf_count > 0:
+        print(f"⚠️ {inf_count} infinity değeri tespit edildi ve NaN ile değiştirildi: {os.path.basename(label)}")
+    return df
+
+
+def prefetch_recordings(csv_paths, depth: int = PREFETCH_DEPTH, max_mb: float = PREFETCH_MAX_MB):
+    """csv_paths'teki kayıtları sırayla (yol, df) olarak üretir; çağıran bir kaydı işlerken
+    sıradaki en fazla depth kayıt arka plan thread'lerinde okunur (read_recording_csv).
+
+    Geri basınç: kuyruktaki kayıtların disk boyutu toplamı max_mb'ı aşınca yeni okuma
+    başlatılmaz (kuyruk boşsa büyük bir kayıt yine de okunur). depth <= 0 seri okur.
+    Okunamayan kayıt için df None. Üretici erken kapatılırsa bekleyen okumalar iptal edilir.
+    """
+    paths = list(csv_paths)
+    if depth <= 0:
+        for csv_path in paths:
+            yield csv_path, read_recording_csv(csv_path)
+        return
+
+    max_bytes = max_mb * 1024 * 1024
+    pending = collections.deque()  # (yol, disk boyutu, future)
+    pending_bytes = 0
+    next_index = 0
+    executor = ThreadPoolExecutor(max_workers=depth, thread_name_prefix="csv-prefetch")
+
+    def fill():
+        nonlocal pending_bytes, next_index
+        while next_index < len(paths) and len(pending) < depth:
+            try:
+                size = os.path.getsize(paths[next_index])
+            except OSError:
+                size = 0
+            if pending and pending_bytes + size > max_bytes:
+                break
+            pending.append((paths[next_index], size, executor.submit(read_recording_csv, paths[next_index])))
+            pending_bytes += size
+            next_index += 1
+
+    try:
+        fill()
+        while pending:
+            csv_path, size, future = pending.popleft()
+            pending_bytes -= size
+            df = future.result()
+            # çağıran bu kaydı işlerken sıradakiler okunsun
+            fill()
+            yield csv_path, df
+    finally:
+        for _, _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def compute_dominance(scores_map: dict, dom_delta: float) -> dict:
+    """Skorlar üzerinden baskın bantları belirler: en yüksek/en düşük band ile ikincisi
+    arasındaki fark >= dom_delta ise "Baskın Yüksek" / "Baskın Düşük", diğerleri "normal"."""
+    vals = []
+    for b in ["Delta","Theta","Alpha","Beta","Gamma"]:
+        v = scores_map.get(b)
+        try:
+            fv = float(v)
+            if not pd.isna(fv) and not math.isinf(fv):
+                vals.append((b, fv))
+        except Exception:
+            continue
+
+    dominance = {b: "normal" for b in ["Delta","Theta","Alpha","Beta","Gamma"]}
+    if len(vals) >= 2:
+        desc = sorted(vals, key=lambda x: x[1], reverse=True)
+        top_band, top_val = desc[0]
+        second_top_val = desc[1][1]
+        if (top_val - second_top_val) >= dom_delta:
+            dominance[top_band] = "Baskın Yüksek"
+        asc = sorted(vals, key=lambda x: x[1])
+        bot_band, bot_val = asc[0]
+        second_bot_val = asc[1][1]
+        if (second_bot_val - bot_val) >= dom_delta:
+            dominance[bot_band] = "Baskın Düşük"
+    return dominance
+
+
+def apply_profile_rename(metrics: dict, dominance: dict):
+    """Gamma "Baskın Düşük" ise HUZUR ODAKLI YAŞAYAN -> ZİHİN YOLCUSU (metrics yerinde güncellenir)."""
+    try:
+        current_profiles = metrics.get("en_iyi_profiller", "").strip()
+        dom_gamma = dominance.get("Gamma", "")
+        
+        print(f"🔧 RENAME DEBUG: current_profiles='{current_profiles}'")
+        print(f"🔧 RENAME DEBUG: dom_gamma='{dom_gamma}'")
+        
+        # Gamma "Baskın Düşük" ise ve profilde "HUZUR ODAKLI YAŞAYAN" varsa ama "BASKIN DÜŞÜK" yoksa değiştir
+        if (dom_gamma == "Baskın Düşük" and 
+            "HUZUR ODAKLI YAŞAYAN" in current_profiles and 
+            "BASKIN DÜŞÜK" not in current_profiles):
+            
+            new_profiles = current_profiles.replace("HUZUR ODAKLI YAŞAYAN", "ZİHİN YOLCUSU")
+            metrics["en_iyi_profiller"] = new_profiles
+            print(f"✅ RENAME APPLIED: '{current_profiles}' -> '{new_profiles}'")
+        else:
+            print(f"ℹ️ RENAME SKIPPED: Koşul sağlanmadı")
+            
+    except Exception as e:
+        print(f"⚠️ RENAME ERROR: {e}")
+
+
+def analyze_recording(df, name: str, profile_csv_path: str = None, dominance_delta: float = None,
+                      balance_threshold: float = None, denge_mean_threshold: float = None,
+                      window_secs: int = None, window_samples: int = None, band_thresholds: dict = None):
+    """Tek kaydın analitiği + profil eşleştirmesi (process_pipeline ile aynı adımlar):
+    compute_mail_csv_metrics, analyze_profiles_from_metrics, compute_dominance ve Gamma rename.
+    band_thresholds analytics5 biçiminde dict. (metrics, dominance) döner."""
+    # Call compute_mail_csv_metrics with parameters
+    metrics = compute_mail_csv_metrics(
+        df,
+        band_thresholds=band_thresholds,
+        window_secs=window_secs,
+        window_samples=window_samples
+    )
+
+    # Debug: metrics içeriğini göster (özellikle scores/levels/raw_means)
+    print(f"🔧 METRICS DEBUG for {name}: raw_means={metrics.get('raw_means')}")
+    print(f"🔧 METRICS DEBUG for {name}: scores={metrics.get('scores')}")
+    print(f"🔧 METRICS DEBUG for {name}: levels={metrics.get('levels')}")
+
+    # safe profile analysis (ensure returns dict with expected keys)
+    try:
+        profile_data = analyze_profiles_from_metrics(
+            name,
+            metrics,
+            profile_csv_path=profile_csv_path,
+            balance_threshold=balance_threshold,
+            denge_mean_threshold=denge_mean_threshold
+        ) or {}
+    except Exception as e:
+        print(f"⚠️ Profil analiz hatası for {name}: {e}")
+        profile_data = {}
+
+    # Debug: analyze sonucu - enhanced
+    print(f"🔧 PROFILE ANALYZE DEBUG for {name}:")
+    print(f"   profile_data keys: {list(profile_data.keys()) if profile_data else 'EMPTY'}")
+    print(f"   profile_data full: {profile_data}")
+    print(f"   en_iyi_profiller value: '{profile_data.get('en_iyi_profiller', 'MISSING')}'")
+    print(f"   tam_uyumlu_profiller value: '{profile_data.get('tam_uyumlu_profiller', 'MISSING')}'")
+    print(f"   en_iyi_puan value: {profile_data.get('en_iyi_puan', 'MISSING')}")
+
+    # merge metrics
+    metrics.update(profile_data)
+
+    # Debug: atanan profil(ler)i hemen göster - enhanced
+    assigned_profiles = metrics.get('en_iyi_profiller', '')
+    if assigned_profiles and assigned_profiles.strip():
+        print(f"✅ DEBUG - Assigned profile(s): '{assigned_profiles}'")
+    else:
+        print(f"⚠️ DEBUG - NO PROFILE ASSIGNED! Value is empty or None: '{assigned_profiles}'")
+        print(f"   Available metrics keys: {[k for k in metrics.keys() if 'profil' in k.lower() or 'profile' in k.lower()]}")
+
+    # Use provided dominance_delta or default
+    dom_delta = dominance_delta if dominance_delta is not None else DOMINANCE_DELTA
+
+    # dominance (scores üzerinden) hesapla (sağlam kontrol)
+    dominance = compute_dominance(metrics.get("scores", {}) or {}, dom_delta)
+
+    # --- ÖZEL: HUZUR ODAKLI YAŞAYAN -> ZİHİN YOLCUSU BASKIN DÜŞÜK ataması (güçlendirilmiş kontrol) ---
+    apply_profile_rename(metrics, dominance)
+    return metrics, dominance
+
+
+def analyze_shared_recording(descriptor, name: str, **analysis_args):
+    """Süreç işçileri için analyze_recording: kayıt paylaşımlı bloktan (shared_recording)
+    kopyasız okunur. analysis_args analyze_recording ile aynı. Dönen metrics'te
+    dataframe_with_clean yoktur (geri pickle'lanmasın); (metrics, dominance) döner."""
+    from shared_recording import attach_recording
+
+    with attach_recording(descriptor) as attached:
+        metrics, dominance = analyze_recording(attached.frame, name, **analysis_args)
+        # blok görünümü tutan DataFrame bağlantı kapanmadan bırakılır
+        metrics.pop("dataframe_with_clean", None)
+    return metrics, dominance
+
+
+def _unmatched_log_row(event: str, person_name: str, source_file: str, metrics: dict,
+                       sheet_row: list, status_values: list) -> dict:
+    """Unmatched log satırı (UNMATCHED_LOG_HEADERS formatında)."""
+    # Map sheet_row values to a dict using HEADERS order
+    sheet_row_dict = dict(zip(HEADERS, sheet_row))
+    return {
+        "event": event,
+        "person_name": person_name,
+        "source_file": source_file,
+        "en_iyi_profiller": metrics.get("en_iyi_profiller", "") or "",
+        "tam_uyumlu_profiller": metrics.get("tam_uyumlu_profiller", ""),
+        "en_iyi_puan": metrics.get("en_iyi_puan", ""),
+        "level_delta": sheet_row_dict.get("level_delta", ""),
+        "level_theta": sheet_row_dict.get("level_theta", ""),
+        "level_alpha": sheet_row_dict.get("level_alpha", ""),
+        "level_beta": sheet_row_dict.get("level_beta", ""),
+        "level_gamma": sheet_row_dict.get("level_gamma", ""),
+        "status_delta": status_values[0],
+        "status_theta": status_values[1],
+        "status_alpha": status_values[2],
+        "status_beta": status_values[3],
+        "status_gamma": status_values[4],
+        "score_delta": sheet_row_dict.get("score_delta", ""),
+        "score_theta": sheet_row_dict.get("score_theta", ""),
+        "score_alpha": sheet_row_dict.get("score_alpha", ""),
+        "score_beta": sheet_row_dict.get("score_beta", ""),
+        "score_gamma": sheet_row_dict.get("score_gamma", ""),
+        "raw_mean_delta": sheet_row_dict.get("raw_mean_delta", ""),
+        "raw_mean_theta": sheet_row_dict.get("raw_mean_theta", ""),
+        "raw_mean_alpha": sheet_row_dict.get("raw_mean_alpha", ""),
+        "raw_mean_beta": sheet_row_dict.get("raw_mean_beta", ""),
+        "raw_mean_gamma": sheet_row_dict.get("raw_mean_gamma", ""),
+        "dalga_farki": metrics.get("dalga_farki", ""),
+        "controlled_mean": metrics.get("controlled_mean", ""),
+        "controlled_label": metrics.get("controlled_label", ""),
+        "processed_at_utc": sheet_row_dict.get("processed_at_utc", "")
+    }
+
+
+def _log_float(value):
+    """Log hücresini float'a çevirir; boş/geçersiz ise None."""
+    try:
+        fv = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(fv) or math.isinf(fv) else fv
+
+
+def metrics_from_log_row(row: dict) -> dict:
+    """processing_log (veya unmatched log) satırından profil analizi ve to_sheet_row için
+    gereken metrics sözlüğünü geri kurar; ham CSV'ye gerek kalmaz."""
+    bands = ["Delta", "Theta", "Alpha", "Beta", "Gamma"]
+
+    def _band_map(prefix, suffix=""):
+        return {b: _log_float(row.get(f"{prefix}{b.lower()}{suffix}")) for b in bands}
+
+    return {
+        "rows": row.get("rows", ""),
+        "duration_sec": row.get("duration_sec", ""),
+        "phone_number": row.get("phone_number", ""),
+        "raw_means": _band_map("raw_mean_"),
+        "raw_means_window": _band_map("raw_mean_", "_window"),
+        "pct_all": _band_map("pct_"),
+        "pct_window": _band_map("pct_", "_window"),
+        "scores": _band_map("score_"),
+        "levels": {b: row.get(f"level_{b.lower()}", "") or "" for b in bands},
+        "dalga_farki": row.get("Dalga_Farki", row.get("dalga_farki", "")),
+    }
+
+
+def reclassify_log_row(row: dict, profile_csv_path: str = None, dominance_delta: float = None,
+                       balance_threshold: float = None, denge_mean_threshold: float = None):
+    """Kayıtlı skor/seviyelere profil eşleştirmeyi ve dominance'ı yeniden uygular.
+
+    Returns:
+        (log_row, unmatched_log_row, is_unmatched) - process_pipeline ile aynı formatta
+    """
+    event = row.get("event", "") or "root"
+    person_name = row.get("person_name", "") or "unknown"
+    source_file = row.get("source_file", "") or ""
+    metrics = metrics_from_log_row(row)
+    try:
+        profile_data = analyze_profiles_from_metrics(
+            source_file,
+            metrics,
+            profile_csv_path=profile_csv_path,
+            balance_threshold=balance_threshold,
+            denge_mean_threshold=denge_mean_threshold
+        ) or {}
+    except Exception as e:
+        print(f"⚠️ Profil analiz hatası for {source_file}: {e}")
+        profile_data = {}
+    metrics.update(profile_data)
+
+    dom_delta = dominance_delta if dominance_delta is not None else DOMINANCE_DELTA
+    dominance = compute_dominance(metrics.get("scores", {}) or {}, dom_delta)
+    apply_profile_rename(metrics, dominance)
+    is_unmatched = not (metrics.get("en_iyi_profiller", "") or "").strip()
+
+    sheet_row = to_sheet_row(person_name, source_file, metrics)
+    status_values = [dominance.get(b, "normal") for b in ["Delta", "Theta", "Alpha", "Beta", "Gamma"]]
+    log_row = [event] + status_values + sheet_row
+    return log_row, _unmatched_log_row(event, person_name, source_file, metrics, sheet_row, status_values), is_unmatched
+
+
+def _flush_live_summary(summary_acc, pending_rows: list, out_dir: str, rid: str, partial: bool = True):
+    """Bekleyen log satırlarını canlı özete ekler ve profile_summary dosyalarını yazar.
+
+    Satırlar log dosyasıyla aynı biçimde (CSV yaz/oku) çevrilir, böylece sonuç
+    analyze_processing_log'un log'dan ürettiği özetle aynıdır. Ara özetlerde
+    (partial=True) yalnızca JSON yazılır; son çağrı xlsx yolunu döndürür.
+    """
+    try:
+        if pending_rows:
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(LOG_HEADERS)
+            writer.writerows(pending_rows)
+            buf.seek(0)
+            summary_acc.add(pd.read_csv(buf, dtype=str).fillna(""))
+            pending_rows.clear()
+        if summary_acc.rows:
+            return save_summary(*summary_acc.summary_parts(), out_dir, rid, partial=partial)
+    except Exception as summary_err:
+        print(f"⚠️ Canlı özet güncellenemedi: {summary_err}")
+    return None
+
+
+def pipeline_settings(
     csv_root: str = None,
     run_id: str = None,
     output_dir: str = None,
@@ -176,30 +626,18 @@ def process_pipeline(
     denge_mean_threshold: float = None,
     window_secs: int = None,
     window_samples: int = None,
-    band_thresholds: dict = None
+    band_thresholds: dict = None,
+    plot_format: str = None,
+    plot_thumbnails: bool = True,
+    plot_mode: str = "individual",
+    live_summary: bool = True,
+    unmatched_xlsx: bool = True
 ) -> dict:
-    """
-    Process EEG pipeline with configurable parameters.
-    
-    Args:
-        csv_root: Root directory to scan for CSV files (default: CSV_ROOT)
-        run_id: Run identifier (default: auto-generated)
-        output_dir: Directory for outputs (default: csv_root)
-        profile_csv_path: Path to profile CSV file (default: PROFILES_FILE from profile_analyzer5)
-        dominance_delta: Dominance threshold (default: DOMINANCE_DELTA)
-        balance_threshold: Balance threshold (default: from profile_analyzer5)
-        denge_mean_threshold: Denge mean threshold (default: from profile_analyzer5)
-        window_secs: Window seconds for rolling (default: from analytics5)
-        window_samples: Window samples for outlier cleaning (default: from analytics5)
-        band_thresholds: Band thresholds dict (default: from analytics5)
-    
-    Returns:
-        dict with keys: processed_files, matched_count, unmatched_count, log_path
-    """
-    # Use provided values or defaults
-    root = csv_root if csv_root is not None else CSV_ROOT
+    """process_files parametrelerini process_recording'in kullandığı ayarlara çevirir:
+    run id, çıktı klasörü, log/grafik indeksi yolları, dict biçiminde band_thresholds, grafik modu.
+    output_dir verilmezse çıktılar csv_root'a yazılır."""
     rid = run_id if run_id is not None else str(_get_and_increment_run_id())
-    out_dir = output_dir if output_dir is not None else root
+    out_dir = output_dir if output_dir is not None else csv_root
     
     # Convert band_thresholds from Pydantic models to dict format if needed
     band_thresh_dict = None
@@ -216,303 +654,613 @@ def process_pipeline(
             else:  # Already a dict
                 band_thresh_dict[band] = thresh
     
-    print(f"🔄 Run ID: {rid}")
+    if plot_mode not in PLOT_MODES:
+        raise ValueError(f"Geçersiz plot_mode: {plot_mode} (seçenekler: {sorted(PLOT_MODES)})")
     
-    # Set up log paths with run_id
-    log_path = os.path.join(out_dir, f"processing_log{rid}.csv")
-	
-    unmatched_total = 0
-    matched_total = 0
-    processed_files = set()
-    # Walk root and process all csv files under subfolders (skip 'graphs' folders and the log file)
-    for walk_root, dirs, files in os.walk(root):
-        # prevent descending into graphs/unmatched_data folders altogether
-        dirs[:] = [d for d in dirs if d.lower() not in {"graphs", "unmatched_data"}]
-        if os.path.basename(walk_root).lower() in {"graphs", "unmatched_data"}:
-            continue
+    return {
+        "csv_root": csv_root,
+        "rid": rid,
+        "out_dir": out_dir,
+        "log_path": os.path.join(out_dir, f"processing_log{rid}.csv"),
+        # Galeri API'si için run bazlı grafik indeksi (dizin taraması yerine)
+        "plot_index_path": os.path.join(out_dir, f"plot_index{rid}.jsonl"),
+        "profile_csv_path": profile_csv_path,
+        "dominance_delta": dominance_delta,
+        "balance_threshold": balance_threshold,
+        "denge_mean_threshold": denge_mean_threshold,
+        "window_secs": window_secs,
+        "window_samples": window_samples,
+        "band_thresholds": band_thresh_dict,
+        "plot_format": plot_format,
+        "plot_thumbnails": plot_thumbnails,
+        "individual_plots": plot_mode in {"individual", "both"},
+        "montage_plots": plot_mode in {"montage", "both"},
+        "live_summary": live_summary,
+        "unmatched_xlsx": unmatched_xlsx,
+        # eşleşmeyenler run boyunca satır satır eklenir, xlsx run sonunda bir kez yazılır
+        "unmatched_log": UnmatchedLog(
+            os.path.join(out_dir, "UNMATCHED_DATA"),
+            int(rid) if rid.isdigit() else 1005,
+            write_xlsx=unmatched_xlsx
+        ),
+    }
 
-        # collect csv files but skip the central log file if present
-        csv_files = [f for f in files if f.lower().endswith('.csv') and f != os.path.basename(log_path)]
-        if not csv_files:
-            continue
 
-        # Determine event name as path relative to root (use "." -> root_event)
-        event = os.path.relpath(walk_root, root)
-        if event == ".":
-            event = "root"
+def _event_graph_dir(settings: dict, event: str, csv_path: str) -> str:
+    """Kaydın grafik klasörü: ayrı bir çıktı klasörü varsa (backend run'ları) run klasöründe
+    graphs/<event>, yoksa kaydın yanındaki graphs klasörü."""
+    root = settings["csv_root"] or os.path.dirname(csv_path)
+    if os.path.abspath(settings["out_dir"]) != os.path.abspath(root):
+        return os.path.join(settings["out_dir"], "graphs", event)
+    return os.path.join(os.path.dirname(csv_path), "graphs")
+
+
+def _event_of(csv_path: str, csv_root: str = None) -> str:
+    """Dosya listesindeki kaydın etkinliği: csv_root'a göre göreli klasör; kökteyse,
+    kök dışındaysa ya da csv_root yoksa "root"."""
+    if not csv_root:
+        return "root"
+    try:
+        event = os.path.relpath(os.path.dirname(os.path.abspath(csv_path)), os.path.abspath(csv_root))
+    except ValueError:
+        # If paths are on different drives
+        return "root"
+    if event == "." or event.startswith(".."):
+        return "root"
+    return event
+
+
+def read_manifest(manifest_path: str) -> list:
+    """Manifest dosyasındaki CSV yolları: satır başına bir yol, boş ve # ile başlayan satırlar atlanır.
+    Göreli yollar manifest'in bulunduğu klasöre göre çözülür."""
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    paths = []
+    with open(manifest_path, encoding="utf-8-sig") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                paths.append(os.path.normpath(os.path.join(base, line)))
+    return paths
+
 
-        # prepare event-specific graph output dir
-        event_graph_dir = os.path.join(walk_root, "graphs")
-        os.makedirs(event_graph_dir, exist_ok=True)
+def process_recording(csv_path: str, event: str, settings: dict, df=None, analysis=None):
+    """Tek kaydı işler: okur, analiz eder, log'a (eşleşmezse UNMATCHED_DATA'ya) yazar, grafiklerini üretir.
 
-        print(f"Etkinlik: {event} -> bulunan CSV'ler: {csv_files}")
+    settings pipeline_settings'ten gelir; df verilirse dosya yeniden okunmaz, analysis
+    (analyze_recording'in döndürdüğü metrics, dominance) verilirse analiz tekrarlanmaz. Okunamayan
+    kayıt için None, aksi halde RecordingResult döner. Canlı özet ve montaj sayfaları
+    çağıranın (iter_process_files) işidir.
+    """
+    s = settings
+    csv_file = os.path.basename(csv_path)
+    print(f"\n--- [{event}] {csv_file} işleniyor ---")
+    started = time.perf_counter()
+    # read CSV safely
+    if df is None:
+        df = read_recording_csv(csv_path)
+        if df is None:
+            return None
+    read_done = time.perf_counter()
+
+    if analysis is not None:
+        metrics, dominance = analysis
+    else:
+        metrics, dominance = analyze_recording(
+            df,
+            csv_file,
+            profile_csv_path=s["profile_csv_path"],
+            dominance_delta=s["dominance_delta"],
+            balance_threshold=s["balance_threshold"],
+            denge_mean_threshold=s["denge_mean_threshold"],
+            window_secs=s["window_secs"],
+            window_samples=s["window_samples"],
+            band_thresholds=s["band_thresholds"]
+        )
+    analyze_done = time.perf_counter()
+    dom_delta = s["dominance_delta"] if s["dominance_delta"] is not None else DOMINANCE_DELTA
+    out_dir = s["out_dir"]
+    rid = s["rid"]
+    
+    # Check if profile match was found (after all profile modifications)
+    is_unmatched = not (metrics.get("en_iyi_profiller", "") or "").strip()
+    
+    # print metrics for debug
+    print("Analiz Sonuçları:")
+    for k, v in metrics.items():
+        if k != "dataframe_with_clean":
+            print(f"  {k}: {v}")
 
-        for csv_file in csv_files:
-            csv_path = os.path.join(walk_root, csv_file)
-            norm_csv_path = os.path.normpath(os.path.realpath(csv_path))
-            if norm_csv_path in processed_files:
-                print(f"⏭️  {csv_path} daha önce işlendi, atlanıyor.")
-                continue
-            print(f"\n--- [{event}] {csv_file} işleniyor ---")
-            # read CSV safely
+    # prepare log row using to_sheet_row from analytics5
+    person_name = os.path.splitext(csv_file)[0]
+    
+    # Get properly formatted row from analytics5.to_sheet_row (includes all pct_* columns)
+    sheet_row = to_sheet_row(person_name, csv_path, metrics)
+    
+    # Build status columns list
+    status_values = [
+        dominance.get("Delta", "normal"),
+        dominance.get("Theta", "normal"),
+        dominance.get("Alpha", "normal"),
+        dominance.get("Beta", "normal"),
+        dominance.get("Gamma", "normal")
+    ]
+    
+    # Combine: [event] + [status columns] + [HEADERS values from to_sheet_row]
+    log_row = [event] + status_values + sheet_row
+    
+    # For unmatched profiles, also create a dict version (UNMATCHED_LOG_HEADERS format)
+    unmatched_log_row = _unmatched_log_row(event, person_name, csv_file, metrics, sheet_row, status_values)
+    
+    if "dataframe_with_clean" in metrics:
+        df_for_plot = metrics["dataframe_with_clean"]
+    else:
+        df_for_plot = df
+    
+    plot_files = []
+    # Conditional routing based on profile match status
+    if is_unmatched:
+        # Unmatched: route to UNMATCHED_DATA
+        print(f"⚠️ Profil eşleşmesi bulunamadı: {csv_file} -> UNMATCHED_DATA'ya yönlendiriliyor")
+        
+        # Create UNMATCHED_DATA/graphs directory structure
+        unmatched_graph_dir = os.path.join(out_dir, "UNMATCHED_DATA", "graphs")
+        if s["individual_plots"]:
+            os.makedirs(unmatched_graph_dir, exist_ok=True)
+        
+        # Append to the run's unmatched log (uses dict format)
+        s["unmatched_log"].add(unmatched_log_row)
+        row_log_path = s["unmatched_log"].csv_path
+        
+        # Generate plot in UNMATCHED_DATA/graphs
+        if s["individual_plots"]:
+            plot_key = _build_plot_key(csv_path, event, s["csv_root"] or os.path.dirname(csv_path))
             try:
-                df = pd.read_csv(csv_path, encoding="utf-8")
-            except Exception:
-                try:
-                    df = pd.read_csv(csv_path, encoding="cp1254")
-                except Exception as e:
-                    print(f"❌ CSV okunamadı: {csv_path} -> {e}")
-                    continue
+                plot_files = generate_eeg_plots(
+                    dfs={plot_key: df_for_plot},
+                    metrics_map={plot_key: metrics},
+                    balance_diff_map={plot_key: metrics.get("dalga_farki", 0)},
+                    best_profile_map={plot_key: metrics.get("en_iyi_profiller", "")},
+                    output_dir=unmatched_graph_dir,
+                    balance_threshold=s["balance_threshold"],
+                    dominance_delta=dom_delta,
+                    window_secs=s["window_secs"],
+                    image_format=s["plot_format"],
+                    thumbnails=s["plot_thumbnails"]
+                )
+            except Exception as plot_err:
+                print(f"❌ Unmatched grafik üretilemedi ({csv_file}): {plot_err}")
+                import traceback
+                traceback.print_exc()
+                plot_files = []
+            print(f"Unmatched grafik(ler) kaydedildi: {plot_files}")
+            append_plot_index(s["plot_index_path"], _plot_index_entries(
+                plot_files, out_dir, event, person_name, "", True, s["plot_thumbnails"]))
+    else:
+        # Matched: write to main log
+        _append_log_row(log_row, s["log_path"])
+        row_log_path = s["log_path"]
+        
+        # Grafik oluştur ve etkinliğin grafik klasörüne kaydet
+        if s["individual_plots"]:
+            event_graph_dir = _event_graph_dir(s, event, csv_path)
+            os.makedirs(event_graph_dir, exist_ok=True)
+            plot_files = generate_eeg_plots(
+                dfs={csv_file: df_for_plot},
+                metrics_map={csv_file: metrics},
+                balance_diff_map={csv_file: metrics.get("dalga_farki", 0)},
+                best_profile_map={csv_file: metrics.get("en_iyi_profiller", "")},
+                output_dir=event_graph_dir,
+                balance_threshold=s["balance_threshold"],
+                dominance_delta=dom_delta,
+                window_secs=s["window_secs"],
+                image_format=s["plot_format"],
+                thumbnails=s["plot_thumbnails"]
+            )
+            print(f"Oluşan grafik(ler): {plot_files}")
+            append_plot_index(s["plot_index_path"], _plot_index_entries(
+                plot_files, out_dir, event, person_name,
+                metrics.get("en_iyi_profiller", ""), False, s["plot_thumbnails"]))
 
-            # Replace infinity values with NaN before processing
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
-            inf_count = 0
-            for col in numeric_cols:
-                inf_mask = np.isinf(df[col])
-                if inf_mask.any():
-                    inf_count += inf_mask.sum()
-                    df.loc[inf_mask, col] = np.nan
-            if inf_count > 0:
-                print(f"⚠️ {inf_count} infinity değeri tespit edildi ve NaN ile değiştirildi: {csv_file}")
-
-            # Call compute_mail_csv_metrics with parameters
-            metrics = compute_mail_csv_metrics(
-                df,
-                band_thresholds=band_thresh_dict,
-                window_secs=window_secs,
-                window_samples=window_samples
+    # Montaj için yalnızca seyreltilmiş band eğilimlerini biriktir
+    montage_panel = None
+    if s["montage_plots"]:
+        try:
+            montage_panel = build_montage_panel(
+                csv_file, df_for_plot,
+                profile=metrics.get("en_iyi_profiller", "") or "Eşleşme yok",
+                dominant=any(v != "normal" for v in status_values),
+                window_secs=s["window_secs"]
             )
+        except Exception as panel_err:
+            print(f"⚠️ Montaj paneli hazırlanamadı ({csv_file}): {panel_err}")
 
-            # Debug: metrics içeriğini göster (özellikle scores/levels/raw_means)
-            print(f"🔧 METRICS DEBUG for {csv_file}: raw_means={metrics.get('raw_means')}")
-            print(f"🔧 METRICS DEBUG for {csv_file}: scores={metrics.get('scores')}")
-            print(f"🔧 METRICS DEBUG for {csv_file}: levels={metrics.get('levels')}")
+    # Temizlenmiş veri yalnızca grafikler için; sonuçlarla birlikte bellekte tutulmaz
+    metrics.pop("dataframe_with_clean", None)
+    finished = time.perf_counter()
+    return RecordingResult(
+        event=event,
+        person_name=person_name,
+        source_file=csv_path,
+        matched=not is_unmatched,
+        profile=(metrics.get("en_iyi_profiller", "") or "").strip(),
+        metrics=metrics,
+        dominance=dominance,
+        log_row=log_row,
+        log_path=row_log_path,
+        plot_files=list(plot_files or []),
+        timings_ms={
+            "read": round((read_done - started) * 1000, 2),
+            "analyze": round((analyze_done - read_done) * 1000, 2),
+            "output": round((finished - analyze_done) * 1000, 2),
+            "total": round((finished - started) * 1000, 2),
+        },
+        montage_panel=montage_panel,
+    )
 
-            # safe profile analysis (ensure returns dict with expected keys)
-            try:
-                profile_data = analyze_profiles_from_metrics(
-                    csv_file,
-                    metrics,
-                    profile_csv_path=profile_csv_path,
-                    balance_threshold=balance_threshold,
-                    denge_mean_threshold=denge_mean_threshold
-                ) or {}
-            except Exception as e:
-                print(f"⚠️ Profil analiz hatası for {csv_file}: {e}")
-                profile_data = {}
-
-            # Debug: analyze sonucu - enhanced
-            print(f"🔧 PROFILE ANALYZE DEBUG for {csv_file}:")
-            print(f"   profile_data keys: {list(profile_data.keys()) if profile_data else 'EMPTY'}")
-            print(f"   profile_data full: {profile_data}")
-            print(f"   en_iyi_profiller value: '{profile_data.get('en_iyi_profiller', 'MISSING')}'")
-            print(f"   tam_uyumlu_profiller value: '{profile_data.get('tam_uyumlu_profiller', 'MISSING')}'")
-            print(f"   en_iyi_puan value: {profile_data.get('en_iyi_puan', 'MISSING')}")
-
-            # merge metrics
-            metrics.update(profile_data)
-
-            # Debug: atanan profil(ler)i hemen göster - enhanced
-            assigned_profiles = metrics.get('en_iyi_profiller', '')
-            if assigned_profiles and assigned_profiles.strip():
-                print(f"✅ DEBUG - Assigned profile(s): '{assigned_profiles}'")
-            else:
-                print(f"⚠️ DEBUG - NO PROFILE ASSIGNED! Value is empty or None: '{assigned_profiles}'")
-                print(f"   Available metrics keys: {[k for k in metrics.keys() if 'profil' in k.lower() or 'profile' in k.lower()]}")
-            
-            # Use provided dominance_delta or default
-            dom_delta = dominance_delta if dominance_delta is not None else DOMINANCE_DELTA
-            
-            # dominance (scores üzerinden) hesapla (sağlam kontrol)
-            scores_map = metrics.get("scores", {}) or {}
-            vals = []
-            for b in ["Delta","Theta","Alpha","Beta","Gamma"]:
-                v = scores_map.get(b)
-                try:
-                    fv = float(v)
-                    if not pd.isna(fv) and not math.isinf(fv):
-                        vals.append((b, fv))
-                except Exception:
-                    continue
 
-            dominance = {b: "normal" for b in ["Delta","Theta","Alpha","Beta","Gamma"]}
-            if len(vals) >= 2:
-                desc = sorted(vals, key=lambda x: x[1], reverse=True)
-                top_band, top_val = desc[0]
-                second_top_val = desc[1][1]
-                if (top_val - second_top_val) >= dom_delta:
-                    dominance[top_band] = "Baskın Yüksek"
-                asc = sorted(vals, key=lambda x: x[1])
-                bot_band, bot_val = asc[0]
-                second_bot_val = asc[1][1]
-                if (second_bot_val - bot_val) >= dom_delta:
-                    dominance[bot_band] = "Baskın Düşük"
-
-            # --- ÖZEL: HUZUR ODAKLI YAŞAYAN -> ZİHİN YOLCUSU BASKIN DÜŞÜK ataması (güçlendirilmiş kontrol) ---
+def _run_to_end(results) -> dict:
+    """Generator'ı sonuna kadar tüketir ve dönüş değerini (sayılar, log/özet yolları) döndürür."""
+    while True:
+        try:
+            next(results)
+        except StopIteration as done:
+            return done.value
 
-            try:
-                current_profiles = metrics.get("en_iyi_profiller", "").strip()
-                dom_gamma = dominance.get("Gamma", "")
-                
-                print(f"🔧 RENAME DEBUG: current_profiles='{current_profiles}'")
-                print(f"🔧 RENAME DEBUG: dom_gamma='{dom_gamma}'")
-                
-                # Gamma "Baskın Düşük" ise ve profilde "HUZUR ODAKLI YAŞAYAN" varsa ama "BASKIN DÜŞÜK" yoksa değiştir
-                if (dom_gamma == "Baskın Düşük" and 
-                    "HUZUR ODAKLI YAŞAYAN" in current_profiles and 
-                    "BASKIN DÜŞÜK" not in current_profiles):
-                    
-                    new_profiles = current_profiles.replace("HUZUR ODAKLI YAŞAYAN", "ZİHİN YOLCUSU")
-                    metrics["en_iyi_profiller"] = new_profiles
-                    print(f"✅ RENAME APPLIED: '{current_profiles}' -> '{new_profiles}'")
-                else:
-                    print(f"ℹ️ RENAME SKIPPED: Koşul sağlanmadı")
-                    
-            except Exception as e:
-                print(f"⚠️ RENAME ERROR: {e}")
-			
-            # Check if profile match was found (after all profile modifications)
-            is_unmatched = not (metrics.get("en_iyi_profiller", "") or "").strip()
-            
-            if not is_unmatched:
-                matched_total += 1
-            
-            # print metrics for debug
-            print("Analiz Sonuçları:")
-            for k, v in metrics.items():
-                if k != "dataframe_with_clean":
-                    print(f"  {k}: {v}")
-
-            # prepare log row using to_sheet_row from analytics5
-            person_name = os.path.splitext(csv_file)[0]
-            
-            # Get properly formatted row from analytics5.to_sheet_row (includes all pct_* columns)
-            sheet_row = to_sheet_row(person_name, csv_path, metrics)
-            
-            # Build status columns list
-            status_values = [
-                dominance.get("Delta", "normal"),
-                dominance.get("Theta", "normal"),
-                dominance.get("Alpha", "normal"),
-                dominance.get("Beta", "normal"),
-                dominance.get("Gamma", "normal")
-            ]
-            
-            # Combine: [event] + [status columns] + [HEADERS values from to_sheet_row]
-            log_row = [event] + status_values + sheet_row
-            
-            # For unmatched profiles, also create a dict version (UNMATCHED_LOG_HEADERS format)
-            # Map sheet_row values to a dict using HEADERS order
-            sheet_row_dict = dict(zip(HEADERS, sheet_row))
-            unmatched_log_row = {
-                "event": event,
-                "person_name": person_name,
-                "source_file": csv_file,
-                "en_iyi_profiller": metrics.get("en_iyi_profiller", "") or "",
-                "tam_uyumlu_profiller": metrics.get("tam_uyumlu_profiller", ""),
-                "en_iyi_puan": metrics.get("en_iyi_puan", ""),
-                "level_delta": sheet_row_dict.get("level_delta", ""),
-                "level_theta": sheet_row_dict.get("level_theta", ""),
-                "level_alpha": sheet_row_dict.get("level_alpha", ""),
-                "level_beta": sheet_row_dict.get("level_beta", ""),
-                "level_gamma": sheet_row_dict.get("level_gamma", ""),
-                "status_delta": status_values[0],
-                "status_theta": status_values[1],
-                "status_alpha": status_values[2],
-                "status_beta": status_values[3],
-                "status_gamma": status_values[4],
-                "score_delta": sheet_row_dict.get("score_delta", ""),
-                "score_theta": sheet_row_dict.get("score_theta", ""),
-                "score_alpha": sheet_row_dict.get("score_alpha", ""),
-                "score_beta": sheet_row_dict.get("score_beta", ""),
-                "score_gamma": sheet_row_dict.get("score_gamma", ""),
-                "raw_mean_delta": sheet_row_dict.get("raw_mean_delta", ""),
-                "raw_mean_theta": sheet_row_dict.get("raw_mean_theta", ""),
-                "raw_mean_alpha": sheet_row_dict.get("raw_mean_alpha", ""),
-                "raw_mean_beta": sheet_row_dict.get("raw_mean_beta", ""),
-                "raw_mean_gamma": sheet_row_dict.get("raw_mean_gamma", ""),
-                "dalga_farki": metrics.get("dalga_farki", ""),
-                "controlled_mean": metrics.get("controlled_mean", ""),
-                "controlled_label": metrics.get("controlled_label", ""),
-                "processed_at_utc": sheet_row_dict.get("processed_at_utc", "")
-            }
-            
-            # Conditional routing based on profile match status
-            if is_unmatched:
-                unmatched_total += 1
-                # Unmatched: route to UNMATCHED_DATA
-                print(f"⚠️ Profil eşleşmesi bulunamadı: {csv_file} -> UNMATCHED_DATA'ya yönlendiriliyor")
-                
-                # Create UNMATCHED_DATA/graphs directory structure
-                unmatched_graph_dir = os.path.join(out_dir, "UNMATCHED_DATA", "graphs")
-                os.makedirs(unmatched_graph_dir, exist_ok=True)
-                
-                # Write to unmatched Excel log (uses dict format)
-                unmatched_data_dir = os.path.join(out_dir, "UNMATCHED_DATA")
-                _append_unmatched_log_row(unmatched_log_row, int(rid) if rid.isdigit() else 1005, unmatched_data_dir)
-                
-                # Generate plot in UNMATCHED_DATA/graphs
-                if "dataframe_with_clean" in metrics:
-                    df_for_plot = metrics["dataframe_with_clean"]
+
+def process_files(
+    csv_files,
+    csv_root: str = None,
+    run_id: str = None,
+    output_dir: str = None,
+    profile_csv_path: str = None,
+    dominance_delta: float = None,
+    balance_threshold: float = None,
+    denge_mean_threshold: float = None,
+    window_secs: int = None,
+    window_samples: int = None,
+    band_thresholds: dict = None,
+    plot_format: str = None,
+    plot_thumbnails: bool = True,
+    plot_mode: str = "individual",
+    live_summary: bool = True,
+    unmatched_xlsx: bool = True,
+    prefetch: int = PREFETCH_DEPTH,
+    prefetch_max_mb: float = PREFETCH_MAX_MB
+) -> dict:
+    """iter_process_files'ı çalıştırır, yalnızca sonuç sayılarını ve yolları döndürür."""
+    return _run_to_end(iter_process_files(
+        csv_files,
+        csv_root=csv_root,
+        run_id=run_id,
+        output_dir=output_dir,
+        profile_csv_path=profile_csv_path,
+        dominance_delta=dominance_delta,
+        balance_threshold=balance_threshold,
+        denge_mean_threshold=denge_mean_threshold,
+        window_secs=window_secs,
+        window_samples=window_samples,
+        band_thresholds=band_thresholds,
+        plot_format=plot_format,
+        plot_thumbnails=plot_thumbnails,
+        plot_mode=plot_mode,
+        live_summary=live_summary,
+        unmatched_xlsx=unmatched_xlsx,
+        prefetch=prefetch,
+        prefetch_max_mb=prefetch_max_mb
+    ))
+
+
+def iter_process_files(
+    csv_files,
+    csv_root: str = None,
+    run_id: str = None,
+    output_dir: str = None,
+    profile_csv_path: str = None,
+    dominance_delta: float = None,
+    balance_threshold: float = None,
+    denge_mean_threshold: float = None,
+    window_secs: int = None,
+    window_samples: int = None,
+    band_thresholds: dict = None,
+    plot_format: str = None,
+    plot_thumbnails: bool = True,
+    plot_mode: str = "individual",
+    live_summary: bool = True,
+    unmatched_xlsx: bool = True,
+    prefetch: int = PREFETCH_DEPTH,
+    prefetch_max_mb: float = PREFETCH_MAX_MB
+):
+    """
+    Process an explicit list of CSV files in place (no directory walk, no copies),
+    yielding a RecordingResult as each recording finishes.
+    
+    Outputs (log, plots, live summary) are written as in process_pipeline; the caller
+    can stream results elsewhere while the run continues. Use process_files for the
+    counts only.
+    
+    Args:
+        csv_files: CSV paths, or (event, path) pairs; recordings are processed event by
+            event, events in first-seen order. Without an event, it is the folder relative to csv_root
+            ("root" for files in csv_root, outside it, or when csv_root is not given)
+        csv_root: Root the events and plot names are relative to (optional)
+        output_dir: Directory for outputs (default: csv_root, else the first file's folder)
+        prefetch: Recordings read ahead on background threads while the current one is
+            analysed; 0 reads serially (default: PREFETCH_DEPTH)
+        prefetch_max_mb: Back-pressure: no new read starts while the queued recordings
+            exceed this on-disk size (default: PREFETCH_MAX_MB)
+        Other args: as in process_pipeline
+    
+    Yields:
+        RecordingResult per processed recording (unreadable/duplicate files are skipped)
+    
+    Returns:
+        dict (generator return value): same keys as process_pipeline
+    """
+    items = [
+        (_event_of(item, csv_root), item) if isinstance(item, (str, os.PathLike)) else tuple(item)
+        for item in csv_files
+    ]
+    if output_dir is None and csv_root is None:
+        if not items:
+            raise ValueError("Dosya listesi boş ve output_dir verilmedi")
+        output_dir = os.path.dirname(os.path.abspath(items[0][1]))
+    s = pipeline_settings(
+        csv_root=csv_root,
+        run_id=run_id,
+        output_dir=output_dir,
+        profile_csv_path=profile_csv_path,
+        dominance_delta=dominance_delta,
+        balance_threshold=balance_threshold,
+        denge_mean_threshold=denge_mean_threshold,
+        window_secs=window_secs,
+        window_samples=window_samples,
+        band_thresholds=band_thresholds,
+        plot_format=plot_format,
+        plot_thumbnails=plot_thumbnails,
+        plot_mode=plot_mode,
+        live_summary=live_summary,
+        unmatched_xlsx=unmatched_xlsx
+    )
+    out_dir, rid = s["out_dir"], s["rid"]
+    
+    print(f"🔄 Run ID: {rid}")
+	
+    unmatched_total = 0
+    matched_total = 0
+    processed_files = set()
+    summary_acc = SummaryAccumulator() if live_summary else None
+    pending_summary_rows = []
+    # Aynı dosya (farklı yol/link ile de olsa) bir kez işlenir; tekrarlar okuma kuyruğuna hiç girmez.
+    # Kayıtlar etkinliğe göre (ilk görülme sırasıyla) toplanır; sırası karışık listelerde de
+    # her etkinlik tek grupta işlenir, montaj sayfaları bir kez yazılır
+    event_paths, seen_paths = {}, set()
+    for event, path in items:
+        norm_csv_path = os.path.normpath(os.path.realpath(path))
+        if norm_csv_path in seen_paths:
+            print(f"⏭️  {path} daha önce işlendi, atlanıyor.")
+            continue
+        seen_paths.add(norm_csv_path)
+        event_paths.setdefault(event, []).append(str(path))
+    # Kayıtlar sırayla okunur; prefetch > 0 ise sıradakiler (etkinlik sınırından bağımsız) arka planda okunur
+    frames = prefetch_recordings([path for paths in event_paths.values() for path in paths],
+                                 depth=prefetch, max_mb=prefetch_max_mb)
+    try:
+        for event, paths in event_paths.items():
+            # prepare event-specific graph output dir
+            event_graph_dir = _event_graph_dir(s, event, paths[0])
+            if s["individual_plots"] or s["montage_plots"]:
+                os.makedirs(event_graph_dir, exist_ok=True)
+
+            print(f"Etkinlik: {event} -> bulunan CSV'ler: {[os.path.basename(p) for p in paths]}")
+            montage_panels = []
+
+            for csv_path in paths:
+                # okuma (prefetch'te önceden başlatılmış) her kayıt için sırayla tüketilir
+                wait_started = time.perf_counter()
+                _, df = next(frames)
+                read_wait_ms = (time.perf_counter() - wait_started) * 1000
+                if df is None:
+                    continue
+                record = process_recording(csv_path, event, s, df=df)
+                record.timings_ms["read"] = round(read_wait_ms, 2)
+                record.timings_ms["total"] = round(record.timings_ms["total"] + read_wait_ms, 2)
+
+                if record.matched:
+                    matched_total += 1
+                    if summary_acc is not None:
+                        pending_summary_rows.append(record.log_row)
+                        if len(pending_summary_rows) >= SUMMARY_FLUSH_ROWS:
+                            _flush_live_summary(summary_acc, pending_summary_rows, out_dir, rid)
                 else:
-                    df_for_plot = df
-                
-                plot_key = _build_plot_key(csv_path, event, root)
+                    unmatched_total += 1
+                if record.montage_panel is not None:
+                    montage_panels.append(record.montage_panel)
+                    record.montage_panel = None
+
+                processed_files.add(os.path.normpath(os.path.realpath(csv_path)))
+                yield record
+
+            # Etkinliğin tüm kayıtları bittiğinde kontak sayfalarını çiz
+            if s["montage_plots"] and montage_panels:
                 try:
-                    plot_files = generate_eeg_plots(
-                        dfs={plot_key: df_for_plot},
-                        metrics_map={plot_key: metrics},
-                        balance_diff_map={plot_key: metrics.get("dalga_farki", 0)},
-                        best_profile_map={plot_key: metrics.get("en_iyi_profiller", "")},
-                        output_dir=unmatched_graph_dir,
-                        balance_threshold=balance_threshold,
-                        dominance_delta=dom_delta,
-                        window_secs=window_secs
+                    page_files = generate_event_montage(
+                        montage_panels,
+                        output_dir=event_graph_dir,
+                        event=event,
+                        image_format=plot_format,
+                        thumbnails=plot_thumbnails
                     )
-                except Exception as plot_err:
-                    print(f"❌ Unmatched grafik üretilemedi ({csv_file}): {plot_err}")
+                except Exception as montage_err:
+                    print(f"❌ Montaj üretilemedi ({event}): {montage_err}")
                     import traceback
                     traceback.print_exc()
-                    plot_files = []
-                print(f"Unmatched grafik(ler) kaydedildi: {plot_files}")
-            else:
-                # Matched: continue with existing logic
-                # Write to main log
-                _append_log_row(log_row, log_path)
-                
-                # Grafik oluştur ve event_graph_dir içine kaydet
-                if "dataframe_with_clean" in metrics:
-                    df_for_plot = metrics["dataframe_with_clean"]
-                else:
-                    df_for_plot = df
-                
-                plot_files = generate_eeg_plots(
-                    dfs={csv_file: df_for_plot},
-                    metrics_map={csv_file: metrics},
-                    balance_diff_map={csv_file: metrics.get("dalga_farki", 0)},
-                    best_profile_map={csv_file: metrics.get("en_iyi_profiller", "")},
-                    output_dir=event_graph_dir,
-                    balance_threshold=balance_threshold,
-                    dominance_delta=dom_delta,
-                    window_secs=window_secs
-                )
-                print(f"Oluşan grafik(ler): {plot_files}")
+                    page_files = []
+                append_plot_index(s["plot_index_path"], _plot_index_entries(
+                    page_files, out_dir, event, "", "", False, plot_thumbnails))
 
-            processed_files.add(norm_csv_path)
+            # Etkinlik bitti: ara özeti güncelle
+            if summary_acc is not None and pending_summary_rows:
+                _flush_live_summary(summary_acc, pending_summary_rows, out_dir, rid)
+    finally:
+        # erken kapatılan (tüketilmeyen) run'da bekleyen okumaları iptal et
+        frames.close()
+        s["unmatched_log"].close()
 
     print(f"Toplam eşleşmeyen profil sayısı: {unmatched_total}")
     
+    summary_path = None
+    if summary_acc is not None:
+        summary_path = _flush_live_summary(summary_acc, pending_summary_rows, out_dir, rid, partial=False)
+        if summary_path:
+            print(f"✅ Profil özeti hazır: {summary_path}")
+    
     return {
         "processed_files": len(processed_files),
         "matched_count": matched_total,
         "unmatched_count": unmatched_total,
-        "log_path": log_path
+        "log_path": s["log_path"],
+        "plot_index_path": s["plot_index_path"],
+        "summary_path": summary_path
     }
 
 
+def iter_pipeline(
+    csv_root: str = None,
+    run_id: str = None,
+    output_dir: str = None,
+    profile_csv_path: str = None,
+    dominance_delta: float = None,
+    balance_threshold: float = None,
+    denge_mean_threshold: float = None,
+    window_secs: int = None,
+    window_samples: int = None,
+    band_thresholds: dict = None,
+    plot_format: str = None,
+    plot_thumbnails: bool = True,
+    plot_mode: str = "individual",
+    live_summary: bool = True,
+    unmatched_xlsx: bool = True,
+    prefetch: int = PREFETCH_DEPTH,
+    prefetch_max_mb: float = PREFETCH_MAX_MB
+):
+    """process_pipeline'ın generator hali: csv_root'u tarar ve her kayıt bittiğinde
+    RecordingResult üretir (iter_process_files). Dönüş değeri process_pipeline ile aynı dict."""
+    # Use provided values or defaults
+    root = csv_root if csv_root is not None else CSV_ROOT
+    rid = run_id if run_id is not None else str(_get_and_increment_run_id())
+    
+    # Walk root and collect all csv files under subfolders (skip 'graphs' folders and the log file)
+    csv_files = [
+        (event, os.path.join(walk_root, csv_file))
+        for event, walk_root, event_files in iter_event_csvs(root, skip_files={f"processing_log{rid}.csv"})
+        for csv_file in event_files
+    ]
+    return (yield from iter_process_files(
+        csv_files,
+        csv_root=root,
+        run_id=rid,
+        output_dir=output_dir,
+        profile_csv_path=profile_csv_path,
+        dominance_delta=dominance_delta,
+        balance_threshold=balance_threshold,
+        denge_mean_threshold=denge_mean_threshold,
+        window_secs=window_secs,
+        window_samples=window_samples,
+        band_thresholds=band_thresholds,
+        plot_format=plot_format,
+        plot_thumbnails=plot_thumbnails,
+        plot_mode=plot_mode,
+        live_summary=live_summary,
+        unmatched_xlsx=unmatched_xlsx,
+        prefetch=prefetch,
+        prefetch_max_mb=prefetch_max_mb
+    ))
+
+
+def process_pipeline(
+    csv_root: str = None,
+    run_id: str = None,
+    output_dir: str = None,
+    profile_csv_path: str = None,
+    dominance_delta: float = None,
+    balance_threshold: float = None,
+    denge_mean_threshold: float = None,
+    window_secs: int = None,
+    window_samples: int = None,
+    band_thresholds: dict = None,
+    plot_format: str = None,
+    plot_thumbnails: bool = True,
+    plot_mode: str = "individual",
+    live_summary: bool = True,
+    unmatched_xlsx: bool = True,
+    prefetch: int = PREFETCH_DEPTH,
+    prefetch_max_mb: float = PREFETCH_MAX_MB
+) -> dict:
+    """
+    Process EEG pipeline with configurable parameters.
+    
+    Args:
+        csv_root: Root directory to scan for CSV files (default: CSV_ROOT)
+        run_id: Run identifier (default: auto-generated)
+        output_dir: Directory for outputs (default: csv_root)
+        profile_csv_path: Path to profile CSV file (default: PROFILES_FILE from profile_analyzer5)
+        dominance_delta: Dominance threshold (default: DOMINANCE_DELTA)
+        balance_threshold: Balance threshold (default: from profile_analyzer5)
+        denge_mean_threshold: Denge mean threshold (default: from profile_analyzer5)
+        window_secs: Window seconds for rolling (default: from analytics5)
+        window_samples: Window samples for outlier cleaning (default: from analytics5)
+        band_thresholds: Band thresholds dict (default: from analytics5)
+        plot_format: Plot image format, "png" or "webp" (default: PLOT_FORMAT from zenin_plot_generator)
+        plot_thumbnails: Also save a low-resolution thumbnail next to each plot (default: True)
+        plot_mode: "individual" (one plot per recording), "montage" (per-event contact
+            sheets only), "both" or "none" (no plots at all) (default: "individual")
+        live_summary: Maintain the profile summary while files are processed; a partial
+            profile_summary{run_id}.json is refreshed during the run and the final
+            xlsx/json is written when the last file completes (default: True)
+        unmatched_xlsx: Also keep the unmatched profiles log as xlsx, written once at the
+            end of the run; the CSV log is always appended row by row, so lean runs
+            (unmatched_xlsx=False) never re-read it (default: True)
+        prefetch: Recordings read ahead on background threads (default: PREFETCH_DEPTH, 0 = serial)
+        prefetch_max_mb: Memory bound for the read-ahead queue (default: PREFETCH_MAX_MB)
+    
+    Returns:
+        dict with keys: processed_files, matched_count, unmatched_count, log_path,
+        plot_index_path, summary_path (None if live_summary is off or nothing matched)
+    """
+    return _run_to_end(iter_pipeline(
+        csv_root=csv_root,
+        run_id=run_id,
+        output_dir=output_dir,
+        profile_csv_path=profile_csv_path,
+        dominance_delta=dominance_delta,
+        balance_threshold=balance_threshold,
+        denge_mean_threshold=denge_mean_threshold,
+        window_secs=window_secs,
+        window_samples=window_samples,
+        band_thresholds=band_thresholds,
+        plot_format=plot_format,
+        plot_thumbnails=plot_thumbnails,
+        plot_mode=plot_mode,
+        live_summary=live_summary,
+        unmatched_xlsx=unmatched_xlsx,
+        prefetch=prefetch,
+        prefetch_max_mb=prefetch_max_mb
+    ))
+
+
 def main():
-    """Original main function - calls process_pipeline with defaults"""
-    result = process_pipeline()
+    """Argümansız: process_pipeline varsayılanlarla (CSV_ROOT taranır).
+    python zenin_mac2.py <klasör> | <manifest.txt> | <kayıt.csv|kayıt.zrec ...>
+    Klasör taranır; manifest ve CSV listesi kopyalanmadan yerinde işlenir."""
+    args = sys.argv[1:]
+    if not args:
+        result = process_pipeline()
+    elif len(args) == 1 and os.path.isdir(args[0]):
+        result = process_pipeline(csv_root=args[0])
+    elif len(args) == 1 and not is_recording_path(args[0]):
+        result = process_files(read_manifest(args[0]), csv_root=os.path.dirname(os.path.abspath(args[0])))
+    else:
+        result = process_files(args)
     print(f"✅ Pipeline completed: {result}")
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 # plot_generator2.py
 
 import os
+import json
 import numpy as np
 import pandas as pd
 import math
@@ -15,19 +16,81 @@ WINDOW_SECS = 30
 BALANCE_THRESHOLD = 22.0 # Bu değeri profile_analyzer2.py ile aynı yapın
 DOMINANCE_DELTA = 29.0   # Grafik için skor bazlı baskın eşik (puan cinsinden)
 
+# Çıktı formatları: tam boy grafik + galeri için küçük önizleme (thumbnail)
+PLOT_DPI = 150
+THUMB_DPI = 30
+PLOT_FORMAT = "png"
+PLOT_FORMATS = {
+    "png": {},
+    "webp": {"pil_kwargs": {"quality": 80}},
+}
+THUMB_DIRNAME = "thumbs"
+
+# Etkinlik bazlı kontak sayfası (montaj): sayfa başına küçük panel sayısı
+MONTAGE_COLS = 8
+MONTAGE_ROWS = 6
+MONTAGE_DPI = 100
+MONTAGE_STEP_SECS = 5  # panel verisi bu aralıkla seyreltilir (bellekte küçük kalsın)
+
 BAND_COLORS = {
     "Delta": "red", "Theta": "purple", "Alpha": "blue", 
     "Beta": "green", "Gamma": "orange"
 }
 
+def _band_avg_columns(df) -> list:
+    """Grafikte kullanılacak band ortalama sütunları (önce *_avg_clean, yoksa *_avg)."""
+    bands = ["Delta", "Theta", "Alpha", "Beta", "Gamma"]
+    avg_cols = [f"{b.lower()}_avg_clean" for b in bands if f"{b.lower()}_avg_clean" in df.columns]
+    if not avg_cols:
+        avg_cols = [f"{b.lower()}_avg" for b in bands if f"{b.lower()}_avg" in df.columns]
+    return avg_cols
+
+
+def thumbnail_path(plot_path: str) -> str:
+    """Tam boy grafik yolundan thumbnail yolunu üretir (<klasör>/thumbs/<ad>)."""
+    folder, fname = os.path.split(plot_path)
+    return os.path.join(folder, THUMB_DIRNAME, fname)
+
+
+def append_plot_index(index_path: str, entries: list):
+    """Grafik indeksine (JSON Lines) kayıt ekler."""
+    if not entries:
+        return
+    os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+    with open(index_path, "a", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def read_plot_index(index_path: str) -> list:
+    """Grafik indeksini okur. Dosya yoksa boş liste döner."""
+    if not os.path.exists(index_path):
+        return []
+    entries = []
+    with open(index_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                print(f"⚠️ Grafik indeksinde bozuk satır atlandı: {index_path}")
+    return entries
+
+
 # --- ANA FONKSİYONU GÜNCELLE ---
-def generate_eeg_plots(dfs, metrics_map=None, balance_diff_map=None, best_profile_map=None, output_dir="eeg_plots", balance_threshold=None, dominance_delta=None, window_secs=None):
+def generate_eeg_plots(dfs, metrics_map=None, balance_diff_map=None, best_profile_map=None, output_dir="eeg_plots", balance_threshold=None, dominance_delta=None, window_secs=None, image_format=None, thumbnails=True):
     print(f"🔧 PLOT DEBUG: generate_eeg_plots çağrıldı")
     
     # Use provided parameters or defaults
     win_secs = window_secs if window_secs is not None else WINDOW_SECS
     bal_thresh = balance_threshold if balance_threshold is not None else BALANCE_THRESHOLD
     dom_delta = dominance_delta if dominance_delta is not None else DOMINANCE_DELTA
+    fmt = (image_format or PLOT_FORMAT).lower()
+    if fmt not in PLOT_FORMATS:
+        raise ValueError(f"Desteklenmeyen grafik formatı: {fmt} (seçenekler: {sorted(PLOT_FORMATS)})")
+    save_kwargs = PLOT_FORMATS[fmt]
     
     os.makedirs(output_dir, exist_ok=True)
     plot_files = []
@@ -105,10 +168,7 @@ def generate_eeg_plots(dfs, metrics_map=None, balance_diff_map=None, best_profil
                 print(f"❌ PLOT DEBUG: {name} geçerli TimeStamp yok")
                 continue
 
-            bands = ["Delta", "Theta", "Alpha", "Beta", "Gamma"]
-            avg_cols = [f"{b.lower()}_avg_clean" for b in bands if f"{b.lower()}_avg_clean" in df.columns]
-            if not avg_cols:
-                avg_cols = [f"{b.lower()}_avg" for b in bands if f"{b.lower()}_avg" in df.columns]
+            avg_cols = _band_avg_columns(df)
 
             if not avg_cols:
                 print(f"❌ PLOT DEBUG: {name} hiçbir EEG band sütunu bulunamadı")
@@ -227,13 +287,18 @@ def generate_eeg_plots(dfs, metrics_map=None, balance_diff_map=None, best_profil
             # Eğer herhangi bir band için dominance tespit edildiyse "dominant" klasörüne, aksi halde "normal" klasörüne kaydet
             is_dominant = bool(dominance)
             if is_dominant:
-                save_path = os.path.join(dominant_dir, f"{plot_title}.png")
+                save_path = os.path.join(dominant_dir, f"{plot_title}.{fmt}")
             else:
-                save_path = os.path.join(normal_dir, f"{plot_title}.png")
+                save_path = os.path.join(normal_dir, f"{plot_title}.{fmt}")
             
             print(f"🔧 PLOT DEBUG: Kaydediliyor -> {'dominant' if is_dominant else 'normal'} : {save_path}")
 
-            fig.savefig(save_path, dpi=150, facecolor="white", edgecolor="none")
+            fig.savefig(save_path, dpi=PLOT_DPI, facecolor="white", edgecolor="none", format=fmt, **save_kwargs)
+            # Aynı figürden düşük çözünürlüklü önizleme (yeniden çizim maliyeti yok denecek kadar az)
+            if thumbnails:
+                thumb_path = thumbnail_path(save_path)
+                os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+                fig.savefig(thumb_path, dpi=THUMB_DPI, facecolor="white", edgecolor="none", format=fmt, **save_kwargs)
             plt.close(fig)
             
             plot_files.append(save_path)
@@ -247,3 +312,105 @@ def generate_eeg_plots(dfs, metrics_map=None, balance_diff_map=None, best_profil
 
     print(f"🔧 PLOT DEBUG: Toplam {len(plot_files)} grafik oluşturuldu")
     return plot_files
+
+
+def build_montage_panel(name, df, profile="", dominant=False, window_secs=None):
+    """Montaj için tek kişinin band eğilimlerini küçük bir panel verisine indirger.
+
+    Tam DataFrame yerine yalnızca seyreltilmiş (MONTAGE_STEP_SECS) ve
+    geçen dakikaya göre hizalanmış seriler tutulur; böylece bir etkinliğin
+    tüm katılımcıları bellekte ucuza biriktirilebilir. Veri yoksa None döner.
+    """
+    win_secs = window_secs if window_secs is not None else WINDOW_SECS
+    if df is None or df.empty or "TimeStamp" not in df.columns:
+        return None
+    avg_cols = _band_avg_columns(df)
+    if not avg_cols:
+        return None
+
+    ts = pd.to_datetime(df["TimeStamp"], errors="coerce")
+    frame = df[avg_cols].set_index(ts)
+    frame = frame[frame.index.notna()].sort_index()
+    if frame.empty:
+        return None
+
+    smooth = frame.resample("1s").mean().rolling(f"{win_secs}s", min_periods=1).mean()
+    smooth = smooth.iloc[::MONTAGE_STEP_SECS]
+    minutes = ((smooth.index - smooth.index[0]).total_seconds() / 60.0).to_numpy(dtype=np.float32)
+    series = {}
+    for col_name in smooth.columns:
+        band_name = col_name.replace("_avg_clean", "").replace("_avg", "").capitalize()
+        series[band_name] = smooth[col_name].to_numpy(dtype=np.float32)
+
+    return {
+        "name": os.path.splitext(os.path.basename(name))[0],
+        "minutes": minutes,
+        "series": series,
+        "profile": profile or "",
+        "dominant": bool(dominant),
+    }
+
+
+def generate_event_montage(panels, output_dir, event, image_format=None, thumbnails=True,
+                           cols=None, rows=None):
+    """Bir etkinliğin tüm katılımcılarını kontak sayfalarına (small multiples) çizer.
+
+    Her sayfa tek bir figür ve paylaşılan eksen ızgarasıdır; kişi başına ayrı
+    figür açmaktan çok daha ucuzdur. Üretilen sayfa yollarını döndürür.
+    """
+    n_cols = cols or MONTAGE_COLS
+    n_rows = rows or MONTAGE_ROWS
+    per_page = n_cols * n_rows
+    fmt = (image_format or PLOT_FORMAT).lower()
+    if fmt not in PLOT_FORMATS:
+        raise ValueError(f"Desteklenmeyen grafik formatı: {fmt} (seçenekler: {sorted(PLOT_FORMATS)})")
+    save_kwargs = PLOT_FORMATS[fmt]
+
+    panels = [p for p in panels if p]
+    if not panels:
+        return []
+
+    montage_dir = os.path.join(output_dir, "montage")
+    os.makedirs(montage_dir, exist_ok=True)
+    safe_event = str(event or "root").replace(os.sep, "__").replace("/", "__")
+    n_pages = int(math.ceil(len(panels) / per_page))
+    legend_handles = [Line2D([], [], color=c, linewidth=1.5, label=b) for b, c in BAND_COLORS.items()]
+
+    page_files = []
+    for page in range(n_pages):
+        chunk = panels[page * per_page:(page + 1) * per_page]
+        fig, axes = plt.subplots(n_rows, n_cols, sharex=True, sharey=True,
+                                 figsize=(n_cols * 3.0, n_rows * 2.2), squeeze=False)
+        for ax, panel in zip(axes.flat, chunk):
+            for band, values in panel["series"].items():
+                ax.plot(panel["minutes"], values, color=BAND_COLORS.get(band, "black"), linewidth=0.8)
+            title = panel["name"]
+            if panel["profile"]:
+                title += f"\n{panel['profile']}"
+            ax.set_title(title, fontsize=7, color="darkred" if panel["dominant"] else "black")
+            ax.tick_params(labelsize=6)
+            ax.grid(True, linestyle="--", alpha=0.4)
+        flat_axes = list(axes.flat)
+        for idx in range(len(chunk), per_page):
+            flat_axes[idx].axis("off")
+            # Boş hücrenin üstündeki panel alt satır sayılır: zaman etiketlerini göster
+            if 0 <= idx - n_cols < len(chunk):
+                flat_axes[idx - n_cols].tick_params(labelbottom=True)
+
+        fig.suptitle(f"EEG Dalga Eğilimleri: {event} ({page + 1}/{n_pages})", fontsize=14)
+        fig.supxlabel("Dakika", fontsize=9, y=0.05)
+        fig.supylabel("Genlik (μV)", fontsize=9)
+        fig.legend(handles=legend_handles, loc="lower center", ncol=len(legend_handles), fontsize=8, frameon=False)
+        fig.tight_layout(rect=[0, 0.06, 1, 0.95])
+
+        save_path = os.path.join(montage_dir, f"{safe_event}_montage_{page + 1:02d}.{fmt}")
+        fig.savefig(save_path, dpi=MONTAGE_DPI, facecolor="white", edgecolor="none", format=fmt, **save_kwargs)
+        if thumbnails:
+            thumb_path = thumbnail_path(save_path)
+            os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+            fig.savefig(thumb_path, dpi=THUMB_DPI, facecolor="white", edgecolor="none", format=fmt, **save_kwargs)
+        plt.close(fig)
+        page_files.append(save_path)
+        print(f"✅ MONTAGE: {event} sayfa {page + 1}/{n_pages} kaydedildi → {save_path}")
+
+    return page_files